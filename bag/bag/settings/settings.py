@@ -99,6 +99,49 @@ BATCH_SETTINGS = dict(
     batch_size=5000
 )
 
+# In-process indexes answering the most common typeahead queries without
+# elastic. They are rebuilt after LOCAL_INDEX_TTL seconds.
+LOCAL_INDEX_ENABLED = os.getenv('LOCAL_INDEX_ENABLED', 'true').lower() == 'true'
+LOCAL_INDEX_TTL = int(os.getenv('LOCAL_INDEX_TTL', 3600))
+# Written by the import, read instead of the database when it exists
+POSTCODE_INDEX_SNAPSHOT = os.getenv('POSTCODE_INDEX_SNAPSHOT')
+
+# Search queries taking longer than this are logged
+SEARCH_SLOW_QUERY_SECONDS = float(os.getenv('SEARCH_SLOW_QUERY_SECONDS', 0.5))
+
+# Inputs replayed on new elastic indices, one per line, most frequent
+# first. Default the benchmark corpus.
+SEARCH_WARMUP_QUERIES = os.getenv('SEARCH_WARMUP_QUERIES')
+SEARCH_WARMUP_SIZE = int(os.getenv('SEARCH_WARMUP_SIZE', 200))
+
+# Fail requests that exceed the query budget of their endpoint instead of
+# logging them. On in tests.
+QUERY_BUDGET_RAISE = os.getenv('QUERY_BUDGET_RAISE', str(TESTING)).lower() == 'true'
+
+# Rows fetched from the server-side cursor and written per chunk by the
+# streaming exports
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', 2000))
+
+# Most ids accepted by one bulk/ request
+BULK_MAX_IDS = int(os.getenv('BULK_MAX_IDS', 1000))
+
+# Seconds an API process keeps using the data generation it read last,
+# and how long a reverse proxy may cache public responses
+DATA_GENERATION_TTL = int(os.getenv('DATA_GENERATION_TTL', 30))
+CACHE_CONTROL_MAX_AGE = int(os.getenv('CACHE_CONTROL_MAX_AGE', 300))
+
+# Rendered detail responses kept per process, optionally shared through
+# a Django cache alias
+RESPONSE_CACHE_SIZE = int(os.getenv('RESPONSE_CACHE_SIZE', 2000))
+RESPONSE_CACHE_BACKEND = os.getenv('RESPONSE_CACHE_BACKEND')
+RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT', 3600))
+
+# Vector tiles kept per process, and on disk when TILE_CACHE_DIR is set.
+# seed_tiles renders the zoom levels up to TILE_SEED_MAX_ZOOM.
+TILE_CACHE_SIZE = int(os.getenv('TILE_CACHE_SIZE', 5000))
+TILE_CACHE_DIR = os.getenv('TILE_CACHE_DIR')
+TILE_SEED_MAX_ZOOM = int(os.getenv('TILE_SEED_MAX_ZOOM', 13))
+
 
 ALLOWED_HOSTS = [
     '127.0.0.1',
@@ -46,6 +46,7 @@ INSTALLED_APPS = [
     'search',        # search urls
     'batch',
     'bag_commands',
+    'datasets.generic',
     'datasets.bag',
     'datasets.brk',
     'geo_views',
@@ -57,6 +58,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'datasets.generic.query_budget.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.middleware.common.CommonMiddleware',
     'authorization_django.authorization_middleware',
@@ -64,7 +66,7 @@ MIDDLEWARE = [
 
 if DEBUG:
     INSTALLED_APPS += ['debug_toolbar', 'elastic_panel']
-    MIDDLEWARE.insert(2, 'debug_toolbar.middleware.DebugToolbarMiddleware')
+    MIDDLEWARE.insert(3, 'debug_toolbar.middleware.DebugToolbarMiddleware')
 
     DEBUG_TOOLBAR_PANELS = [
         'debug_toolbar.panels.versions.VersionsPanel',
@@ -25,6 +25,7 @@ from django.conf.urls.static import static
 
 import search.urls
 import bag.urlsets
+import geo_views.views
 
 grouped_url_patterns = {
     'base_patterns': [
@@ -49,6 +50,10 @@ grouped_url_patterns = {
         # url(r'^typeahead/', include(search.urls.typeahead.urls)),
     ],
 
+    'tile_patterns': [
+        url(r'^tiles/(?P<layer>[a-z_]+)/(?P<z>\d+)/(?P<x>\d+)/(?P<y>\d+)\.mvt$', geo_views.views.vector_tile),
+    ],
+
     'search_patterns': [
         # atlas is depricated
         url(r'^atlas/search/', include(search.urls.bag_search.urls)),
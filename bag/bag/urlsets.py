@@ -73,6 +73,7 @@ gebieden.register(r'buurtcombinatie', datasets.bag.views.BuurtcombinatieViewSet)
 gebieden.register(r'gebiedsgerichtwerken', datasets.bag.views.GebiedsgerichtwerkenViewSet)
 gebieden.register(r'grootstedelijkgebied', datasets.bag.views.GrootstedelijkgebiedViewSet)
 gebieden.register(r'unesco', datasets.bag.views.UnescoViewSet)
+gebieden.register(r'reverse-geocode', datasets.bag.views.ReverseGeocodeViewSet, basename='reverse-geocode')
 
 brk.register(r'gemeente', datasets.brk.views.GemeenteViewSet)
 brk.register(r'kadastrale-gemeente', datasets.brk.views.KadastraleGemeenteViewSet)
@@ -1,48 +1,67 @@
-from django.core.management import BaseCommand
-from django.db import ProgrammingError
+from django.core.management import BaseCommand, call_command
 from django.db import connection
 
+from datasets.generic import generation
+from geo_views import generalization, rebuild
+
 
 class Command(BaseCommand):
+    """
+    Build the `geo_*_mat` tables and their generalised variants of the geo_
+    views whose source tables changed since their last build
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'views',
+            nargs='*',
+            help='Only consider these geo_ views, default all of them')
+
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            dest='all',
+            default=False,
+            help='Rebuild even when the source tables did not change')
+
+        parser.add_argument(
+            '--jobs',
+            type=int,
+            dest='jobs',
+            default=4,
+            help='Views to build in parallel, default 4')
+
+        parser.add_argument(
+            '--no-seed',
+            action='store_false',
+            dest='seed',
+            default=True,
+            help='Do not render the low zoom vector tiles afterwards')
+
     def handle(self, *args, **options):
         with connection.cursor() as cursor:
-            self.create_geo(cursor)
-
-    def create_geo(self, cursor):
-        tables = connection.introspection.get_table_list(cursor)
-
-        for table_info in tables:
-            if table_info.type == 'v' and table_info.name[0:4] == 'geo_':
-                try:
-                    cursor.execute(
-                        'DROP TABLE IF EXISTS {}'.format(
-                            connection.ops.quote_name(f"{table_info.name}_mat")
-                        )
-                    )
-                except ProgrammingError:
-                    pass
-
-                cursor.execute(
-                    'CREATE TABLE {} AS SELECT * FROM {}'.format(
-                        connection.ops.quote_name(f"{table_info.name}_mat"),
-                        connection.ops.quote_name(table_info.name)
-                    )
-                )
-                cursor.execute(
-                    'CREATE INDEX {} ON {} USING GIST(geometrie)'.format(
-                        connection.ops.quote_name(f"{table_info.name}_idx"),
-                        connection.ops.quote_name(f"{table_info.name}_mat")
-                    )
-                )
-                cursor.execute(
-                    'CLUSTER {} ON {}'.format(
-                        connection.ops.quote_name(f"{table_info.name}_idx"),
-                        connection.ops.quote_name(f"{table_info.name}_mat")
-                    )
-                )
-                cursor.execute(
-                    'VACUUM ANALYZE {}'.format(
-                        connection.ops.quote_name(f"{table_info.name}_mat"),
-                    )
-                )
-                self.stdout.write(f'Created geotable {table_info.name}_mat\n')
+            generalization.create_metadata_table(cursor)
+            rebuild.create_builds_table(cursor)
+
+            views = rebuild.geo_views(cursor)
+            unknown = set(options['views']) - set(views)
+            if unknown:
+                self.stderr.write(f"Unknown geo views: {', '.join(sorted(unknown))}")
+            if options['views']:
+                views = [view for view in views if view in options['views']]
+
+            stale = rebuild.stale_views(cursor, views, force=options['all'])
+
+        if not stale:
+            self.stdout.write('Geo tables are up to date\n')
+            return
+
+        self.stdout.write(f'Rebuilding {len(stale)} of {len(views)} geo tables\n')
+        timings = rebuild.rebuild(
+            stale, options['jobs'], report=lambda message: self.stdout.write(message + '\n'))
+        self.stdout.write(f'Built {len(timings)} geo tables in {sum(timings.values()):.1f}s\n')
+
+        # New geo tables, cached vector tiles are outdated
+        generation.mark_generation('geo tables')
+        if options['seed']:
+            call_command('seed_tiles')
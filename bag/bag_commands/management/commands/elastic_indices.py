@@ -6,6 +6,8 @@ from django.core.management import BaseCommand
 import datasets.bag.batch
 import datasets.brk.batch
 from batch import batch
+from datasets.generic import generation
+from search import warmup
 
 
 class Command(BaseCommand):
@@ -25,6 +27,13 @@ class Command(BaseCommand):
         'pand': [datasets.bag.batch.DeleteIndexPandJob],
     }
 
+    warmup_indices = {
+        'bag': ['NUMMERAANDUIDING'],
+        'brk': ['BRK_OBJECT', 'BRK_SUBJECT'],
+        'gebieden': ['BAG_GEBIED', 'BAG_BOUWBLOK'],
+        'pand': ['BAG_PAND'],
+    }
+
     def add_arguments(self, parser):
         parser.add_argument(
             'dataset',
@@ -54,6 +63,21 @@ class Command(BaseCommand):
             default=0,
             help='Build X/Y parts 1/3, 2/3, 3/3')
 
+        parser.add_argument(
+            '--no-warmup',
+            action='store_false',
+            dest='warmup',
+            default=True,
+            help='Do not replay search queries on the indexes after a build')
+
+        parser.add_argument(
+            '--warmup-size',
+            action='store',
+            dest='warmup_size',
+            type=int,
+            default=None,
+            help='Number of search inputs to replay, default SEARCH_WARMUP_SIZE')
+
     def set_partial_config(self, options):
         """
         Do partial configuration
@@ -99,5 +123,31 @@ class Command(BaseCommand):
                 for job_class in self.indexes[ds]:
                     batch.execute(job_class())
 
+        if options['build_index'] and not options['delete_indexes'] and options['warmup']:
+            self.warm_up(sets, options['warmup_size'])
+
+        if options['build_index'] and not options['delete_indexes']:
+            # New search results, invalidates the ETags of all API responses
+            generation.mark_generation('elastic: ' + ', '.join(sets))
+
         self.stdout.write(
             "Total Duration: %.2f seconds" % (time.time() - start))
+
+    def warm_up(self, sets, size):
+        """
+        Replay the most frequent search inputs on the new indexes, so the
+        first users do not hit cold caches
+        """
+        indices = {
+            settings.ELASTIC_INDICES[key]
+            for ds in sets for key in self.warmup_indices[ds]
+        }
+        queries = warmup.warmup_queries(size)
+
+        self.stdout.write("Warming up {} with {} search inputs".format(
+            ", ".join(sorted(indices)), len(queries)))
+
+        for report in warmup.warm_up(indices, queries):
+            self.stdout.write(
+                "Pass {pass}: {searches} searches, {errors} errors, "
+                "p50 {p50_ms}ms, p95 {p95_ms}ms, max {max_ms}ms".format(**report))
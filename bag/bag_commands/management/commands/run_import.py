@@ -9,6 +9,7 @@ from django.core.management import BaseCommand
 import datasets.bag.batch
 import datasets.brk.batch
 from datasets import validate_tables
+from datasets.generic import generation
 from batch import batch
 
 
@@ -63,3 +64,6 @@ class Command(BaseCommand):
             for job_class in self.imports[one_ds]:
                 batch.execute(job_class())
 
+        # New data, invalidates the ETags of all API responses
+        generation.mark_generation(', '.join(sets))
+
@@ -0,0 +1,100 @@
+import json
+
+from django.core.management import BaseCommand, CommandError
+
+from search import benchmark
+
+
+class Command(BaseCommand):
+    """
+    Replay search inputs against the typeahead and search endpoints and
+    report latency, QPS and elastic round trips per endpoint.
+
+    Runs against the configured database and elastic. To run against
+    an elastic seeded from the test factories use:
+
+        SEARCH_BENCHMARK=1 pytest search/tests/test_benchmark.py
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'endpoint',
+            nargs='*',
+            help='Endpoints to replay, default all typeahead and search endpoints')
+
+        parser.add_argument(
+            '--corpus',
+            dest='corpus',
+            help='File with one search input per line, default the built in corpus')
+
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Timed passes over the corpus')
+
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=1,
+            help='Untimed passes over the corpus')
+
+        parser.add_argument(
+            '--token',
+            dest='token',
+            help='Bearer token, needed for the kadastraal subject endpoints')
+
+        parser.add_argument(
+            '--baseline',
+            dest='baseline',
+            help='Compare with this baseline report, fail on regressions')
+
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=0.25,
+            help='Allowed latency increase compared with the baseline, as fraction')
+
+        parser.add_argument(
+            '--save',
+            dest='save',
+            help='Write the report as json to this file, to use as baseline')
+
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            default=False,
+            help='Print the report as json')
+
+    def handle(self, *args, **options):
+        endpoints = options['endpoint'] or benchmark.search_endpoints()
+
+        if options['corpus']:
+            queries = benchmark.read_corpus(options['corpus'])
+        else:
+            queries = benchmark.corpus_queries()
+
+        report = benchmark.run(
+            queries, endpoints,
+            repeat=options['repeat'],
+            warmup=options['warmup'],
+            token=options['token'])
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            self.stdout.write(benchmark.format_report(report))
+
+        if options['save']:
+            benchmark.save_report(report, options['save'])
+            self.stdout.write(f"Report saved to {options['save']}")
+
+        if options['baseline']:
+            regressions = benchmark.compare(
+                report, benchmark.load_report(options['baseline']),
+                tolerance=options['tolerance'])
+            if regressions:
+                for regression in regressions:
+                    self.stderr.write(regression)
+                raise CommandError(f'{len(regressions)} regressions compared with baseline')
+            self.stdout.write('No regressions compared with baseline')
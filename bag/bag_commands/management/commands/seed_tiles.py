@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from datasets.generic import generation
+from geo_views import tiles
+
+
+class Command(BaseCommand):
+    """
+    Render the vector tiles of the low zoom levels into TILE_CACHE_DIR,
+    for the current data generation
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'layer',
+            nargs='*',
+            default=sorted(tiles.LAYERS),
+            help="Layers to seed, choose from {}".format(', '.join(sorted(tiles.LAYERS))))
+
+        parser.add_argument(
+            '--max-zoom',
+            type=int,
+            dest='max_zoom',
+            default=settings.TILE_SEED_MAX_ZOOM,
+            help='Highest zoom level to seed, default TILE_SEED_MAX_ZOOM')
+
+    def handle(self, *args, **options):
+        if not settings.TILE_CACHE_DIR:
+            self.stderr.write('TILE_CACHE_DIR is not set, nothing to seed')
+            return
+
+        generation.forget_generation()
+        current = generation.latest_generation()
+        if current is None:
+            self.stderr.write('No data generation yet, nothing to seed')
+            return
+
+        tiles.remove_old_generations(current)
+
+        for layer in options['layer']:
+            if layer not in tiles.LAYERS:
+                self.stderr.write(f'Unknown layer: {layer}')
+                continue
+            count = tiles.seed(current, layer, options['max_zoom'])
+            self.stdout.write(f'Seeded {count} tiles of {layer}\n')
@@ -14,24 +14,18 @@ class Command(BaseCommand):
         kot_models = vbo.kadastrale_objecten.all()
 
         for kot in kot_models:
-            apercelen, gpercelen = [], []
             pk = kot.id
 
+            # the closure of A-G relaties is computed at import
             if kot.indexletter == 'G':
-                apercelen = [m.pk for m in kot.a_percelen.all()]
+                apercelen = self.get_apercelen(KadastraalObject.objects.filter(pk=pk))
+                gpercelen = self.get_gpercelen(apercelen)
             else:
-                gpercelen = [m.pk for m in kot.g_percelen.all()]
+                gpercelen = self.get_gpercelen(KadastraalObject.objects.filter(pk=pk))
+                apercelen = self.get_apercelen(gpercelen)
 
-            # keep fetching items until nothing new is found
-            while True:
-                new_a = [m.pk for m in self.get_apercelen(gpercelen, apercelen)]
-                new_g = [m.pk for m in self.get_gpercelen(apercelen, gpercelen)]
-
-                if not len(new_a) and not len(new_g):
-                    break
-
-                apercelen += new_a
-                gpercelen += new_g
+            apercelen = [m.pk for m in apercelen]
+            gpercelen = [m.pk for m in gpercelen]
 
             print('%s has %d a-percelen' % (pk, len(apercelen)))
             for pk in apercelen:
@@ -41,17 +35,17 @@ class Command(BaseCommand):
             for pk in gpercelen:
                 print(' - %s' % pk)
 
-    def get_apercelen(self, gpercelen_pks, exclude_pks):
+    def get_apercelen(self, gpercelen):
         return KadastraalObject\
             .objects\
-            .filter(indexletter='A', g_percelen__pk__in=gpercelen_pks)\
-            .exclude(pk__in=exclude_pks)
+            .filter(indexletter='A', alle_g_percelen__in=gpercelen)\
+            .distinct()
 
-    def get_gpercelen(self, apercelen_pks, exclude_pks):
+    def get_gpercelen(self, apercelen):
         return KadastraalObject\
             .objects\
-            .filter(indexletter='G', a_percelen__pk__in=apercelen_pks)\
-            .exclude(pk__in=exclude_pks)
+            .filter(indexletter='G', alle_a_percelen__in=apercelen)\
+            .distinct()
 
 
 """
@@ -9,7 +9,7 @@ from django.conf import settings
 from django.db import connection
 from django.utils.text import slugify
 # Project
-from search import index
+from search import index, postcode_index, prefix_index
 from batch import batch
 from datasets.generic import uva2, database, geo, metadata
 from . import models, documents
@@ -906,6 +906,11 @@ class IndexOpenbareRuimteTask(index.ImportIndexTask):
     def convert(self, obj):
         return documents.from_openbare_ruimte(obj)
 
+    def execute(self):
+        super().execute()
+        # the typeahead in this process should see the new names
+        prefix_index.openbare_ruimte_index.invalidate()
+
 
 #########################################################
 # gebieden tasks
@@ -994,6 +999,11 @@ class IndexNummerAanduidingTask(index.ImportIndexTask):
     def convert(self, obj):
         return documents.from_nummeraanduiding_ruimte(obj)
 
+    def execute(self):
+        super().execute()
+        # the typeahead in this process should see the new addresses
+        postcode_index.postcode_index.invalidate()
+
 
 class IndexPandTask(index.ImportIndexTask):
     name = "index pand"
@@ -1499,6 +1509,52 @@ class UpdateGrootstedelijkAttributenTask(batch.BasicTask):
             ligplaatsen.update(_grootstedelijkgebied=gsg.id)
 
 
+class ImportPandNummeraanduidingTask(batch.BasicTask):
+    name = "Import BAG pand - nummeraanduiding"
+
+    def before(self):
+        pass
+
+    def after(self):
+        pass
+
+    def process(self):
+        with connection.cursor() as c:
+            c.execute("""
+INSERT INTO bag_pandnummeraanduidingrelatie(pand_id, pand_landelijk_id, nummeraanduiding_id)
+SELECT DISTINCT
+  pand.id,
+  pand.landelijk_id,
+  num.id
+FROM bag_verblijfsobjectpandrelatie pand_vbo
+  JOIN bag_pand pand ON pand.id = pand_vbo.pand_id
+  JOIN bag_nummeraanduiding num ON num.verblijfsobject_id = pand_vbo.verblijfsobject_id
+            """)
+            c.execute("ANALYZE bag_pandnummeraanduidingrelatie")
+
+
+class WritePostcodeIndexSnapshotTask(batch.BasicTask):
+    """
+    Write the in-process postcode lookup used by the search, so api
+    processes do not have to build it from the database
+    """
+
+    name = "Write postcode index snapshot"
+
+    def process(self):
+        path = settings.POSTCODE_INDEX_SNAPSHOT
+        if not path:
+            log.info('POSTCODE_INDEX_SNAPSHOT not set, skipping')
+            return
+
+        start = time.time()
+        pc_index = postcode_index.build_from_database()
+        postcode_index.write_snapshot(pc_index, path)
+        postcode_index.postcode_index.invalidate()
+
+        log.info('Wrote %d addresses to %s in %.1fs', len(pc_index), path, time.time() - start)
+
+
 class ImportBagJob(batch.BasicJob):
     name = "Import BAG"
 
@@ -1555,6 +1611,12 @@ class ImportBagJob(batch.BasicJob):
             # more denormalizing sql
             UpdateGebiedenAttributenTask(),
             UpdateGrootstedelijkAttributenTask(),
+            #
+            # adressen per pand for the pand filter
+            ImportPandNummeraanduidingTask(),
+            #
+            # in-process postcode lookup for the search
+            WritePostcodeIndexSnapshotTask(),
         ]
 
 
@@ -40,6 +40,8 @@ class Nummeraanduiding(es.DocType):
 
     [Stelselpedia](http://www.amsterdam.nl/stelselpedia/bag-index/catalogus-bag/objectklasse-2/)
     """
+    id = es.Keyword()
+
     straatnaam = es.Text(
         analyzer=analyzers.adres,
         fields={
@@ -125,6 +127,8 @@ class Bouwblok(es.DocType):
     """
     Bouwblok searchable fields.
     """
+    id = es.Keyword()
+
     code = es.Text(
         analyzer=analyzers.bouwblokid,
         fields={
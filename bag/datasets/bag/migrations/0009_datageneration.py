@@ -0,0 +1,19 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bag', '0008_woonplaats_geometrie'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataGeneration',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('dataset', models.CharField(max_length=100)),
+                ('completed', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
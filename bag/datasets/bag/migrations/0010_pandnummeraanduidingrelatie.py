@@ -0,0 +1,26 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bag', '0009_datageneration'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PandNummeraanduidingRelatie',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pand_landelijk_id', models.CharField(max_length=16)),
+                ('nummeraanduiding', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    related_name='pand_relaties', to='bag.Nummeraanduiding')),
+                ('pand', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='bag.Pand')),
+            ],
+            options={
+                'index_together': {('pand_landelijk_id', 'nummeraanduiding')},
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    The table itself is renamed by generic 0001_initial
+    """
+
+    dependencies = [
+        ('bag', '0010_pandnummeraanduidingrelatie'),
+        ('generic', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.DeleteModel(name='DataGeneration'),
+            ],
+        ),
+    ]
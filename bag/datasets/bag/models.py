@@ -835,13 +835,9 @@ class Verblijfsobject(mixins.GeldigheidMixin, mixins.DocumentStatusMixin, Adress
         Geeft het pand van dit verblijfsobject. Indien er meerdere
         panden zijn, wordt een willekeurig pand gekozen.
         """
-        if not self.panden.count():
-            return None
-
-        if not self._pand:
-            self._pand = self.panden.select_related(
-                'bouwblok',
-            )[0]
+        if self._pand is None:
+            # no query when the panden are prefetched
+            self._pand = next(iter(self.panden.all()[:1]), None)
 
         return self._pand
 
@@ -922,8 +918,9 @@ class Pand(mixins.GeldigheidMixin, mixins.DocumentStatusMixin, models.Model):
         if self.cached_buurt:
             return self.cached_buurt
 
-        buurt = Buurt.objects.filter(
-            geometrie__dwithin=(self.geometrie, 0)).first()
+        buurt = Buurt.objects.select_related(
+            'buurtcombinatie', 'stadsdeel__gemeente',
+        ).filter(geometrie__dwithin=(self.geometrie, 0)).first()
 
         self.cached_buurt = buurt
 
@@ -970,6 +967,22 @@ class VerblijfsobjectPandRelatie(models.Model):
             self.pand_id, self.verblijfsobject_id)
 
 
+class PandNummeraanduidingRelatie(models.Model):
+    """
+    Adressen van de verblijfsobjecten in een pand, afgeleid bij de import
+    voor het pand filter op nummeraanduidingen
+    """
+    pand = models.ForeignKey(Pand, on_delete=models.CASCADE)
+    pand_landelijk_id = models.CharField(max_length=16)
+    nummeraanduiding = models.ForeignKey(
+        Nummeraanduiding, related_name='pand_relaties', on_delete=models.CASCADE)
+
+    class Meta:
+        index_together = (
+            ('pand_landelijk_id', 'nummeraanduiding'),
+        )
+
+
 class Buurtcombinatie(mixins.GeldigheidMixin, models.Model):
     """
     model for data from shp files
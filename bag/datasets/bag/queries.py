@@ -74,6 +74,19 @@ def postcode_huisnummer_exact_query(analyzer: QueryAnalyzer) -> Search:
     )
 
 
+def nummeraanduiding_ids_query(ids: [str]) -> Search:
+    """
+    Create query for nummeraanduidingen already found by id, sorted
+    like the postcode house number search
+    """
+    return create_search_query(
+        query=Q('ids', values=ids),
+        sort_fields=['straatnaam.raw', 'huisnummer', 'toevoeging.keyword'],
+        indexes=[NUMMERAANDUIDING],
+        size=len(ids),
+    )
+
+
 def bouwblok_query(analyzer: QueryAnalyzer) -> Search:
     """ Create query/aggregation for bouwblok search"""
     return create_search_query(
@@ -1,3 +1,6 @@
+from collections import OrderedDict
+
+from django.db.models import Exists, OuterRef
 from rest_framework import serializers
 
 from rest_framework_gis.fields import GeometryField
@@ -5,13 +8,15 @@ from rest_framework_gis.fields import GeometryField
 from rest_framework.reverse import reverse
 
 from datasets.brk import serializers as brk_serializers
-from datasets.generic import rest
+from datasets.generic import geometry, rest
 
 from . import models
 
 
 class BboxMixin:
     def get_bbox(self, obj):
+        if geometry.has_options(obj):
+            return geometry.bbox(obj)
         if obj.geometrie:
             return obj.geometrie.extent
 
@@ -113,6 +118,55 @@ class Nummeraanduiding(BagMixin, rest.HALSerializer):
         )
 
 
+class NummeraanduidingRows(rest.RowSerializer):
+    serializer_class = Nummeraanduiding
+    view_name = 'nummeraanduiding-detail'
+    values = (
+        'landelijk_id',
+        'type_adres',
+        '_openbare_ruimte_naam',
+        'huisnummer',
+        'huisletter',
+        'huisnummer_toevoeging',
+        'ligplaats_id',
+        'ligplaats__status',
+        'standplaats_id',
+        'standplaats__status',
+        'verblijfsobject_id',
+        'verblijfsobject__status',
+    )
+
+    @staticmethod
+    def display(row):
+        # models.Nummeraanduiding.adres()
+        toevoegingen = []
+        if row['huisnummer']:
+            toevoegingen.append(str(row['huisnummer']))
+        if row['huisletter']:
+            toevoegingen.append(str(row['huisletter']))
+        if row['huisnummer_toevoeging']:
+            toevoegingen.append('-%s' % row['huisnummer_toevoeging'])
+        return '%s %s' % (row['_openbare_ruimte_naam'], ''.join(toevoegingen))
+
+    @staticmethod
+    def vbo_status(row):
+        # status of models.Nummeraanduiding.adresseerbaar_object
+        for adresseerbaar_object in ('ligplaats', 'standplaats', 'verblijfsobject'):
+            if row[f'{adresseerbaar_object}_id'] is not None:
+                return row[f'{adresseerbaar_object}__status']
+        return None
+
+    def to_representation(self, row):
+        return OrderedDict([
+            ('_links', self.links(row)),
+            ('_display', self.display(row)),
+            ('landelijk_id', row['landelijk_id']),
+            ('type_adres', row['type_adres']),
+            ('vbo_status', self.vbo_status(row)),
+            ('dataset', BagMixin.dataset),
+        ])
+
+
 class Ligplaats(BagMixin, rest.HALSerializer):
     _display = rest.DisplayField()
 
@@ -161,6 +215,47 @@ class Verblijfsobject(BagMixin, rest.HALSerializer):
         return True if obj.hoofdadres else None
 
 
+class VerblijfsobjectRows(rest.RowSerializer):
+    serializer_class = Verblijfsobject
+    view_name = 'verblijfsobject-detail'
+    values = (
+        'landelijk_id',
+        'id',
+        'status',
+        '_openbare_ruimte_naam',
+        '_huisnummer',
+        '_huisletter',
+        '_huisnummer_toevoeging',
+        'has_hoofdadres',
+    )
+
+    def annotate(self, queryset):
+        hoofdadressen = models.Nummeraanduiding.objects.filter(
+            verblijfsobject=OuterRef('pk'), type_adres='Hoofdadres')
+        return queryset.annotate(has_hoofdadres=Exists(hoofdadressen))
+
+    @staticmethod
+    def display(row):
+        # models.Verblijfsobject.__str__
+        result = '{} {}'.format(row['_openbare_ruimte_naam'], row['_huisnummer'])
+        if row['_huisletter']:
+            result += row['_huisletter']
+        if row['_huisnummer_toevoeging']:
+            result += '-' + row['_huisnummer_toevoeging']
+        return result
+
+    def to_representation(self, row):
+        return OrderedDict([
+            ('_links', self.links(row)),
+            ('_display', self.display(row)),
+            ('landelijk_id', row['landelijk_id']),
+            ('id', row['id']),
+            ('status', row['status']),
+            ('hoofdadres', True if row['has_hoofdadres'] else None),
+            ('dataset', BagMixin.dataset),
+        ])
+
+
 class Pand(BagMixin, rest.HALSerializer):
     _display = rest.DisplayField()
 
@@ -173,6 +268,21 @@ class Pand(BagMixin, rest.HALSerializer):
         )
 
 
+class PandRows(rest.RowSerializer):
+    serializer_class = Pand
+    view_name = 'pand-detail'
+    values = ('landelijk_id',)
+
+    def to_representation(self, row):
+        return OrderedDict([
+            ('_links', self.links(row)),
+            # models.Pand.__str__
+            ('_display', '{}'.format(row['landelijk_id'])),
+            ('landelijk_id', row['landelijk_id']),
+            ('dataset', BagMixin.dataset),
+        ])
+
+
 class Stadsdeel(GebiedenMixin, rest.HALSerializer):
     _display = rest.DisplayField()
 
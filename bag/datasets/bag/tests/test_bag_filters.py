@@ -6,7 +6,8 @@ from rest_framework.test import APITransactionTestCase
 
 from datasets.bag.tests import factories as bag_factories
 from datasets.brk.tests import factories as brk_factories
-from datasets.bag.batch import DenormalizeDataTask
+from datasets.bag.batch import DenormalizeDataTask, ImportPandNummeraanduidingTask
+from datasets.brk.batch import ImportKadastraalObjectNummeraanduidingTask
 
 LOG = logging.getLogger(__name__)
 
@@ -79,6 +80,10 @@ class Numfilter(APITransactionTestCase):
         # fill _geom at nummeraanduiding
         DenormalizeDataTask().process()
 
+        # adressen per pand and per kot for the filters
+        ImportPandNummeraanduidingTask().process()
+        ImportKadastraalObjectNummeraanduidingTask().process()
+
     def test_kot_filter(self):
         url = f'/bag/v1.1/nummeraanduiding/?kadastraalobject={self.kot.id}'
         response = self.client.get(url)
@@ -100,6 +105,14 @@ class Numfilter(APITransactionTestCase):
         self.assertEqual(
             self.num.landelijk_id,
             data['results'][0]['landelijk_id'])
+        self.assertEqual(len(data['results']), 1)
+
+    def test_unknown_pand_filter(self):
+        url = '/bag/v1.1/nummeraanduiding/?pand=0000000000000000'
+        response = self.client.get(url)
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(response.json()['results'], [])
 
     def test_vbo_filter(self):
         url = f'/bag/v1.1/nummeraanduiding/?verblijfsobject={self.vbo.landelijk_id}'
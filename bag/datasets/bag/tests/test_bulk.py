@@ -0,0 +1,55 @@
+from rest_framework.test import APITransactionTestCase
+
+from datasets.bag.tests import factories as bag_factories
+from datasets.brk.tests import factories as brk_factories
+from datasets.generic.tests.authorization import AuthorizationSetup
+
+
+class BulkTest(APITransactionTestCase, AuthorizationSetup):
+
+    def setUp(self):
+        self.setUpAuthorization()
+        self.vbos = [bag_factories.VerblijfsobjectFactory.create() for _ in range(3)]
+
+    def _bulk(self, url, ids):
+        response = self.client.post(url, {'ids': ids}, format='json')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_order_and_not_found(self):
+        first, second, third = self.vbos
+        ids = [third.landelijk_id, 'onbekend', first.id, third.landelijk_id]
+
+        data = self._bulk('/bag/v1.1/verblijfsobject/bulk/', ids)
+
+        self.assertEqual(data['count'], 2)
+        results = data['results']
+        self.assertEqual(results[0]['landelijk_id'], third.landelijk_id)
+        self.assertEqual(results[1], {'_requested': 'onbekend', '_not_found': True})
+        self.assertEqual(results[2]['landelijk_id'], first.landelijk_id)
+        self.assertEqual(results[3], results[0])
+
+    def test_detail_representation(self):
+        vbo = self.vbos[0]
+        detail = self.client.get('/bag/v1.1/verblijfsobject/{}/'.format(vbo.landelijk_id)).data
+
+        data = self._bulk('/bag/v1.1/verblijfsobject/bulk/', [vbo.landelijk_id])
+        self.assertEqual(data['results'][0], detail)
+
+    def test_kadastraal_object_scopes(self):
+        kot = brk_factories.KadastraalObjectFactory.create(koopsom=1000)
+
+        data = self._bulk('/brk/object/bulk/', [kot.aanduiding])
+        self.assertNotIn('koopsom', data['results'][0])
+
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer {}'.format(self.token_scope_brk_ro))
+        data = self._bulk('/brk/object/bulk/', [kot.id])
+        self.assertEqual(data['results'][0]['id'], kot.id)
+        self.assertIn('koopsom', data['results'][0])
+
+    def test_invalid(self):
+        url = '/bag/v1.1/verblijfsobject/bulk/'
+        self.assertEqual(self.client.post(url, {}, format='json').status_code, 400)
+        self.assertEqual(self.client.post(url, {'ids': []}, format='json').status_code, 400)
+        self.assertEqual(self.client.post(url, {'ids': 'abc'}, format='json').status_code, 400)
+        self.assertEqual(self.client.post(url, {'ids': ['x'] * 1001}, format='json').status_code, 400)
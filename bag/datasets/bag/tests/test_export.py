@@ -0,0 +1,68 @@
+import csv
+import io
+import json
+from unittest import mock
+
+from rest_framework.test import APITransactionTestCase
+
+from datasets.bag.tests import factories as bag_factories
+
+
+class ExportTest(APITransactionTestCase):
+
+    url = '/bag/v1.1/verblijfsobject/export/{}/'
+
+    def setUp(self):
+        self.buurt = bag_factories.BuurtFactory.create()
+        self.vbos = [
+            bag_factories.VerblijfsobjectFactory.create(buurt=self.buurt)
+            for _ in range(3)
+        ]
+        bag_factories.VerblijfsobjectFactory.create()
+
+    def _export(self, export_format, params=None):
+        response = self.client.get(self.url.format(export_format), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_csv(self):
+        rows = list(csv.DictReader(io.StringIO(self._export('csv'))))
+        self.assertEqual(len(rows), 4)
+        self.assertEqual([row['id'] for row in rows], sorted(row['id'] for row in rows))
+        self.assertTrue(rows[0]['geometrie'].startswith('POINT('))
+
+    def test_csv_filtered(self):
+        # chunks smaller than the result
+        with self.settings(EXPORT_CHUNK_SIZE=2):
+            content = self._export('csv', {'buurt': self.buurt.id})
+
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(
+            sorted(row['landelijk_id'] for row in rows),
+            sorted(vbo.landelijk_id for vbo in self.vbos))
+        self.assertEqual({row['buurt'] for row in rows}, {self.buurt.vollcode})
+
+    def test_ndjson(self):
+        lines = self._export('ndjson').splitlines()
+        self.assertEqual(len(lines), 4)
+        row = json.loads(lines[0])
+        self.assertIn('landelijk_id', row)
+        self.assertEqual(row['geometrie']['type'], 'Point')
+
+    def test_geojson(self):
+        collection = json.loads(self._export('geojson', {'buurt': self.buurt.id}))
+        self.assertEqual(collection['type'], 'FeatureCollection')
+        self.assertEqual(len(collection['features']), 3)
+        feature = collection['features'][0]
+        self.assertEqual(feature['geometry']['type'], 'Point')
+        self.assertIn('landelijk_id', feature['properties'])
+
+    def test_no_serializers(self):
+        with mock.patch('datasets.bag.serializers.Verblijfsobject.to_representation') as to_representation:
+            self._export('ndjson')
+        to_representation.assert_not_called()
+
+    def test_unknown_format(self):
+        response = self.client.get(self.url.format('xlsx'))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,85 @@
+from rest_framework.test import APITransactionTestCase
+
+from datasets.bag.tests import factories as bag_factories
+from datasets.generic import generation
+from datasets.generic.tests.authorization import AuthorizationSetup
+from datasets.generic.tests.query_budget import QueryBudgetMixin
+
+
+class GenerationTest(APITransactionTestCase, AuthorizationSetup, QueryBudgetMixin):
+
+    url = '/gebieden/stadsdeel/'
+
+    def setUp(self):
+        self.setUpAuthorization()
+        bag_factories.StadsdeelFactory.create()
+        generation.forget_generation()
+
+    def tearDown(self):
+        generation.forget_generation()
+
+    def test_no_generation(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('ETag', response)
+
+    def test_not_modified(self):
+        generation.mark_generation('bag')
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertTrue(etag.startswith('W/"'))
+        self.assertIn('Last-Modified', response)
+        self.assertIn('public', response['Cache-Control'])
+
+        with self.assertMaxQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        # another media type is another representation
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag, HTTP_ACCEPT='text/csv')
+        self.assertEqual(response.status_code, 200)
+
+    def test_new_generation(self):
+        generation.mark_generation('bag')
+        etag = self.client.get(self.url)['ETag']
+
+        generation.mark_generation('elastic: bag')
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_private_with_scopes(self):
+        generation.mark_generation('brk')
+        public_etag = self.client.get(self.url)['ETag']
+
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer {}'.format(self.token_scope_brk_ro))
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=public_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn('Authorization', response['Vary'])
+
+    def test_not_modified_after_authorization(self):
+        generation.mark_generation('brk')
+        url = '/brk/subject/'
+
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer {}'.format(self.token_employee_plus))
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertNotIn('Last-Modified', response)
+
+        # private responses ignore If-Modified-Since
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # without the scopes the view refuses, whatever the client cached
+        self.client.credentials()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 401)
+
+        # the ETag of another url does not match
+        public_etag = self.client.get(self.url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=public_etag).status_code, 401)
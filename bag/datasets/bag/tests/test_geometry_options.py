@@ -0,0 +1,51 @@
+from django.contrib.gis.geos import MultiPolygon, Polygon
+from rest_framework.test import APITestCase
+
+from datasets.bag.tests import factories as bag_factories
+
+
+class GeometryOptionsTest(APITestCase):
+
+    def setUp(self):
+        # a square with a vertex 0.1m out of line, dropped by simplification
+        polygon = Polygon((
+            (121000.123, 487000.456), (121000, 487500), (121250, 487500.1), (121500, 487500),
+            (121500, 487000), (121000.123, 487000.456)))
+        self.stadsdeel = bag_factories.StadsdeelFactory.create(
+            geometrie=MultiPolygon(polygon, srid=28992))
+        self.url = '/gebieden/stadsdeel/{}/'.format(self.stadsdeel.id)
+
+    def _get(self, params=None):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def _ring(self, data):
+        return data['geometrie']['coordinates'][0][0]
+
+    def test_default(self):
+        data = self._get()
+        self.assertEqual(len(self._ring(data)), 6)
+        self.assertEqual(self._ring(data)[0], [121000.123, 487000.456])
+
+    def test_simplified(self):
+        data = self._get({'geometry': 'simplified', 'tolerance': 1, 'precision': 0})
+        self.assertEqual(len(self._ring(data)), 5)
+        self.assertEqual(self._ring(data)[0], [121000, 487000])
+        self.assertEqual(data['bbox'], self._get()['bbox'])
+
+    def test_wgs84(self):
+        data = self._get({'srid': 4326, 'precision': 5})
+        lon, lat = self._ring(data)[0]
+        self.assertAlmostEqual(lon, 4.9, delta=0.1)
+        self.assertAlmostEqual(lat, 52.37, delta=0.1)
+
+    def test_bbox_and_none(self):
+        for mode in ('bbox', 'none'):
+            data = self._get({'geometry': mode})
+            self.assertIsNone(data['geometrie'])
+            self.assertEqual(len(data['bbox']), 4)
+
+    def test_invalid(self):
+        for params in ({'geometry': 'round'}, {'tolerance': 'x'}, {'tolerance': 0}, {'srid': 3857}):
+            self.assertEqual(self.client.get(self.url, params).status_code, 400)
@@ -0,0 +1,46 @@
+from django.contrib.gis.geos import Point
+from rest_framework.test import APITransactionTestCase
+
+from datasets.bag.tests import factories as bag_factories
+
+
+class NearestTest(APITransactionTestCase):
+
+    def setUp(self):
+        self.vbos = [
+            bag_factories.VerblijfsobjectFactory.create(geometrie=Point(121000 + dx, 487000, srid=28992))
+            for dx in (100, 0, 10)
+        ]
+        self.nearest_first = [self.vbos[1].landelijk_id, self.vbos[2].landelijk_id, self.vbos[0].landelijk_id]
+
+    def _ids(self, url, params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return [vbo['landelijk_id'] for vbo in response.data['results']]
+
+    def test_nearest_rd(self):
+        ids = self._ids('/bag/v1.1/verblijfsobject/nearest/', {'nearest': '121001,487000', 'n': 2})
+        self.assertEqual(ids, self.nearest_first[:2])
+
+    def test_nearest_wgs84(self):
+        point = Point(121001, 487000, srid=28992).transform(4326, clone=True)
+        ids = self._ids('/bag/v1.1/verblijfsobject/nearest/', {'nearest': f'{point.y},{point.x}'})
+        self.assertEqual(ids, self.nearest_first)
+
+    def test_list_filter(self):
+        ids = self._ids('/bag/v1.1/verblijfsobject/', {'nearest': '121001,487000'})
+        self.assertEqual(ids, self.nearest_first)
+
+    def test_nummeraanduiding(self):
+        for vbo in self.vbos:
+            bag_factories.NummeraanduidingFactory.create(verblijfsobject=vbo, _geom=vbo.geometrie)
+
+        response = self.client.get('/bag/v1.1/nummeraanduiding/nearest/', {'nearest': '121001,487000', 'n': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 1)
+
+    def test_invalid(self):
+        url = '/bag/v1.1/verblijfsobject/nearest/'
+        self.assertEqual(self.client.get(url).status_code, 400)
+        self.assertEqual(self.client.get(url, {'nearest': '121001'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'nearest': '121001,487000', 'n': 1000}).status_code, 400)
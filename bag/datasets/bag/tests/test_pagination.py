@@ -0,0 +1,87 @@
+from unittest import mock
+
+from rest_framework.test import APITransactionTestCase
+
+from datasets.bag.tests import factories as bag_factories
+from datasets.generic import rest
+
+
+class CountFreePaginationTest(APITransactionTestCase):
+
+    url = '/bag/v1.1/nummeraanduiding/'
+
+    def setUp(self):
+        for _ in range(3):
+            bag_factories.NummeraanduidingFactory.create(postcode='1012JS')
+        bag_factories.NummeraanduidingFactory.create(postcode='1016SZ')
+
+    def test_pages(self):
+        response = self.client.get(self.url, {'page_size': 3})
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertIn('page=2', response.data['_links']['next']['href'])
+        self.assertIsNone(response.data['_links']['previous']['href'])
+        # estimated or exact, depending on whether the table was analyzed
+        self.assertGreaterEqual(response.data['count'], 4)
+
+        response = self.client.get(self.url, {'page_size': 3, 'page': 2})
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertIsNone(response.data['_links']['next']['href'])
+        self.assertIn('page=1', response.data['_links']['previous']['href'])
+        self.assertEqual(response.data['count'], 4)
+        self.assertFalse(response.data['count_estimated'])
+
+        response = self.client.get(self.url, {'page_size': 3, 'page': 3})
+        self.assertEqual(response.status_code, 404)
+
+    def test_filtered(self):
+        response = self.client.get(self.url, {'page_size': 2, 'postcode': '1012JS'})
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertEqual(response.data['count'], 3)
+        self.assertFalse(response.data['count_estimated'])
+
+    def test_estimated(self):
+        with mock.patch.object(rest.CountFreeHALPagination, 'exact_count_limit', 1):
+            response = self.client.get(self.url, {'page_size': 1, 'postcode': '1012JS'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['count_estimated'])
+        self.assertGreaterEqual(response.data['count'], 2)
+
+
+class CursorPaginationTest(APITransactionTestCase):
+
+    url = '/bag/v1.1/verblijfsobject/'
+
+    def setUp(self):
+        for _ in range(5):
+            bag_factories.VerblijfsobjectFactory.create()
+
+    def _harvest(self, params):
+        ids = []
+        response = self.client.get(self.url, params)
+        while True:
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('count', response.data)
+            ids += [vbo['id'] for vbo in response.data['results']]
+            next_link = response.data['_links']['next']['href']
+            if not next_link:
+                return ids
+            self.assertIn('cursor=', next_link)
+            response = self.client.get(next_link)
+
+    def test_harvest(self):
+        ids = self._harvest({'cursor': '', 'page_size': 2})
+        self.assertEqual(len(ids), 5)
+        self.assertEqual(ids, sorted(ids))
+
+    def test_harvest_filtered(self):
+        buurt = bag_factories.BuurtFactory.create()
+        for _ in range(3):
+            bag_factories.VerblijfsobjectFactory.create(buurt=buurt)
+
+        ids = self._harvest({'cursor': '', 'page_size': 2, 'buurt': buurt.id})
+        self.assertEqual(len(ids), 3)
+
+    def test_bad_cursor(self):
+        response = self.client.get(self.url, {'cursor': 'nonsense'})
+        self.assertEqual(response.status_code, 404)
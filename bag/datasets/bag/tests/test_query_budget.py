@@ -0,0 +1,131 @@
+from unittest import mock
+
+from django.test import override_settings
+from rest_framework.test import APITestCase, APITransactionTestCase
+
+from datasets.bag import views
+from datasets.bag.tests import factories as bag_factories
+from datasets.generic import query_budget
+from datasets.generic.tests.query_budget import QueryBudgetMixin
+
+
+class QueryBudgetTest(APITransactionTestCase, QueryBudgetMixin):
+
+    def setUp(self):
+        for _ in range(3):
+            bag_factories.PandFactory.create()
+
+    def test_within_budget(self):
+        with self.assertMaxQueries(views.PandViewSet.query_budget['list']) as recorder:
+            response = self.client.get('/bag/v1.1/pand/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(recorder.count, 0)
+        self.assertGreater(query_budget.SQL_QUERIES.count(endpoint='pand-list'), 0)
+
+    def test_over_budget(self):
+        with mock.patch.object(views.PandViewSet, 'query_budget', {'list': 1}):
+            with self.assertRaises(query_budget.QueryBudgetExceeded):
+                self.client.get('/bag/v1.1/pand/')
+
+            exceeded = query_budget.BUDGET_EXCEEDED.value(endpoint='pand-list')
+            with override_settings(QUERY_BUDGET_RAISE=False):
+                response = self.client.get('/bag/v1.1/pand/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(query_budget.BUDGET_EXCEEDED.value(endpoint='pand-list'), exceeded + 1)
+
+    def test_no_budget_for_detailed_list(self):
+        with mock.patch.object(views.PandViewSet, 'query_budget', {'list': 1}):
+            response = self.client.get('/bag/v1.1/pand/', {'detailed': 1})
+        self.assertEqual(response.status_code, 200)
+
+
+class DetailQueryBudgetTest(APITestCase, QueryBudgetMixin):
+    """
+    The relations of the detail serializers, within the budgets of their views
+    """
+
+    def setUp(self):
+        self.buurt = bag_factories.BuurtFactory.create()
+        gebieden = dict(
+            buurt=self.buurt,
+            _gebiedsgerichtwerken=bag_factories.GebiedsgerichtwerkenFactory.create(),
+            _grootstedelijkgebied=bag_factories.GrootstedelijkGebiedFactory.create(),
+        )
+        self.vbo = bag_factories.VerblijfsobjectFactory.create(**gebieden)
+        self.ligplaats = bag_factories.LigplaatsFactory.create(**gebieden)
+        self.standplaats = bag_factories.StandplaatsFactory.create(**gebieden)
+
+        for _ in range(2):
+            bag_factories.VerblijfsobjectPandRelatie.create(verblijfsobject=self.vbo)
+
+        self.hoofdadres = bag_factories.NummeraanduidingFactory.create(
+            verblijfsobject=self.vbo, type_adres='Hoofdadres')
+        self.adressen = [
+            self.hoofdadres,
+            bag_factories.NummeraanduidingFactory.create(
+                verblijfsobject=self.vbo, type_adres='Nevenadres'),
+            bag_factories.NummeraanduidingFactory.create(
+                verblijfsobject=None, ligplaats=self.ligplaats, type='03', type_adres='Hoofdadres'),
+            bag_factories.NummeraanduidingFactory.create(
+                verblijfsobject=None, standplaats=self.standplaats, type='02', type_adres='Hoofdadres'),
+        ]
+
+    def get_within_budget(self, viewset, action, url, params=None):
+        with self.assertMaxQueries(viewset.query_budget[action]):
+            response = self.client.get(url, params)
+
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_verblijfsobject(self):
+        data = self.get_within_budget(
+            views.VerblijfsobjectViewSet, 'retrieve', f'/bag/v1.1/verblijfsobject/{self.vbo.landelijk_id}/')
+
+        self.assertEqual(data['hoofdadres']['landelijk_id'], self.hoofdadres.landelijk_id)
+        self.assertEqual(data['adressen']['count'], 2)
+        self.assertEqual(data['panden']['count'], 2)
+        self.assertIsNotNone(data['bouwblok'])
+        self.assertIsNotNone(data['_woonplaats'])
+        self.assertIsNotNone(data['_grootstedelijkgebied'])
+
+    def test_ligplaats_standplaats(self):
+        for viewset, url, obj in (
+                (views.LigplaatsViewSet, '/bag/v1.1/ligplaats/{}/', self.ligplaats),
+                (views.StandplaatsViewSet, '/bag/v1.1/standplaats/{}/', self.standplaats)):
+            data = self.get_within_budget(viewset, 'retrieve', url.format(obj.landelijk_id))
+
+            self.assertIsNotNone(data['hoofdadres'])
+            self.assertIsNotNone(data['_woonplaats'])
+            self.assertIsNotNone(data['_gemeente'])
+
+    def test_nummeraanduiding(self):
+        for adres in self.adressen:
+            data = self.get_within_budget(
+                views.NummeraanduidingViewSet, 'retrieve', f'/bag/v1.1/nummeraanduiding/{adres.landelijk_id}/')
+
+            self.assertEqual(data['buurt']['code'], self.buurt.code)
+            self.assertIsNotNone(data['stadsdeel'])
+            self.assertIsNotNone(data['buurtcombinatie'])
+            self.assertIsNotNone(data['gebiedsgerichtwerken'])
+            self.assertIsNotNone(data['grootstedelijkgebied'])
+            self.assertIsNotNone(data['woonplaats'])
+            self.assertEqual(data['bouwblok'] is None, adres.verblijfsobject_id is None)
+
+    def test_nummeraanduiding_detailed_list(self):
+        data = self.get_within_budget(
+            views.NummeraanduidingViewSet, 'list_detailed', '/bag/v1.1/nummeraanduiding/', {'detailed': 1})
+
+        self.assertEqual(len(data['results']), len(self.adressen))
+        self.assertTrue(all(adres['buurt'] for adres in data['results']))
+
+    def test_pand(self):
+        pand = self.vbo.panden.first()
+        data = self.get_within_budget(views.PandViewSet, 'retrieve', f'/bag/v1.1/pand/{pand.landelijk_id}/')
+
+        self.assertEqual(data['verblijfsobjecten']['count'], 1)
+        self.assertIsNotNone(data['_gemeente'])
+
+        data = self.get_within_budget(views.PandViewSet, 'list_detailed', '/bag/v1.1/pand/', {'detailed': 1})
+        self.assertEqual(len(data['results']), 2)
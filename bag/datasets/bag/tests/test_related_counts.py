@@ -0,0 +1,59 @@
+from rest_framework.test import APITransactionTestCase
+
+from datasets.bag import models
+from datasets.bag.tests import factories as bag_factories
+from datasets.generic import rest
+
+
+class RelatedCountsTest(APITransactionTestCase):
+
+    def setUp(self):
+        self.bouwblok = bag_factories.BouwblokFactory.create()
+        self.pand = bag_factories.PandFactory.create(bouwblok=self.bouwblok)
+        self.other_pand = bag_factories.PandFactory.create(bouwblok=self.bouwblok)
+        self.empty_pand = bag_factories.PandFactory.create()
+
+        for _ in range(3):
+            bag_factories.VerblijfsobjectPandRelatie.create(pand=self.pand)
+        bag_factories.VerblijfsobjectPandRelatie.create(pand=self.other_pand)
+
+    def test_collect_related_counts(self):
+        panden = list(models.Pand.objects.order_by('id'))
+
+        with self.assertNumQueries(1):
+            rest.collect_related_counts(panden, ['verblijfsobjecten', 'bouwblok'])
+
+        for pand in panden:
+            self.assertEqual(
+                getattr(pand, rest.RELATED_COUNTS),
+                {'verblijfsobjecten': pand.verblijfsobjecten.count()})
+
+    def test_annotations(self):
+        pand = models.Pand.objects.annotate(
+            **rest.related_count_annotations(models.Pand, 'verblijfsobjecten')
+        ).get(pk=self.pand.pk)
+        self.assertEqual(pand.verblijfsobjecten_count, 3)
+
+        bouwblok = models.Bouwblok.objects.annotate(
+            **rest.related_count_annotations(models.Bouwblok, 'panden')
+        ).get(pk=self.bouwblok.pk)
+        self.assertEqual(bouwblok.panden_count, 2)
+
+    def test_details(self):
+        response = self.client.get(f'/bag/v1.1/pand/{self.pand.landelijk_id}/')
+        self.assertEqual(response.data['verblijfsobjecten']['count'], 3)
+
+        response = self.client.get(f'/gebieden/bouwblok/{self.bouwblok.id}/')
+        self.assertEqual(response.data['panden']['count'], 2)
+
+    def test_detailed_list(self):
+        response = self.client.get('/bag/v1.1/pand/', {'detailed': 1})
+        counts = {
+            pand['pandidentificatie']: pand['verblijfsobjecten']['count']
+            for pand in response.data['results']
+        }
+        self.assertEqual(counts, {
+            self.pand.landelijk_id: 3,
+            self.other_pand.landelijk_id: 1,
+            self.empty_pand.landelijk_id: 0,
+        })
@@ -0,0 +1,56 @@
+from django.contrib.gis.geos import MultiPolygon, Point, Polygon
+from rest_framework.test import APITransactionTestCase
+
+from datasets.bag.tests import factories as bag_factories
+from datasets.brk.tests import factories as brk_factories
+from datasets.generic.tests.query_budget import QueryBudgetMixin
+
+
+def square(x, y, size):
+    return MultiPolygon(Polygon.from_bbox((x, y, x + size, y + size)), srid=28992)
+
+
+class ReverseGeocodeTest(APITransactionTestCase, QueryBudgetMixin):
+
+    url = '/gebieden/reverse-geocode/'
+
+    def setUp(self):
+        self.buurt = bag_factories.BuurtFactory.create(
+            naam='Grachtengordel', vollcode='A08a', geometrie=square(121000, 487000, 100))
+        bag_factories.BuurtFactory.create(geometrie=square(122000, 487000, 100))
+        bag_factories.UnescoFactory.create(geometrie=square(125000, 487000, 100))
+
+        self.pand = bag_factories.PandFactory.create(
+            geometrie=Polygon.from_bbox((121010, 487010, 121020, 487020)))
+        self.nummeraanduidingen = [
+            bag_factories.NummeraanduidingFactory.create(_geom=Point(121015 + dx, 487015, srid=28992))
+            for dx in (50, 0, 20)
+        ]
+        brk_factories.KadastraalObjectFactory.create(poly_geom=square(121000, 487000, 50))
+
+    def test_reverse_geocode(self):
+        with self.assertMaxQueries(5):
+            response = self.client.get(self.url, {'locatie': '121015,487015', 'n': 2})
+        self.assertEqual(response.status_code, 200)
+
+        gebieden = response.data['gebieden']
+        self.assertEqual([buurt['id'] for buurt in gebieden['buurt']], [self.buurt.id])
+        self.assertEqual(gebieden['buurt'][0]['_display'], 'Grachtengordel (A08a)')
+        self.assertEqual(gebieden['unesco'], [])
+
+        self.assertEqual(
+            [adres['landelijk_id'] for adres in response.data['adressen']],
+            [self.nummeraanduidingen[1].landelijk_id, self.nummeraanduidingen[2].landelijk_id])
+        self.assertEqual(response.data['adressen'][0]['afstand'], 0)
+        self.assertEqual(response.data['pand']['landelijk_id'], self.pand.landelijk_id)
+        self.assertEqual(response.data['kadastraal_object']['afstand'], 0)
+
+    def test_wgs84(self):
+        point = Point(121015, 487015, srid=28992).transform(4326, clone=True)
+        response = self.client.get(self.url, {'locatie': f'{point.y},{point.x}'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['gebieden']['buurt']), 1)
+
+    def test_invalid(self):
+        self.assertEqual(self.client.get(self.url).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'locatie': '121015'}).status_code, 400)
@@ -0,0 +1,96 @@
+import logging
+import os
+import time
+import unittest
+from unittest import mock
+
+from rest_framework.test import APIRequestFactory, APITransactionTestCase
+
+from datasets.bag import serializers, views
+from datasets.bag.tests import factories as bag_factories
+from datasets.brk import views as brk_views
+from datasets.brk.tests import factories as brk_factories
+
+log = logging.getLogger(__name__)
+
+
+class RowSerializerTest(APITransactionTestCase):
+    """
+    The row serializers must render exactly what the DRF serializers do
+    """
+
+    def setUp(self):
+        vbo = bag_factories.VerblijfsobjectFactory.create(
+            _openbare_ruimte_naam='Prinsengracht', _huisnummer=263, _huisletter='A',
+            _huisnummer_toevoeging='2')
+        bag_factories.VerblijfsobjectFactory.create()
+        bag_factories.NummeraanduidingFactory.create(verblijfsobject=vbo, type_adres='Hoofdadres')
+        bag_factories.NummeraanduidingFactory.create(
+            verblijfsobject=None, ligplaats=bag_factories.LigplaatsFactory.create(status='Plaats aangewezen'),
+            huisletter='B', huisnummer_toevoeging='3')
+        bag_factories.PandFactory.create()
+        brk_factories.KadastraalObjectFactory.create()
+
+    def assertSameOutput(self, viewset, url, params=None):
+        fast = self.client.get(url, params)
+        self.assertEqual(fast.status_code, 200)
+
+        with mock.patch.object(viewset, 'row_serializer_class', None):
+            slow = self.client.get(url, params)
+
+        self.assertEqual(fast.content, slow.content)
+
+    def test_verblijfsobject(self):
+        url = '/bag/v1.1/verblijfsobject/'
+        self.assertSameOutput(views.VerblijfsobjectViewSet, url)
+        self.assertSameOutput(views.VerblijfsobjectViewSet, url, {'format': 'csv'})
+        self.assertSameOutput(views.VerblijfsobjectViewSet, url, {'cursor': '', 'page_size': 1})
+
+    def test_nummeraanduiding(self):
+        url = '/bag/v1.1/nummeraanduiding/'
+        self.assertSameOutput(views.NummeraanduidingViewSet, url)
+        self.assertSameOutput(views.NummeraanduidingViewSet, url, {'format': 'xml'})
+
+    def test_pand(self):
+        self.assertSameOutput(views.PandViewSet, '/bag/v1.1/pand/')
+
+    def test_kadastraal_object(self):
+        self.assertSameOutput(brk_views.KadastraalObjectViewSet, '/brk/object/')
+
+    def test_detailed(self):
+        with mock.patch.object(serializers.NummeraanduidingRows, 'many') as many:
+            response = self.client.get('/bag/v1.1/nummeraanduiding/', {'detailed': 1})
+        self.assertEqual(response.status_code, 200)
+        many.assert_not_called()
+
+
+@unittest.skipUnless(
+    os.getenv('ROW_SERIALIZER_BENCHMARK'),
+    'set ROW_SERIALIZER_BENCHMARK=1 to compare serializer cost per row')
+class RowSerializerBenchmarkTest(APITransactionTestCase):
+
+    rows = int(os.getenv('ROW_SERIALIZER_BENCHMARK_ROWS', 500))
+
+    def setUp(self):
+        for _ in range(self.rows):
+            bag_factories.NummeraanduidingFactory.create(type_adres='Hoofdadres')
+        request = APIRequestFactory().get('/bag/v1.1/verblijfsobject/')
+        self.request = views.VerblijfsobjectViewSet().initialize_request(request)
+
+    def _per_row_us(self, serialize) -> float:
+        serialize()
+        start = time.perf_counter()
+        serialize()
+        return (time.perf_counter() - start) / self.rows * 1e6
+
+    def test_benchmark(self):
+        queryset = views.VerblijfsobjectViewSet.queryset.all()
+        row_serializer = serializers.VerblijfsobjectRows(self.request)
+
+        before = self._per_row_us(lambda: serializers.Verblijfsobject(
+            queryset, many=True, context={'request': self.request}).data)
+        after = self._per_row_us(lambda: row_serializer.many(row_serializer.rows(queryset)))
+
+        log.info('verblijfsobject list, %d rows: serializer %.1fus/row, row serializer %.1fus/row, %.1fx',
+                 self.rows, before, after, before / after)
+        self.assertLess(after, before)
@@ -1,8 +1,10 @@
 import logging
+from collections import OrderedDict
 
 from django.contrib.gis.db.models.functions import Distance
 from django.contrib.gis.geos import Point
 from django.contrib.gis.measure import D
+from django.db import connection
 from django.db.models import Prefetch
 from django.shortcuts import get_object_or_404
 from django.views.generic import RedirectView
@@ -11,8 +13,12 @@ from django_filters.rest_framework import filters
 from rest_framework.reverse import reverse
 from rest_framework.metadata import SimpleMetadata
 from rest_framework import serializers as validation
+from rest_framework import viewsets
+from rest_framework.response import Response
 
-from datasets.generic import rest
+from datasets.brk import models as brk_models
+from datasets.brk import serializers as brk_serializers
+from datasets.generic import bulk, export, generation, knn, rest
 from . import serializers, models
 
 
@@ -31,21 +37,13 @@ def parse_xyr(value: str) -> (Point, int):
         )
 
     try:
-        # Converting , to . and then to float
-        x = float(x)
-        y = float(y)
+        point = knn.parse_point(x, y)
         radius = int(radius)
     except ValueError:
         raise validation.ValidationError(
             "Locatie must be x: float, y: float, r: int"
         )
 
-    # Checking if the given coords are in RD, otherwise converting
-    if y > 10:
-        point = Point(x, y, srid=28992)
-    else:
-        point = Point(y, x, srid=4326).transform(28992, clone=True)
-
     return point, radius
 
 
@@ -62,6 +60,30 @@ class ExpansionMetadata(SimpleMetadata):
         return result
 
 
+# The adressen of an adresseerbaar object, for its hoofdadres and woonplaats
+ADRESSEN = Prefetch(
+    'adressen', queryset=models.Nummeraanduiding.objects.select_related('openbare_ruimte__woonplaats'))
+
+
+def nummeraanduiding_details(queryset):
+    """
+    Loads the relations NummeraanduidingDetail shows. The buurt and
+    gebieden are those of the ligplaats, standplaats or verblijfsobject,
+    the bouwblok that of the panden of the verblijfsobject.
+    """
+    gebieden = ('buurt__buurtcombinatie', 'buurt__stadsdeel', '_gebiedsgerichtwerken', '_grootstedelijkgebied')
+    return queryset.prefetch_related(
+        Prefetch('verblijfsobject__panden',
+                 queryset=models.Pand.objects.select_related('bouwblok'))
+    ).select_related(
+        'openbare_ruimte',
+        'openbare_ruimte__woonplaats',
+        *(f'{adresseerbaar_object}__{relation}'
+          for adresseerbaar_object in ('ligplaats', 'standplaats', 'verblijfsobject')
+          for relation in gebieden),
+    )
+
+
 class LigplaatsViewSet(rest.DatapuntViewSet):
     """
     Ligplaats
@@ -85,18 +107,19 @@ class LigplaatsViewSet(rest.DatapuntViewSet):
         'buurt__stadsdeel',
         'buurt__stadsdeel__gemeente',
         '_gebiedsgerichtwerken',
-
-    )
+        '_grootstedelijkgebied',
+    ).prefetch_related(ADRESSEN)
     serializer_detail_class = serializers.LigplaatsDetail
     serializer_class = serializers.Ligplaats
+    query_budget = {'list': 4, 'retrieve': 4}
     filterset_fields = ('buurt', 'buurt__vollcode', 'landelijk_id')
 
     def get_object(self):
         pk = self.kwargs['pk']
         if pk and len(pk) == 16:
-            obj = get_object_or_404(models.Ligplaats, landelijk_id=pk)
+            obj = get_object_or_404(self.get_queryset(), landelijk_id=pk)
         else:
-            obj = get_object_or_404(models.Ligplaats, pk=pk)
+            obj = get_object_or_404(self.get_queryset(), pk=pk)
 
         return obj
 
@@ -122,9 +145,11 @@ class StandplaatsViewSet(rest.DatapuntViewSet):
         'buurt__stadsdeel',
         'buurt__stadsdeel__gemeente',
         '_gebiedsgerichtwerken',
-    )
+        '_grootstedelijkgebied',
+    ).prefetch_related(ADRESSEN)
     serializer_detail_class = serializers.StandplaatsDetail
     serializer_class = serializers.Standplaats
+    query_budget = {'list': 4, 'retrieve': 4}
     filterset_fields = (
         'buurt',
         'buurt__vollcode',
@@ -134,9 +159,9 @@ class StandplaatsViewSet(rest.DatapuntViewSet):
     def get_object(self):
         pk = self.kwargs['pk']
         if pk and len(pk) == 16:
-            obj = get_object_or_404(models.Standplaats, landelijk_id=pk)
+            obj = get_object_or_404(self.get_queryset(), landelijk_id=pk)
         else:
-            obj = get_object_or_404(models.Standplaats, pk=pk)
+            obj = get_object_or_404(self.get_queryset(), pk=pk)
 
         return obj
 
@@ -146,6 +171,7 @@ class VerblijfsobjectFilter(FilterSet):
     pand = filters.CharFilter(method="pand_filter", label="pand")
     panden__id = filters.CharFilter(method="pand_filter")
     panden__landelijk_id = filters.CharFilter(method="pand_filter")
+    nearest = filters.CharFilter(method="nearest_filter", label='x,y')
 
     class Meta:
         model = models.Verblijfsobject
@@ -172,8 +198,14 @@ class VerblijfsobjectFilter(FilterSet):
         else:
             return queryset.filter(panden__id=value)
 
+    def nearest_filter(self, queryset, _filter_name, value):
+        """
+        Nearest first, see knn.order_by_distance
+        """
+        return knn.order_by_distance(queryset, value, 'geometrie')
+
 
-class VerblijfsobjectViewSet(rest.DatapuntViewSet):
+class VerblijfsobjectViewSet(export.ExportMixin, knn.NearestMixin, bulk.BulkMixin, rest.DatapuntViewSet):
     """
     Verblijfsobject
 
@@ -195,20 +227,49 @@ class VerblijfsobjectViewSet(rest.DatapuntViewSet):
         'buurt__buurtcombinatie',
         'buurt__stadsdeel',
         'buurt__stadsdeel__gemeente',
-        'eigendomsverhouding',
         '_gebiedsgerichtwerken',
+        '_grootstedelijkgebied',
+    ).prefetch_related(
+        ADRESSEN,
+        # willekeurig_pand and its bouwblok
+        Prefetch('panden', queryset=models.Pand.objects.select_related('bouwblok')),
     )
     serializer_detail_class = serializers.VerblijfsobjectDetail
     serializer_class = serializers.Verblijfsobject
+    query_budget = {'list': 5, 'retrieve': 5}
+    pagination_class = rest.CountFreeHALPagination
+    cache_detail = True
+    row_serializer_class = serializers.VerblijfsobjectRows
+    bulk_keys = ('pk', 'landelijk_id')
 
     filterset_class = VerblijfsobjectFilter
 
+    export_fields = (
+        'id',
+        'landelijk_id',
+        ('openbare_ruimte', '_openbare_ruimte_naam'),
+        ('huisnummer', '_huisnummer'),
+        ('huisletter', '_huisletter'),
+        ('huisnummer_toevoeging', '_huisnummer_toevoeging'),
+        'status',
+        'gebruik',
+        'oppervlakte',
+        'verdieping_toegang',
+        'bouwlagen',
+        'aantal_kamers',
+        'eigendomsverhouding',
+        ('buurt', 'buurt__vollcode'),
+        'begin_geldigheid',
+        'einde_geldigheid',
+    )
+    export_geometry = 'geometrie'
+
     def get_object(self):
         pk = self.kwargs['pk']
         if pk and len(pk) == 16:
-            obj = get_object_or_404(models.Verblijfsobject, landelijk_id=pk)
+            obj = get_object_or_404(self.get_queryset(), landelijk_id=pk)
         else:
-            obj = get_object_or_404(models.Verblijfsobject, pk=pk)
+            obj = get_object_or_404(self.get_queryset(), pk=pk)
 
         return obj
 
@@ -228,6 +289,7 @@ class NummeraanduidingFilter(FilterSet):
     huisnummer_toevoeging = filters.CharFilter()
     openbare_ruimte = filters.CharFilter(method="openbare_ruimte_filter")
     locatie = filters.CharFilter(method="locatie_filter", label='x,y,r')
+    nearest = filters.CharFilter(method="nearest_filter", label='x,y')
 
     pand = filters.CharFilter(method="pand_filter", label='pand')
 
@@ -250,6 +312,7 @@ class NummeraanduidingFilter(FilterSet):
             'pand',
             'kadastraalobject',
             'locatie',
+            'nearest',
         ]
 
     def postcode_filter(self, queryset, _filter_name, value):
@@ -287,6 +350,12 @@ class NummeraanduidingFilter(FilterSet):
 
         return qs.order_by('afstand')
 
+    def nearest_filter(self, queryset, _filter_name, value):
+        """
+        Nearest first, see knn.order_by_distance
+        """
+        return knn.order_by_distance(queryset, value, '_geom')
+
     def pand_filter(self, queryset, _filter_name, value):
         """
         Filter using a pand landelijk id
@@ -294,19 +363,13 @@ class NummeraanduidingFilter(FilterSet):
         queryset = queryset.prefetch_related(None)
         queryset = queryset.select_related(None)
         # ligplaatsen en standplaatsen hebben we NIET nodig.
-        m_po = models.Pand.objects
-        pand = m_po.get(landelijk_id=value)   # noqa
-        ids = pand.verblijfsobjecten.values_list(
-            'adressen__landelijk_id', flat=True)
-        return queryset.filter(landelijk_id__in=ids)
+        # pand - adres relaties worden bij de import berekend
+        return queryset.filter(pand_relaties__pand_landelijk_id=value)
 
     def kot_filter(self, queryset, _filter_name, value):
         """Filter based on the kadastral object"""
-        m_vbo = models.Verblijfsobject.objects
-        vbos = m_vbo.select_related('adressen').filter(
-            kadastrale_objecten__id=value)
-        ids = vbos.values_list('adressen__landelijk_id', flat=True)
-        return queryset.filter(landelijk_id__in=ids)
+        # kot - adres relaties worden bij de import berekend
+        return queryset.filter(kadastraal_object_relaties__kadastraal_object_id=value)
 
     def vbo_filter(self, queryset, _filter_name, value):
         """Filter based on verblijfsobject"""
@@ -337,7 +400,7 @@ class NummeraanduidingFilter(FilterSet):
         return queryset
 
 
-class NummeraanduidingViewSet(rest.DatapuntViewSet):
+class NummeraanduidingViewSet(export.ExportMixin, knn.NearestMixin, bulk.BulkMixin, rest.DatapuntViewSet):
     """
     Nummeraanduiding
 
@@ -364,34 +427,55 @@ class NummeraanduidingViewSet(rest.DatapuntViewSet):
             'ligplaats',
         )
     )
-    queryset_detail = models.Nummeraanduiding.objects.prefetch_related(
-        Prefetch('verblijfsobject__panden',
-                 queryset=models.Pand.objects.select_related('bouwblok'))
-    ).select_related(
-        'openbare_ruimte',
-        'openbare_ruimte__woonplaats',
-        'verblijfsobject',
-        'verblijfsobject__buurt',
-        'verblijfsobject__buurt__buurtcombinatie',
-        'verblijfsobject__buurt__stadsdeel',
-    )
+    queryset_detail = nummeraanduiding_details(models.Nummeraanduiding.objects.all())
     serializer_detail_class = serializers.NummeraanduidingDetail
     serializer_class = serializers.Nummeraanduiding
+    query_budget = {'list': 4, 'list_detailed': 5, 'retrieve': 3}
+    pagination_class = rest.CountFreeHALPagination
+    cache_detail = True
+    row_serializer_class = serializers.NummeraanduidingRows
+    bulk_keys = ('pk', 'landelijk_id')
     filterset_class = NummeraanduidingFilter
     detailed_keyword = 'detailed'
 
+    export_fields = (
+        'id',
+        'landelijk_id',
+        ('openbare_ruimte', '_openbare_ruimte_naam'),
+        'huisnummer',
+        'huisletter',
+        'huisnummer_toevoeging',
+        'postcode',
+        'type',
+        'type_adres',
+        'status',
+        'verblijfsobject',
+        'ligplaats',
+        'standplaats',
+        'begin_geldigheid',
+        'einde_geldigheid',
+    )
+    export_geometry = '_geom'
+
     def list(self, request, *args, **kwargs):
         # Checking if a detailed response is required
         if request.GET.get(self.detailed_keyword, False):
             self.serializer_class = self.serializer_detail_class
         return super().list(request, *args, **kwargs)
 
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.is_detailed_list():
+            # after the filters, the pand filter drops the relations
+            queryset = nummeraanduiding_details(queryset)
+        return queryset
+
     def get_object(self):
         pk = self.kwargs['pk']
         if pk and len(pk) == 16:
-            obj = get_object_or_404(models.Nummeraanduiding, landelijk_id=pk)
+            obj = get_object_or_404(self.get_queryset(), landelijk_id=pk)
         else:
-            obj = get_object_or_404(models.Nummeraanduiding, pk=pk)
+            obj = get_object_or_404(self.get_queryset(), pk=pk)
 
         return obj
 
@@ -405,6 +489,7 @@ class PandenFilter(FilterSet):
     verblijfsobjecten__id = filters.CharFilter(method="vbo_filter", label="vbo_id")
 
     locatie = filters.CharFilter(method="locatie_filter", label='locatie')
+    nearest = filters.CharFilter(method="nearest_filter", label='x,y')
 
     detailed = filters.BooleanFilter(method="dummy_filter", label='detailed', help_text='Show all fields')
 
@@ -420,6 +505,7 @@ class PandenFilter(FilterSet):
             'bouwblok__buurt',
             'bouwblok__buurt__stadsdeel',
             'locatie',
+            'nearest',
         )
 
     def vbo_filter(self, queryset, _filter_name, value):
@@ -445,6 +531,12 @@ class PandenFilter(FilterSet):
 
         return opr.order_by('afstand')
 
+    def nearest_filter(self, queryset, _filter_name, value):
+        """
+        Nearest first, see knn.order_by_distance
+        """
+        return knn.order_by_distance(queryset, value, 'geometrie')
+
     def dummy_filter(self, queryset, _filter_name, value):
         """Dummy filter to add detailed parameter to Swagger"""
         return queryset
@@ -460,7 +552,7 @@ class PandPager(rest.HALPagination):
     max_page_size = 100
 
 
-class PandViewSet(rest.DatapuntViewSet):
+class PandViewSet(export.ExportMixin, knn.NearestMixin, bulk.BulkMixin, rest.DatapuntViewSet):
     """
     Pand
 
@@ -488,24 +580,45 @@ class PandViewSet(rest.DatapuntViewSet):
         'bouwblok__buurt__stadsdeel',
         'bouwblok__buurt__buurtcombinatie',
         'bouwblok__buurt__stadsdeel__gemeente',
-    ).prefetch_related(
-        'verblijfsobjecten'
     )
 
     serializer_detail_class = serializers.PandDetail
     serializer_class = serializers.Pand
+    # The buurt of a pand without bouwblok is a spatial query, one per
+    # pand in a detailed list
+    query_budget = {'list': 6, 'list_detailed': 7 + PandPager.page_size, 'retrieve': 4}
     pagination_class = PandPager
+    cache_detail = True
+    row_serializer_class = serializers.PandRows
+    bulk_keys = ('pk', 'landelijk_id')
 
     filterset_class = PandenFilter
 
     detailed_keyword = 'detailed'
 
+    export_fields = (
+        'id',
+        'landelijk_id',
+        'pandnaam',
+        'bouwjaar',
+        'bouwlagen',
+        'laagste_bouwlaag',
+        'hoogste_bouwlaag',
+        'status',
+        'ligging',
+        'type_woonobject',
+        ('bouwblok', 'bouwblok__code'),
+        'begin_geldigheid',
+        'einde_geldigheid',
+    )
+    export_geometry = 'geometrie'
+
     def get_object(self):
         pk = self.kwargs['pk']
         if pk and len(pk) == 16:
-            obj = get_object_or_404(models.Pand, landelijk_id=pk)
+            obj = get_object_or_404(self.get_queryset(), landelijk_id=pk)
         else:
-            obj = get_object_or_404(models.Pand, pk=pk)
+            obj = get_object_or_404(self.get_queryset(), pk=pk)
 
         return obj
 
@@ -515,6 +628,15 @@ class PandViewSet(rest.DatapuntViewSet):
             self.serializer_class = self.serializer_detail_class
         return super().list(request, *args, **kwargs)
 
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.is_detailed_list():
+            queryset = queryset.select_related(
+                'bouwblok__buurt__buurtcombinatie',
+                'bouwblok__buurt__stadsdeel__gemeente',
+            )
+        return queryset
+
 
 class OpenbareRuimteFilter(FilterSet):
     """
@@ -522,6 +644,7 @@ class OpenbareRuimteFilter(FilterSet):
     """
 
     locatie = filters.CharFilter(method="locatie_filter", label='locatie')
+    nearest = filters.CharFilter(method="nearest_filter", label='x,y')
 
     class Meta:
         model = models.OpenbareRuimte
@@ -531,6 +654,7 @@ class OpenbareRuimteFilter(FilterSet):
             'naam',
             'type',
             'locatie',
+            'nearest',
             'adressen__postcode',
             'adressen__huisnummer',
             'adressen__huisletter',
@@ -552,8 +676,14 @@ class OpenbareRuimteFilter(FilterSet):
 
         return opr.order_by('afstand')
 
+    def nearest_filter(self, queryset, _filter_name, value):
+        """
+        Nearest first, see knn.order_by_distance
+        """
+        return knn.order_by_distance(queryset, value, 'geometrie')
+
 
-class OpenbareRuimteViewSet(rest.DatapuntViewSet):
+class OpenbareRuimteViewSet(knn.NearestMixin, rest.DatapuntViewSet):
     """
     OpenbareRuimte
 
@@ -576,17 +706,19 @@ class OpenbareRuimteViewSet(rest.DatapuntViewSet):
 
     metadata_class = ExpansionMetadata
     queryset = models.OpenbareRuimte.objects.distinct()
+    queryset_detail = models.OpenbareRuimte.objects.select_related('woonplaats')
     serializer_detail_class = serializers.OpenbareRuimteDetail
     serializer_class = serializers.OpenbareRuimte
+    query_budget = {'list': 3, 'retrieve': 3}
 
     filterset_class = OpenbareRuimteFilter
 
     def get_object(self):
         pk = self.kwargs['pk']
         if pk and len(pk) == 16:
-            obj = get_object_or_404(models.OpenbareRuimte, landelijk_id=pk)
+            obj = get_object_or_404(self.get_queryset(), landelijk_id=pk)
         else:
-            obj = get_object_or_404(models.OpenbareRuimte, pk=pk)
+            obj = get_object_or_404(self.get_queryset(), pk=pk)
 
         return obj
 
@@ -606,8 +738,10 @@ class WoonplaatsViewSet(rest.DatapuntViewSet):
 
     metadata_class = ExpansionMetadata
     queryset = models.Woonplaats.objects.all().order_by('id')
+    queryset_detail = models.Woonplaats.objects.select_related('gemeente')
     serializer_detail_class = serializers.WoonplaatsDetail
     serializer_class = serializers.Woonplaats
+    query_budget = {'list': 3, 'retrieve': 3}
 
     filterset_fields = (
         'naam',
@@ -617,14 +751,14 @@ class WoonplaatsViewSet(rest.DatapuntViewSet):
     def get_object(self):
         pk = self.kwargs['pk']
         if pk and len(pk) <= 4:
-            obj = get_object_or_404(models.Woonplaats, landelijk_id=pk)
+            obj = get_object_or_404(self.get_queryset(), landelijk_id=pk)
         else:
-            obj = get_object_or_404(models.Woonplaats, pk=pk)
+            obj = get_object_or_404(self.get_queryset(), pk=pk)
 
         return obj
 
 
-class StadsdeelViewSet(rest.DatapuntViewSet):
+class StadsdeelViewSet(export.ExportMixin, rest.DatapuntViewSet):
     """
     Stadsdeel
 
@@ -642,20 +776,23 @@ class StadsdeelViewSet(rest.DatapuntViewSet):
     )
     serializer_detail_class = serializers.StadsdeelDetail
     serializer_class = serializers.Stadsdeel
+    query_budget = {'list': 3, 'retrieve': 3}
 
     filterset_fields = ('code',)
+    export_fields = ('id', 'code', 'naam', 'begin_geldigheid', 'einde_geldigheid')
+    export_geometry = 'geometrie'
 
     def get_object(self):
         pk = self.kwargs['pk']
         if pk and len(pk) == 1:
-            obj = get_object_or_404(models.Stadsdeel, code=pk)
+            obj = get_object_or_404(self.get_queryset(), code=pk)
         else:
-            obj = get_object_or_404(models.Stadsdeel, pk=pk)
+            obj = get_object_or_404(self.get_queryset(), pk=pk)
 
         return obj
 
 
-class BuurtViewSet(rest.DatapuntViewSet):
+class BuurtViewSet(export.ExportMixin, rest.DatapuntViewSet):
     """
     Buurt
 
@@ -676,12 +813,20 @@ class BuurtViewSet(rest.DatapuntViewSet):
     )
     serializer_detail_class = serializers.BuurtDetail
     serializer_class = serializers.Buurt
+    query_budget = {'list': 6, 'retrieve': 3}
     filterset_fields = (
         'stadsdeel', 'buurtcombinatie', 'gebiedsgerichtwerken',
         'code', 'vollcode')
+    export_fields = (
+        'id', 'code', 'vollcode', 'naam',
+        ('stadsdeel', 'stadsdeel__code'),
+        ('buurtcombinatie', 'buurtcombinatie__vollcode'),
+        ('gebiedsgerichtwerken', 'gebiedsgerichtwerken__code'),
+        'begin_geldigheid', 'einde_geldigheid')
+    export_geometry = 'geometrie'
 
 
-class BouwblokViewSet(rest.DatapuntViewSet):
+class BouwblokViewSet(export.ExportMixin, rest.DatapuntViewSet):
     """
     Bouwblok
 
@@ -699,24 +844,29 @@ class BouwblokViewSet(rest.DatapuntViewSet):
     queryset = models.Bouwblok.objects.all()
     queryset_detail = models.Bouwblok.objects.select_related(
         'buurt',
+        'buurt__buurtcombinatie',
         'buurt__stadsdeel',
         'buurt__stadsdeel__gemeente',
     )
     serializer_detail_class = serializers.BouwblokDetail
     serializer_class = serializers.Bouwblok
+    query_budget = {'list': 4, 'retrieve': 3}
     filterset_fields = ('buurt', 'code')
+    export_fields = (
+        'id', 'code', ('buurt', 'buurt__vollcode'), 'begin_geldigheid', 'einde_geldigheid')
+    export_geometry = 'geometrie'
 
     def get_object(self):
         pk = self.kwargs['pk']
         if pk and len(pk) == 4:
-            obj = get_object_or_404(models.Bouwblok, code=pk)
+            obj = get_object_or_404(self.get_queryset(), code=pk)
         else:
-            obj = get_object_or_404(models.Bouwblok, pk=pk)
+            obj = get_object_or_404(self.get_queryset(), pk=pk)
 
         return obj
 
 
-class BuurtcombinatieViewSet(rest.DatapuntViewSet):
+class BuurtcombinatieViewSet(export.ExportMixin, rest.DatapuntViewSet):
     """
     Buurtcombinatie
 
@@ -735,12 +885,17 @@ class BuurtcombinatieViewSet(rest.DatapuntViewSet):
     )
     serializer_detail_class = serializers.BuurtcombinatieDetail
     serializer_class = serializers.Buurtcombinatie
+    query_budget = {'list': 5, 'retrieve': 3}
     filterset_fields = (
         'stadsdeel', 'vollcode', 'code', 'naam', 'stadsdeel',
         'buurten')
+    export_fields = (
+        'id', 'code', 'vollcode', 'naam', ('stadsdeel', 'stadsdeel__code'),
+        'begin_geldigheid', 'einde_geldigheid')
+    export_geometry = 'geometrie'
 
 
-class GebiedsgerichtwerkenViewSet(rest.DatapuntViewSet):
+class GebiedsgerichtwerkenViewSet(export.ExportMixin, rest.DatapuntViewSet):
     """
     Gebiedsgerichtwerken
 
@@ -755,10 +910,14 @@ class GebiedsgerichtwerkenViewSet(rest.DatapuntViewSet):
 
     metadata_class = ExpansionMetadata
     queryset = models.Gebiedsgerichtwerken.objects.all().order_by('naam')
+    queryset_detail = models.Gebiedsgerichtwerken.objects.select_related('stadsdeel')
     serializer_detail_class = serializers.GebiedsgerichtwerkenDetail
     serializer_class = serializers.Gebiedsgerichtwerken
+    query_budget = {'list': 4, 'retrieve': 3}
 
     filterset_fields = ('stadsdeel__id', 'stadsdeel')
+    export_fields = ('id', 'code', 'naam', ('stadsdeel', 'stadsdeel__code'))
+    export_geometry = 'geometrie'
 
 
 class GebiedsgerichtwerkenPraktijkgebiedenViewSet(rest.DatapuntViewSet):
@@ -778,9 +937,10 @@ class GebiedsgerichtwerkenPraktijkgebiedenViewSet(rest.DatapuntViewSet):
     queryset = models.GebiedsgerichtwerkenPraktijkgebieden.objects.all().order_by('naam')
     serializer_detail_class = serializers.GebiedsgerichtwerkenPraktijkgebiedenDetail
     serializer_class = serializers.GebiedsgerichtwerkenPraktijkgebieden
+    query_budget = {'list': 3, 'retrieve': 2}
 
 
-class GrootstedelijkgebiedViewSet(rest.DatapuntViewSet):
+class GrootstedelijkgebiedViewSet(export.ExportMixin, rest.DatapuntViewSet):
     """
     Grootstedelijkgebied
 
@@ -795,9 +955,12 @@ class GrootstedelijkgebiedViewSet(rest.DatapuntViewSet):
     queryset = models.Grootstedelijkgebied.objects.all().order_by('naam')
     serializer_detail_class = serializers.GrootstedelijkgebiedDetail
     serializer_class = serializers.Grootstedelijkgebied
+    query_budget = {'list': 3, 'retrieve': 2}
+    export_fields = ('id', 'naam', 'gsg_type')
+    export_geometry = 'geometrie'
 
 
-class UnescoViewSet(rest.DatapuntViewSet):
+class UnescoViewSet(export.ExportMixin, rest.DatapuntViewSet):
     """
     Unseco
 
@@ -814,6 +977,123 @@ class UnescoViewSet(rest.DatapuntViewSet):
     queryset = models.Unesco.objects.all()
     serializer_detail_class = serializers.UnescoDetail
     serializer_class = serializers.Unesco
+    query_budget = {'list': 3, 'retrieve': 2}
+    export_fields = ('id', 'naam')
+    export_geometry = 'geometrie'
+
+
+# layer, model, detail view and the columns of its __str__
+GEBIEDEN_LAYERS = (
+    ('stadsdeel', models.Stadsdeel, 'stadsdeel-detail', ('naam', 'code')),
+    ('buurtcombinatie', models.Buurtcombinatie, 'buurtcombinatie-detail', ('naam', 'code')),
+    ('buurt', models.Buurt, 'buurt-detail', ('naam', 'vollcode')),
+    ('bouwblok', models.Bouwblok, 'bouwblok-detail', ('code',)),
+    ('gebiedsgerichtwerken', models.Gebiedsgerichtwerken, 'gebiedsgerichtwerken-detail', ('naam', 'code')),
+    ('grootstedelijkgebied', models.Grootstedelijkgebied, 'grootstedelijkgebied-detail', ('naam',)),
+    ('unesco', models.Unesco, 'unesco-detail', ('naam',)),
+)
+
+
+def containing_gebieden(point: Point) -> dict:
+    """
+    Areas of every gebieden layer that contain `point`, in one statement
+    of GiST assisted ST_Contains lookups
+    """
+    selects = []
+    params = []
+    for layer, model, _, columns in GEBIEDEN_LAYERS:
+        values = ', '.join(columns + ('NULL',) * (2 - len(columns)))
+        selects.append(
+            f'SELECT %s::text, id::text, {values} FROM {model._meta.db_table} '
+            f'WHERE ST_Contains(geometrie, ST_SetSRID(ST_MakePoint(%s, %s), 28992))')
+        params.extend([layer, point.x, point.y])
+
+    with connection.cursor() as cursor:
+        cursor.execute(' UNION ALL '.join(selects) + ' ORDER BY 1, 2', params)
+        rows = cursor.fetchall()
+
+    found = {layer: [] for layer, *_ in GEBIEDEN_LAYERS}
+    for layer, pk, *values in rows:
+        found[layer].append((pk, values))
+    return found
+
+
+def nearest_rows(row_serializer, queryset, geometry_field: str, point: Point, n: int) -> list:
+    """
+    The `n` objects nearest to `point`, rendered by `row_serializer` with
+    their distance
+    """
+    queryset = knn.order_by_point(
+        queryset.filter(**{f'{geometry_field}__isnull': False}), point, geometry_field)
+
+    results = []
+    for row in row_serializer.rows(queryset, 'afstand')[:n]:
+        result = row_serializer.to_representation(row)
+        result['afstand'] = round(row['afstand'].m, 2)
+        results.append(result)
+    return results
+
+
+class ReverseGeocodeViewSet(generation.GenerationCacheMixin, viewsets.ViewSet):
+    """
+    Reverse geocode
+
+    Alle gebieden waarin het punt `locatie` ligt, met de `n` dichtstbijzijnde
+    adressen en het dichtstbijzijnde pand en kadastraal object, in één
+    antwoord.
+
+    `locatie` is rdx,rdy of lat,lon, `n` is standaard 10.
+    """
+    renderer_classes = rest.DEFAULT_RENDERERS
+
+    def list(self, request):
+        locatie = request.query_params.get('locatie')
+        if not locatie:
+            raise validation.ValidationError("locatie=x,y is required")
+        point = knn.parse_xy(locatie, 'locatie')
+        n = knn.nearest_count(request.query_params.get('n'))
+
+        gebieden = OrderedDict()
+        found = containing_gebieden(point)
+        for layer, _, view_name, columns in GEBIEDEN_LAYERS:
+            url_template = rest.DetailUrlTemplate(view_name, request)
+            gebieden[layer] = [
+                self.gebied(url_template, pk, columns, values) for pk, values in found[layer]]
+
+        adressen = nearest_rows(
+            serializers.NummeraanduidingRows(request), models.Nummeraanduiding.objects.all(),
+            '_geom', point, n)
+        panden = nearest_rows(
+            serializers.PandRows(request), models.Pand.objects.all(),
+            'geometrie', point, 1)
+        objecten = nearest_rows(
+            brk_serializers.KadastraalObjectRows(request), brk_models.KadastraalObject.objects.all(),
+            'poly_geom', point, 1)
+
+        return Response(OrderedDict([
+            ('_links', OrderedDict([
+                ('self', dict(href=request.build_absolute_uri())),
+            ])),
+            ('locatie', OrderedDict([('x', round(point.x, 2)), ('y', round(point.y, 2))])),
+            ('gebieden', gebieden),
+            ('adressen', adressen),
+            ('pand', panden[0] if panden else None),
+            ('kadastraal_object', objecten[0] if objecten else None),
+        ]))
+
+    @staticmethod
+    def gebied(url_template, pk, columns, values) -> OrderedDict:
+        fields = OrderedDict(zip(columns, values))
+        # like __str__ of the models: "naam (code)", or the one column
+        display = '{} ({})'.format(*fields.values()) if len(fields) == 2 else '{}'.format(*fields.values())
+
+        result = OrderedDict([
+            ('_links', OrderedDict([('self', {'href': url_template.url(pk)})])),
+            ('_display', display),
+            ('id', pk),
+        ])
+        result.update(fields)
+        return result
 
 
 class BouwblokCodeView(RedirectView):
@@ -724,6 +724,29 @@ class ImportKadastraalObjectVerblijfsobjectTask(batch.BasicTask):
         )
 
 
+class ImportKadastraalObjectNummeraanduidingTask(batch.BasicTask):
+    name = "Import Kadaster - KOT-NUM"
+
+    def before(self):
+        pass
+
+    def after(self):
+        pass
+
+    def process(self):
+        with db.connection.cursor() as c:
+            c.execute("""
+            INSERT INTO brk_kadastraalobjectnummeraanduidingrelatie(kadastraal_object_id, nummeraanduiding_id)
+            SELECT DISTINCT
+              kot_vbo.kadastraal_object_id,
+              num.id
+            FROM
+              brk_kadastraalobjectverblijfsobjectrelatie kot_vbo
+              JOIN bag_nummeraanduiding num ON num.verblijfsobject_id = kot_vbo.verblijfsobject_id
+            """)
+            c.execute("ANALYZE brk_kadastraalobjectnummeraanduidingrelatie")
+
+
 class ImportKadastraalObjectRelatiesTask(batch.BasicTask):
     name = "Import Kadaster - KOT-KOT"
 
@@ -751,6 +774,62 @@ class ImportKadastraalObjectRelatiesTask(batch.BasicTask):
             """)  # noqa
 
 
+def perceel_closure(relaties):
+    """
+    All (a_perceel, g_perceel) pairs that are connected through a chain of
+    A-G relaties, computed with union-find over the (a, g) relaties
+    """
+    parent = {}
+
+    def find(perceel):
+        parent.setdefault(perceel, perceel)
+        while parent[perceel] != perceel:
+            parent[perceel] = parent[parent[perceel]]
+            perceel = parent[perceel]
+        return perceel
+
+    for a_perceel, g_perceel in relaties:
+        root_a, root_g = find(a_perceel), find(g_perceel)
+        if root_a != root_g:
+            parent[root_a] = root_g
+
+    groepen = {}
+    for a_perceel, g_perceel in relaties:
+        a_percelen, g_percelen = groepen.setdefault(find(a_perceel), (set(), set()))
+        a_percelen.add(a_perceel)
+        g_percelen.add(g_perceel)
+
+    for a_percelen, g_percelen in groepen.values():
+        for a_perceel in a_percelen:
+            for g_perceel in g_percelen:
+                if a_perceel != g_perceel:
+                    yield a_perceel, g_perceel
+
+
+class ImportKadastraalObjectClosureTask(batch.BasicTask):
+    name = "Import Kadaster - KOT-KOT closure"
+
+    def before(self):
+        pass
+
+    def after(self):
+        pass
+
+    def process(self):
+        with db.connection.cursor() as c:
+            c.execute("SELECT a_perceel_id, g_perceel_id FROM brk_aperceelgperceelrelatie")
+            relaties = c.fetchall()
+
+        closure = [
+            models.APerceelGPerceelClosure(a_perceel_id=a_perceel, g_perceel_id=g_perceel)
+            for a_perceel, g_perceel in perceel_closure(relaties)
+        ]
+        log.info("%d A-G relaties, %d in closure", len(relaties), len(closure))
+
+        models.APerceelGPerceelClosure.objects.bulk_create(
+            closure, batch_size=database.BATCH_SIZE)
+
+
 class ImportZakelijkRechtVerblijfsobjectTask(batch.BasicTask):
     name = "Import Kadaster - ZRT-VBO"
 
@@ -776,6 +855,34 @@ class ImportZakelijkRechtVerblijfsobjectTask(batch.BasicTask):
             """)
 
 
+class ImportBuurtSubjectTask(batch.BasicTask):
+    name = "Import Kadaster - buurt-subject"
+
+    def before(self):
+        pass
+
+    def after(self):
+        pass
+
+    def process(self):
+        with db.connection.cursor() as c:
+            c.execute("""
+            INSERT INTO brk_buurtsubjectrelatie(buurt_vollcode, aard_zakelijk_recht_code, kadastraal_subject_id)
+            SELECT DISTINCT
+              buurt.vollcode,
+              zrt.aard_zakelijk_recht_id,
+              zrt.kadastraal_subject_id
+            FROM
+              brk_zakelijkrechtverblijfsobjectrelatie zrt_vbo
+              JOIN brk_zakelijkrecht zrt ON zrt.id = zrt_vbo.zakelijk_recht_id
+              JOIN bag_verblijfsobject vbo ON vbo.id = zrt_vbo.verblijfsobject_id
+              JOIN bag_buurt buurt ON buurt.id = vbo.buurt_id
+            WHERE
+              zrt.aard_zakelijk_recht_id IS NOT NULL
+            """)
+            c.execute("ANALYZE brk_buurtsubjectrelatie")
+
+
 class ImportEigendommenTask(batch.BasicTask):
     name = "Create eigendommen informatiemodel"
 
@@ -842,10 +949,16 @@ class ImportKadasterJob(object):
             ImportAantekeningTask(self.brk),
             # needs bag.VBO
             ImportKadastraalObjectVerblijfsobjectTask(self.brk),
+            # needs kot.vbo bag.nummeraanduiding
+            ImportKadastraalObjectNummeraanduidingTask(),
             # needs zakelijk recht.
             ImportKadastraalObjectRelatiesTask(),
+            # needs kot-kot relaties
+            ImportKadastraalObjectClosureTask(),
             # needs zakelijk recht. kot.vbo bag.vbo
             ImportZakelijkRechtVerblijfsobjectTask(),
+            # needs zakelijk recht - vbo
+            ImportBuurtSubjectTask(),
             ImportEigendommenTask(),
             # This should already have been done by GOB
             # FixKadastraalObjectAppartementGeometrie()
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('brk', '0003_auto_20200407_1342'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='kadastraalobject',
+            name='aanduiding',
+            field=models.CharField(db_index=True, max_length=17),
+        ),
+    ]
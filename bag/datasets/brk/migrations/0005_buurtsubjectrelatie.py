@@ -0,0 +1,26 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('brk', '0004_kadastraalobject_aanduiding_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BuurtSubjectRelatie',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('buurt_vollcode', models.CharField(max_length=4)),
+                ('aard_zakelijk_recht_code', models.CharField(max_length=50)),
+                ('kadastraal_subject', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    related_name='buurt_relaties', to='brk.KadastraalSubject')),
+            ],
+            options={
+                'index_together': {('buurt_vollcode', 'aard_zakelijk_recht_code', 'kadastraal_subject')},
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bag', '0010_pandnummeraanduidingrelatie'),
+        ('brk', '0005_buurtsubjectrelatie'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='KadastraalObjectNummeraanduidingRelatie',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kadastraal_object', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE, to='brk.KadastraalObject')),
+                ('nummeraanduiding', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    related_name='kadastraal_object_relaties', to='bag.Nummeraanduiding')),
+            ],
+            options={
+                'index_together': {('kadastraal_object', 'nummeraanduiding')},
+            },
+        ),
+    ]
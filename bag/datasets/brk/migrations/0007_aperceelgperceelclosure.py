@@ -0,0 +1,29 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('brk', '0006_kadastraalobjectnummeraanduidingrelatie'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='APerceelGPerceelClosure',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('a_perceel', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE, related_name='+', to='brk.KadastraalObject')),
+                ('g_perceel', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE, related_name='+', to='brk.KadastraalObject')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='kadastraalobject',
+            name='alle_g_percelen',
+            field=models.ManyToManyField(
+                related_name='alle_a_percelen', through='brk.APerceelGPerceelClosure',
+                to='brk.KadastraalObject'),
+        ),
+    ]
@@ -241,9 +241,25 @@ class APerceelGPerceelRelatie(models.Model):
     )
 
 
+class APerceelGPerceelClosure(models.Model):
+    """
+    Alle A- en G-percelen die via A-G perceel relaties met elkaar verbonden
+    zijn, ook indirect. Berekend bij de import.
+    """
+    a_perceel = models.ForeignKey(
+        'KadastraalObject', related_name='+',
+        on_delete=models.CASCADE
+    )
+
+    g_perceel = models.ForeignKey(
+        'KadastraalObject', related_name='+',
+        on_delete=models.CASCADE
+    )
+
+
 class KadastraalObject(models.Model):
     id = models.CharField(max_length=60, primary_key=True)
-    aanduiding = models.CharField(max_length=17)
+    aanduiding = models.CharField(max_length=17, db_index=True)
 
     kadastrale_gemeente = models.ForeignKey(
         KadastraleGemeente, related_name="kadastrale_objecten",
@@ -295,6 +311,12 @@ class KadastraalObject(models.Model):
         through_fields=('a_perceel', 'g_perceel'),
         related_name="a_percelen")
 
+    alle_g_percelen = models.ManyToManyField(
+        'KadastraalObject',
+        through=APerceelGPerceelClosure,
+        through_fields=('a_perceel', 'g_perceel'),
+        related_name="alle_a_percelen")
+
     objects = geo.Manager()
 
     class Meta:
@@ -310,7 +332,7 @@ class KadastraalObject(models.Model):
 
     def get_aanduiding_spaties(self):
         return kadaster.get_aanduiding_spaties(
-                self.kadastrale_gemeente.id, self.sectie.sectie,
+                self.kadastrale_gemeente_id, self.sectie.sectie,
                 self.perceelnummer, self.indexletter, self.indexnummer
         )
 
@@ -325,6 +347,23 @@ class KadastraalObjectVerblijfsobjectRelatie(models.Model):
     date_modified = models.DateTimeField(auto_now=True)
 
 
+class KadastraalObjectNummeraanduidingRelatie(models.Model):
+    """
+    Adressen van de verblijfsobjecten van een kadastraal object, afgeleid
+    bij de import voor het kadastraal object filter op nummeraanduidingen
+    """
+    kadastraal_object = models.ForeignKey(
+        KadastraalObject, on_delete=models.CASCADE)
+    nummeraanduiding = models.ForeignKey(
+        bag.Nummeraanduiding, related_name="kadastraal_object_relaties",
+        on_delete=models.CASCADE)
+
+    class Meta:
+        index_together = (
+            ('kadastraal_object', 'nummeraanduiding'),
+        )
+
+
 class AardZakelijkRecht(KadasterCodeOmschrijving):
     """
     2	Eigendom (recht van)
@@ -429,6 +468,25 @@ class ZakelijkRechtVerblijfsobjectRelatie(models.Model):
     )
 
 
+class BuurtSubjectRelatie(models.Model):
+    """
+    Subjecten met een zakelijk recht op een verblijfsobject in een buurt,
+    afgeleid bij de import voor het buurt filter op subjecten
+    """
+    buurt_vollcode = models.CharField(max_length=4)
+    aard_zakelijk_recht_code = models.CharField(max_length=50)
+
+    kadastraal_subject = models.ForeignKey(
+        KadastraalSubject, related_name="buurt_relaties",
+        on_delete=models.CASCADE
+    )
+
+    class Meta:
+        index_together = (
+            ('buurt_vollcode', 'aard_zakelijk_recht_code', 'kadastraal_subject'),
+        )
+
+
 class AardAantekening(KadasterCodeOmschrijving):
     pass
 
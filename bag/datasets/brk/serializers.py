@@ -1,9 +1,11 @@
+from collections import OrderedDict
+
 from bag import authorization_levels
 
 from rest_framework import serializers
 from rest_framework.reverse import reverse
 
-from datasets.generic import rest
+from datasets.generic import kadaster, rest
 from . import models
 
 
@@ -147,6 +149,34 @@ class KadastraalObject(BrkMixin, rest.HALSerializer):
         )
 
 
+class KadastraalObjectRows(rest.RowSerializer):
+    serializer_class = KadastraalObject
+    view_name = 'kadastraalobject-detail'
+    lookup = 'pk'
+    values = (
+        'id',
+        'kadastrale_gemeente_id',
+        'sectie__sectie',
+        'perceelnummer',
+        'indexletter',
+        'indexnummer',
+    )
+
+    def to_representation(self, row):
+        # models.KadastraalObject.get_aanduiding_spaties, also its __str__
+        aanduiding = kadaster.get_aanduiding_spaties(
+            row['kadastrale_gemeente_id'], row['sectie__sectie'],
+            row['perceelnummer'], row['indexletter'], row['indexnummer'])
+
+        return OrderedDict([
+            ('_links', self.links(row)),
+            ('_display', aanduiding),
+            ('id', row['id']),
+            ('aanduiding', aanduiding),
+            ('dataset', BrkMixin.dataset),
+        ])
+
+
 class AardZakelijkRecht(serializers.ModelSerializer):
     class Meta:
         model = models.AardZakelijkRecht
@@ -597,14 +627,14 @@ class KadastraalObjectDetailExpand(KadastraalObjectDetail):
     rechten = ZakelijkRechtDetail(many=True)
     aantekeningen = Aantekening(many=True)
 
-    ontstaan_uit = KadastraalObject(source='g_percelen', many=True)
-    betrokken_bij = KadastraalObject(source='a_percelen', many=True)
+    ontstaan_uit = KadastraalObject(source='alle_g_percelen', many=True)
+    betrokken_bij = KadastraalObject(source='alle_a_percelen', many=True)
 
 
 class KadastraalObjectDetailExpandPublic(KadastraalObjectDetailPublic):
 
-    ontstaan_uit = KadastraalObject(source='g_percelen', many=True)
-    betrokken_bij = KadastraalObject(source='a_percelen', many=True)
+    ontstaan_uit = KadastraalObject(source='alle_g_percelen', many=True)
+    betrokken_bij = KadastraalObject(source='alle_a_percelen', many=True)
 
 
 class AantekeningDetail(BrkMixin, rest.HALSerializer):
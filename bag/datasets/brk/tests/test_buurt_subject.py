@@ -0,0 +1,53 @@
+from batch.test import TaskTestCase
+from datasets.bag.tests import factories as bag_factories
+from datasets.brk import batch, models
+from datasets.brk.tests import factories
+
+
+class ImportBuurtSubjectTaskTest(TaskTestCase):
+    def setUp(self):
+        self.buurt = bag_factories.BuurtFactory.create(vollcode='A01a')
+        vbo1 = bag_factories.VerblijfsobjectFactory.create(buurt=self.buurt)
+        vbo2 = bag_factories.VerblijfsobjectFactory.create(buurt=self.buurt)
+        other = bag_factories.VerblijfsobjectFactory.create(
+            buurt=bag_factories.BuurtFactory.create(code='999', vollcode='B02b'))
+
+        eigendom = factories.AardZakelijkRechtFactory.create(pk='2')
+        erfpacht = factories.AardZakelijkRechtFactory.create(pk='3')
+
+        self.eigenaar = factories.KadastraalSubjectFactory.create()
+        self.erfpachter = factories.KadastraalSubjectFactory.create()
+
+        for vbo in (vbo1, vbo2):
+            zrt = factories.ZakelijkRechtFactory.create(
+                kadastraal_subject=self.eigenaar, aard_zakelijk_recht=eigendom)
+            models.ZakelijkRechtVerblijfsobjectRelatie.objects.create(zakelijk_recht=zrt, verblijfsobject=vbo)
+
+        zrt = factories.ZakelijkRechtFactory.create(
+            kadastraal_subject=self.erfpachter, aard_zakelijk_recht=erfpacht)
+        models.ZakelijkRechtVerblijfsobjectRelatie.objects.create(zakelijk_recht=zrt, verblijfsobject=vbo1)
+        models.ZakelijkRechtVerblijfsobjectRelatie.objects.create(zakelijk_recht=zrt, verblijfsobject=other)
+
+    def task(self):
+        return batch.ImportBuurtSubjectTask()
+
+    def test_import(self):
+        self.run_task()
+
+        rows = set(models.BuurtSubjectRelatie.objects.values_list(
+            'buurt_vollcode', 'aard_zakelijk_recht_code', 'kadastraal_subject_id'))
+
+        self.assertEqual(rows, {
+            ('A01a', '2', self.eigenaar.id),
+            ('A01a', '3', self.erfpachter.id),
+            ('B02b', '3', self.erfpachter.id),
+        })
+
+    def test_filter(self):
+        self.run_task()
+
+        subjects = models.KadastraalSubject.objects.filter(
+            buurt_relaties__buurt_vollcode='A01a',
+            buurt_relaties__aard_zakelijk_recht_code='2')
+
+        self.assertEqual(list(subjects), [self.eigenaar])
@@ -1,5 +1,5 @@
 from batch.test import TaskTestCase
-from datasets.brk import batch
+from datasets.brk import batch, models
 from datasets.brk.tests import factories
 
 
@@ -58,3 +58,38 @@ class ImportKadastraalObjectRelatiesTaskTest(TaskTestCase):
         g2_a = set([obj.aanduiding for obj in self.g2.a_percelen.all()])
 
         self.assertEqual(g2_a, {self.a2.aanduiding, self.a3.aanduiding})
+
+
+class ImportKadastraalObjectClosureTaskTest(TaskTestCase):
+    def setUp(self):
+        self.a1 = factories.KadastraalObjectFactory.create(indexletter='A')
+        self.a2 = factories.KadastraalObjectFactory.create(indexletter='A')
+        self.a3 = factories.KadastraalObjectFactory.create(indexletter='A')
+        self.g1 = factories.KadastraalObjectFactory.create(indexletter='G')
+        self.g2 = factories.KadastraalObjectFactory.create(indexletter='G')
+        self.g3 = factories.KadastraalObjectFactory.create(indexletter='G')
+
+        # a1 - g1 - a2 - g2, and a3 - g3 on its own
+        for a_perceel, g_perceel in ((self.a1, self.g1), (self.a2, self.g1), (self.a2, self.g2), (self.a3, self.g3)):
+            models.APerceelGPerceelRelatie.objects.create(
+                id=f'{g_perceel.id}-{a_perceel.id}', a_perceel=a_perceel, g_perceel=g_perceel)
+
+    def task(self):
+        return batch.ImportKadastraalObjectClosureTask()
+
+    def test_import(self):
+        self.run_task()
+
+        def ids(queryset):
+            return set(obj.id for obj in queryset)
+
+        self.assertEqual(ids(self.a1.alle_g_percelen.all()), {self.g1.id, self.g2.id})
+        self.assertEqual(ids(self.g2.alle_a_percelen.all()), {self.a1.id, self.a2.id})
+        self.assertEqual(ids(self.a3.alle_g_percelen.all()), {self.g3.id})
+
+    def test_perceel_closure(self):
+        closure = set(batch.perceel_closure([('a1', 'g1'), ('a2', 'g2'), ('a2', 'g1'), ('a3', 'g3')]))
+
+        self.assertEqual(closure, {
+            ('a1', 'g1'), ('a1', 'g2'), ('a2', 'g1'), ('a2', 'g2'), ('a3', 'g3'),
+        })
@@ -0,0 +1,100 @@
+from rest_framework.test import APITestCase
+
+from datasets.brk import models, views
+from datasets.generic.tests.authorization import AuthorizationSetup
+from datasets.generic.tests.query_budget import QueryBudgetMixin
+from . import factories
+
+
+class DetailQueryBudgetTest(APITestCase, AuthorizationSetup, QueryBudgetMixin):
+    """
+    The relations of the detail serializers, within the budgets of their views
+    """
+
+    def setUp(self):
+        self.setUpAuthorization()
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer {}'.format(self.token_employee_plus))
+
+        self.kot = factories.KadastraalObjectFactory.create(
+            soort_grootte=models.SoortGrootte.objects.create(code='1', omschrijving='m2'),
+            cultuurcode_onbebouwd=models.CultuurCodeOnbebouwd.objects.create(code='11', omschrijving='Wegen'),
+        )
+        self.subject = factories.NatuurlijkPersoonFactory.create(
+            geslacht=models.Geslacht.objects.create(code='V', omschrijving='Vrouw'),
+            geboorteland=models.Land.objects.create(code='NL', omschrijving='Nederland'),
+        )
+
+        self.rechten = [
+            factories.ZakelijkRechtFactory.create(
+                kadastraal_object=self.kot,
+                kadastraal_subject=self.subject,
+                ontstaan_uit=factories.KadastraalSubjectFactory.create(),
+            ) for _ in range(3)
+        ]
+
+        aard = models.AardAantekening.objects.create(code='1', omschrijving='Beslag')
+        self.aantekeningen = [
+            factories.AantekeningFactory.create(kadastraal_object=self.kot, aard_aantekening=aard)
+            for _ in range(2)
+        ]
+
+        for _ in range(2):
+            g_perceel = factories.KadastraalObjectFactory.create()
+            factories.APerceelGPerceelRelatieFactory.create(a_perceel=self.kot, g_perceel=g_perceel)
+            models.APerceelGPerceelClosure.objects.create(a_perceel=self.kot, g_perceel=g_perceel)
+
+    def get_within_budget(self, viewset, action, url, params=None):
+        with self.assertMaxQueries(viewset.query_budget[action]):
+            response = self.client.get(url, params)
+
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_kadastraal_object(self):
+        data = self.get_within_budget(views.KadastraalObjectViewSet, 'retrieve', f'/brk/object/{self.kot.pk}/')
+
+        self.assertEqual(data['soort_grootte']['code'], '1')
+        self.assertEqual(data['rechten']['count'], 3)
+
+    def test_kadastraal_object_expand(self):
+        data = self.get_within_budget(
+            views.KadastraalObjectViewSetExpand, 'retrieve', f'/brk/object-expand/{self.kot.pk}/')
+
+        self.assertEqual(len(data['rechten']), 3)
+        self.assertEqual(len(data['aantekeningen']), 2)
+        self.assertEqual(len(data['ontstaan_uit']), 2)
+        self.assertTrue(all(recht['ontstaan_uit'] for recht in data['rechten']))
+
+        data = self.get_within_budget(views.KadastraalObjectViewSetExpand, 'list', '/brk/object-expand/')
+        self.assertTrue(data['results'])
+
+    def test_kadastraal_subject(self):
+        data = self.get_within_budget(
+            views.KadastraalSubjectViewSet, 'retrieve', f'/brk/subject/{self.subject.pk}/')
+
+        self.assertEqual(data['geslacht']['code'], 'V')
+        self.assertEqual(data['geboorteland']['code'], 'NL')
+        self.assertEqual(data['rechten']['count'], 3)
+
+    def test_zakelijk_recht(self):
+        recht = self.rechten[0]
+        data = self.get_within_budget(views.ZakelijkRechtViewSet, 'retrieve', f'/brk/zakelijk-recht/{recht.pk}/')
+
+        self.assertIsNotNone(data['ontstaan_uit'])
+        self.assertIsNotNone(data['kadastraal_object'])
+
+        data = self.get_within_budget(
+            views.ZakelijkRechtViewSet, 'subject', f'/brk/zakelijk-recht/{recht.pk}/subject/')
+        self.assertEqual(data['geslacht']['code'], 'V')
+
+        data = self.get_within_budget(
+            views.ZakelijkRechtViewSet, 'list', '/brk/zakelijk-recht/', {'kadastraal_subject': self.subject.pk})
+        self.assertEqual(len(data['results']), 3)
+
+    def test_aantekening(self):
+        aantekening = self.aantekeningen[0]
+        data = self.get_within_budget(
+            views.AantekeningViewSet, 'retrieve', f'/brk/aantekening/{aantekening.pk}/')
+
+        self.assertEqual(data['aard_aantekening']['code'], '1')
+        self.assertIsNotNone(data['opgelegd_door'])
@@ -0,0 +1,76 @@
+import json
+
+from rest_framework.test import APITestCase
+
+from datasets.generic import generation, response_cache
+from datasets.generic.tests.authorization import AuthorizationSetup
+from . import factories
+
+
+class ResponseCacheTest(APITestCase, AuthorizationSetup):
+
+    def setUp(self):
+        self.setUpAuthorization()
+        generation.forget_generation()
+
+        kot = factories.KadastraalObjectFactory.create(
+            kadastrale_gemeente=factories.KadastraleGemeenteFactory(pk='ACD00'),
+            perceelnummer=10000,
+            indexletter='A',
+            sectie=factories.KadastraleSectieFactory(sectie='s'),
+            koopsom=1000,
+        )
+        self.url = '/brk/object/{}/'.format(kot.pk)
+
+    def tearDown(self):
+        generation.forget_generation()
+
+    def _get(self, token=None):
+        if token:
+            self.client.credentials(HTTP_AUTHORIZATION='Bearer {}'.format(token))
+        else:
+            self.client.credentials()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.content.decode('utf-8'))
+
+    def _count(self, result):
+        return response_cache.RESPONSE_CACHE.value(endpoint='kadastraalobject-detail', result=result)
+
+    def test_scopes(self):
+        generation.mark_generation('brk')
+        hits, misses = self._count('hit'), self._count('miss')
+
+        self.assertNotIn('koopsom', self._get())
+        self.assertIn('koopsom', self._get(self.token_scope_brk_ro))
+        self.assertEqual(self._count('miss'), misses + 2)
+
+        # both served from the cache, each with its own fields
+        self.assertNotIn('koopsom', self._get())
+        self.assertIn('koopsom', self._get(self.token_scope_brk_ro))
+        self.assertEqual(self._count('hit'), hits + 2)
+
+    def test_new_generation(self):
+        generation.mark_generation('brk')
+        self._get()
+        misses = self._count('miss')
+
+        generation.mark_generation('brk')
+        self._get()
+        self.assertEqual(self._count('miss'), misses + 1)
+
+    def test_no_generation(self):
+        misses = self._count('miss')
+        self._get()
+        self._get()
+        self.assertEqual(self._count('miss'), misses)
+
+    def test_lru(self):
+        lru = response_cache.LRUCache(2)
+        lru.set('a', 1)
+        lru.set('b', 2)
+        lru.get('a')
+        lru.set('c', 3)
+        self.assertEqual(lru.get('a'), 1)
+        self.assertIsNone(lru.get('b'))
+        self.assertEqual(len(lru), 2)
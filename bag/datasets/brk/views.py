@@ -1,3 +1,4 @@
+from django.db.models import Prefetch
 from django.shortcuts import get_object_or_404
 
 from rest_framework.decorators import action
@@ -8,7 +9,7 @@ from rest_framework.status import HTTP_401_UNAUTHORIZED
 
 from datasets.brk import models, serializers
 from datasets.generic.rest import DatapuntViewSet
-from datasets.generic import rest
+from datasets.generic import bulk, export, rest
 
 from django_filters.rest_framework import filters
 from django_filters.rest_framework import FilterSet
@@ -19,6 +20,18 @@ import logging
 
 log = logging.getLogger(__name__)
 
+# Relations of a subject shown by KadastraalSubjectDetail
+SUBJECT_DETAIL_RELATED = (
+    'beschikkingsbevoegdheid',
+    'geslacht',
+    'aanduiding_naam',
+    'geboorteland',
+    'land_waarnaar_vertrokken',
+    'rechtsvorm',
+    'woonadres__buitenland_land',
+    'postadres__buitenland_land',
+)
+
 
 class GemeenteViewSet(DatapuntViewSet):
     """
@@ -44,6 +57,7 @@ class GemeenteViewSet(DatapuntViewSet):
     queryset = models.Gemeente.objects.all().order_by('gemeente')
     serializer_class = serializers.Gemeente
     serializer_detail_class = serializers.GemeenteDetail
+    query_budget = {'list': 3, 'retrieve': 2}
     lookup_value_regex = '[^/]+'
 
 
@@ -61,6 +75,7 @@ class KadastraleGemeenteViewSet(DatapuntViewSet):
                 .all().order_by('id'))
     serializer_class = serializers.KadastraleGemeente
     serializer_detail_class = serializers.KadastraleGemeenteDetail
+    query_budget = {'list': 3, 'retrieve': 3}
     lookup_value_regex = '[^/]+'
 
 
@@ -80,6 +95,7 @@ class KadastraleSectieViewSet(DatapuntViewSet):
             'kadastrale_gemeente', 'kadastrale_gemeente__gemeente'))
     serializer_class = serializers.KadastraleSectie
     serializer_detail_class = serializers.KadastraleSectieDetail
+    query_budget = {'list': 4, 'retrieve': 2}
     filterset_fields = ('kadastrale_gemeente',)
 
 
@@ -119,12 +135,12 @@ class SubjectFilter(FilterSet):
             raise drf_serializers.ValidationError('Buurt vollcode is 4 chars')
 
         # remove ordering.
-        # SUPER SLOW because of some weirdness.
         qs = queryset.order_by()
 
+        # Precomputed at import, one row per subject, buurt and recht
         return qs.filter(
-            rechten__verblijfsobjecten__buurt__vollcode=value,
-            rechten__aard_zakelijk_recht__code=recht_type
+            buurt_relaties__buurt_vollcode=value,
+            buurt_relaties__aard_zakelijk_recht_code=recht_type
         )
 
     def recht_filter(self, queryset, _filter_name, value):
@@ -165,12 +181,12 @@ class KadastraalSubjectViewSet(DatapuntViewSet):
     queryset = models.KadastraalSubject.objects.all().order_by('id')
 
     queryset_detail = (
-        models.KadastraalSubject.objects.select_related(
-            'rechtsvorm', 'woonadres', 'woonadres__buitenland_land',
-            'postadres', 'postadres__buitenland_land'))
+        models.KadastraalSubject.objects.select_related(*SUBJECT_DETAIL_RELATED))
 
     serializer_class = serializers.KadastraalSubject
     serializer_detail_class = serializers.KadastraalSubjectDetail
+    pagination_class = rest.CountFreeHALPagination
+    query_budget = {'list': 4, 'retrieve': 3}
     lookup_value_regex = '[^/]+'
 
     filterset_class = SubjectFilter
@@ -216,7 +232,7 @@ class KadastraalObjectFilter(FilterSet):
         return queryset.filter(verblijfsobjecten__id=value)
 
 
-class KadastraalObjectViewSet(DatapuntViewSet):
+class KadastraalObjectViewSet(export.ExportMixin, bulk.BulkMixin, DatapuntViewSet):
     """
     Kadastraal object
 
@@ -345,15 +361,43 @@ class KadastraalObjectViewSet(DatapuntViewSet):
             'kadastrale_gemeente',
             'kadastrale_gemeente__gemeente',
             'voornaamste_gerechtigde',
+            'soort_grootte',
+            'cultuurcode_onbebouwd',
+            'cultuurcode_bebouwd',
         )
     )
 
+    pagination_class = rest.CountFreeHALPagination
+    query_budget = {'list': 4, 'retrieve': 3}
+    cache_detail = True
+    row_serializer_class = serializers.KadastraalObjectRows
+    bulk_keys = ('pk', 'aanduiding')
+
     filterset_class = KadastraalObjectFilter
 
     lookup_value_regex = '[^/]+'
 
+    # Only what KadastraalObjectDetailPublic shows
+    export_fields = (
+        'id',
+        'aanduiding',
+        ('kadastrale_gemeente', 'kadastrale_gemeente__naam'),
+        ('sectie', 'sectie__sectie'),
+        ('objectnummer', 'perceelnummer'),
+        'indexletter',
+        'indexnummer',
+        ('soort_grootte', 'soort_grootte__omschrijving'),
+        'grootte',
+        'meer_objecten',
+        'status_code',
+        'toestandsdatum',
+        'voorlopige_kadastrale_grens',
+        'in_onderzoek',
+    )
+    export_geometry = export.geometry_coalesce('poly_geom', 'point_geom')
+
     def get_serializer_class(self):
-        if self.action == 'retrieve':
+        if self.action in ('retrieve', 'bulk'):
             if self.request.is_authorized_for(authorization_levels.SCOPE_BRK_RO):
                 return serializers.KadastraalObjectDetail
             else:
@@ -370,17 +414,27 @@ class KadastraalObjectViewSetExpand(KadastraalObjectViewSet):
             'sectie',
             'voornaamste_gerechtigde',
             'kadastrale_gemeente',
-            'kadastrale_gemeente__gemeente')
+            'kadastrale_gemeente__gemeente',
+            'soort_grootte',
+            'cultuurcode_onbebouwd',
+            'cultuurcode_bebouwd')
         .prefetch_related(
-            'a_percelen',
-            'g_percelen',
-            'aantekeningen',
+            # direct and indirect relaties, computed at import
+            Prefetch('alle_a_percelen', queryset=models.KadastraalObject.objects.select_related('sectie')),
+            Prefetch('alle_g_percelen', queryset=models.KadastraalObject.objects.select_related('sectie')),
+            Prefetch('aantekeningen', queryset=models.Aantekening.objects.select_related(
+                'aard_aantekening', 'opgelegd_door')),
+            Prefetch('rechten', queryset=models.ZakelijkRecht.objects.select_related(
+                'aard_zakelijk_recht', 'ontstaan_uit', 'betrokken_bij',
+                'kadastraal_subject', 'app_rechtsplitstype')),
         )
     )
+    queryset_detail = queryset
 
     filterset_class = KadastraalObjectFilter
 
     pagination_class = rest.LimitedHALPagination
+    query_budget = {'list': 8, 'retrieve': 7}
 
     def get_serializer_class(self):
         if self.request.is_authorized_for(authorization_levels.SCOPE_BRK_RO):
@@ -466,15 +520,30 @@ class ZakelijkRechtViewSet(DatapuntViewSet):
     queryset = (
         models.ZakelijkRecht.objects.select_related(
             'aard_zakelijk_recht',
-            'kadastraal_subject')
+            'kadastraal_subject',
+            # the _display of ?kadastraal_subject=
+            'kadastraal_object')
         .all()
         .order_by(
             'aard_zakelijk_recht__code',
             '_kadastraal_subject_naam')
     )
 
+    queryset_detail = (
+        models.ZakelijkRecht.objects.select_related(
+            'aard_zakelijk_recht',
+            'ontstaan_uit',
+            'betrokken_bij',
+            'kadastraal_object__sectie',
+            'app_rechtsplitstype',
+            # the subject action shows the subject in detail
+            *(f'kadastraal_subject__{relation}' for relation in SUBJECT_DETAIL_RELATED))
+    )
+
     serializer_class = serializers.ZakelijkRecht
     serializer_detail_class = serializers.ZakelijkRechtDetail
+    pagination_class = rest.CountFreeHALPagination
+    query_budget = {'list': 7, 'retrieve': 2, 'subject': 3}
 
     filterset_class = ZakelijkRechtFilter
 
@@ -487,13 +556,15 @@ class ZakelijkRechtViewSet(DatapuntViewSet):
         only plus users can see natuurlijke personen
         """
 
+        queryset = super().get_queryset()
+
         # find all items but not natuurlijke personen
         if self.request.is_authorized_for(authorization_levels.SCOPE_BRK_RO) or \
                 self.request.is_authorized_for(authorization_levels.SCOPE_BRK_RS):
-            return self.queryset
+            return queryset
 
         # return empty qs
-        return self.queryset.none()
+        return queryset.none()
 
     @action(detail=True, methods=['get'])
     def subject(self, request, pk=None, *args, **kwargs):
@@ -569,6 +640,7 @@ class AantekeningViewSet(DatapuntViewSet):
 
     serializer_class = serializers.Aantekening
     serializer_detail_class = serializers.AantekeningDetail
+    query_budget = {'list': 4, 'retrieve': 2}
 
     filterset_class = AantekeningenFilter
 
@@ -578,9 +650,9 @@ class AantekeningViewSet(DatapuntViewSet):
         pk = self.kwargs['pk']
         if pk.isdigit():
             # django id.
-            obj = get_object_or_404(models.Aantekening, pk=pk)
+            obj = get_object_or_404(self.get_queryset(), pk=pk)
         else:
             # official brk id.
             # which is not always unique..
-            obj = get_object_or_404(models.Aantekening, aantekening_id=pk)
+            obj = get_object_or_404(self.get_queryset(), aantekening_id=pk)
         return obj
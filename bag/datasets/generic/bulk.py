@@ -0,0 +1,88 @@
+"""
+Bulk retrieval of many objects by identifier.
+
+`POST <list url>/bulk/` with `{"ids": [...]}` returns the detail
+representation of every id, in the order they were sent, with a
+`_not_found` marker for ids that do not exist. All objects are fetched
+with one `IN` query on the detail queryset, so its prefetches and the
+related counts of the detail serializer are done once for the batch.
+
+Ids may mix the keys in `bulk_keys`, like the primary key and the
+`landelijk_id` that the detail url accepts.
+"""
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework import parsers
+from rest_framework import serializers as validation
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+
+def bulk_ids(data, maximum: int) -> list:
+    ids = data.get('ids') if isinstance(data, dict) else None
+    if not isinstance(ids, list) or not all(isinstance(value, (str, int)) for value in ids):
+        raise validation.ValidationError("ids must be a list of identifiers")
+    if not ids:
+        raise validation.ValidationError("ids must not be empty")
+    if len(ids) > maximum:
+        raise validation.ValidationError(f"at most {maximum} ids per request")
+    return [str(value) for value in ids]
+
+
+def not_found(value) -> OrderedDict:
+    return OrderedDict([
+        ('_requested', value),
+        ('_not_found', True),
+    ])
+
+
+class BulkMixin(object):
+    """
+    Adds `bulk/` to a DatapuntViewSet. The queryset, serializer and
+    authorization are those of the detail endpoint.
+    """
+
+    # Fields an id is looked up in
+    bulk_keys = ('pk',)
+
+    bulk_max = settings.BULK_MAX_IDS
+
+    def _is_request_to_detail_endpoint(self):
+        # DetailSerializerMixin picks queryset_detail and
+        # serializer_detail_class with this
+        if self.action == 'bulk':
+            return True
+        return super()._is_request_to_detail_endpoint()
+
+    def bulk_key_values(self, instance) -> list:
+        return [str(getattr(instance, key)) for key in self.bulk_keys]
+
+    @action(detail=False, methods=['post'],
+            parser_classes=(parsers.JSONParser, *api_settings.DEFAULT_PARSER_CLASSES))
+    def bulk(self, request, *args, **kwargs):
+        ids = bulk_ids(request.data, self.bulk_max)
+
+        lookup = Q()
+        for key in self.bulk_keys:
+            lookup |= Q(**{f'{key}__in': ids})
+        instances = list(self.get_queryset().filter(lookup))
+
+        data = self.get_serializer(instances, many=True).data
+
+        found = {}
+        for instance, representation in zip(instances, data):
+            for value in self.bulk_key_values(instance):
+                found[value] = representation
+
+        results = [found[value] if value in found else not_found(value) for value in ids]
+
+        return Response(OrderedDict([
+            ('_links', OrderedDict([
+                ('self', dict(href=request.build_absolute_uri())),
+            ])),
+            ('count', len(instances)),
+            ('results', results),
+        ]))
@@ -0,0 +1,192 @@
+"""
+Streaming exports of a whole (filtered) dataset
+
+Paging through a list endpoint to download a dataset costs a request,
+a count and a serializer per page. An export streams all rows of the
+filtered queryset in one response instead: rows come from a server-side
+cursor as plain `values_list` tuples, geometry is encoded by PostGIS and
+output is written in chunks, so memory stays the same for every size.
+
+    /bag/v1.1/verblijfsobject/export/csv/?buurt=03630000000078
+    /bag/v1.1/pand/export/ndjson/
+    /gebieden/buurt/export/geojson/
+"""
+import csv
+import io
+import json
+
+from django.conf import settings
+from django.contrib.gis.db.models import GeometryField
+from django.contrib.gis.db.models.functions import AsGeoJSON
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Func, TextField
+from django.db.models.functions import Coalesce
+from django.http import StreamingHttpResponse
+from rest_framework.decorators import action
+
+FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+    'geojson': 'application/geo+json',
+}
+
+GEOMETRY = '_export_geometry'
+
+# RD coordinates are in meters, centimeters are more than enough
+GEOJSON_PRECISION = 2
+
+FEATURE_COLLECTION_START = (
+    '{"type": "FeatureCollection", '
+    '"crs": {"type": "name", "properties": {"name": "EPSG:28992"}}, '
+    '"features": [\n'
+)
+FEATURE_COLLECTION_END = '\n]}\n'
+
+
+class AsText(Func):
+    function = 'ST_AsText'
+    output_field = TextField()
+
+
+def geometry_coalesce(*names):
+    """
+    First non empty of several geometry fields as export geometry
+    """
+    return Coalesce(*names, output_field=GeometryField(srid=28992))
+
+
+def export_columns(fields) -> ([str], [str]):
+    """
+    Column names and `values_list` lookups of `export_fields`, entries are
+    a lookup or a (column, lookup) pair
+    """
+    columns, lookups = [], []
+    for field in fields:
+        column, lookup = (field, field) if isinstance(field, str) else field
+        columns.append(column)
+        lookups.append(lookup)
+    return columns, lookups
+
+
+def export_rows(queryset, fields, geometry=None, export_format='csv', chunk_size=None):
+    """
+    Column names and an iterator over the rows of `queryset` as tuples,
+    with the encoded geometry as last value when a geometry is given
+    """
+    columns, lookups = export_columns(fields)
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+
+    if geometry:
+        if isinstance(geometry, str):
+            geometry = F(geometry)
+        if export_format == 'csv':
+            encoded = AsText(geometry)
+        else:
+            encoded = AsGeoJSON(geometry, precision=GEOJSON_PRECISION)
+        queryset = queryset.annotate(**{GEOMETRY: encoded})
+        lookups = lookups + [GEOMETRY]
+
+    rows = (queryset
+            .select_related(None)
+            .prefetch_related(None)
+            .order_by('pk')
+            .values_list(*lookups)
+            .iterator(chunk_size=chunk_size))
+
+    return columns, rows
+
+
+def _chunked(lines, chunk_size):
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= chunk_size:
+            yield ''.join(chunk)
+            chunk = []
+    if chunk:
+        yield ''.join(chunk)
+
+
+def _to_json(columns, row) -> str:
+    return json.dumps(dict(zip(columns, row)), cls=DjangoJSONEncoder)
+
+
+def csv_lines(columns, rows, geometry=False):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def line(values):
+        writer.writerow(values)
+        value = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return value
+
+    yield line(columns + ['geometrie'] if geometry else columns)
+    for row in rows:
+        yield line(row)
+
+
+def ndjson_lines(columns, rows, geometry=False):
+    for row in rows:
+        if geometry:
+            # the geometry is GeoJSON text already, no need to parse it
+            properties = _to_json(columns, row[:-1])
+            yield '{}, "geometrie": {}}}\n'.format(properties[:-1], row[-1] or 'null')
+        else:
+            yield _to_json(columns, row) + '\n'
+
+
+def geojson_lines(columns, rows, geometry=False):
+    yield FEATURE_COLLECTION_START
+    separator = ''
+    for row in rows:
+        if geometry:
+            row, geojson = row[:-1], row[-1]
+        else:
+            geojson = None
+        yield '{}{{"type": "Feature", "geometry": {}, "properties": {}}}'.format(
+            separator, geojson or 'null', _to_json(columns, row))
+        separator = ',\n'
+    yield FEATURE_COLLECTION_END
+
+
+ENCODERS = {
+    'csv': csv_lines,
+    'ndjson': ndjson_lines,
+    'geojson': geojson_lines,
+}
+
+
+def export_response(queryset, fields, export_format, geometry=None, filename='export'):
+    chunk_size = settings.EXPORT_CHUNK_SIZE
+    columns, rows = export_rows(
+        queryset, fields, geometry=geometry, export_format=export_format, chunk_size=chunk_size)
+    lines = ENCODERS[export_format](columns, rows, geometry=bool(geometry))
+
+    response = StreamingHttpResponse(
+        (chunk.encode('utf-8') for chunk in _chunked(lines, chunk_size)),
+        content_type=FORMATS[export_format])
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{export_format}"'
+    return response
+
+
+class ExportMixin(object):
+    """
+    Adds `export/{csv,ndjson,geojson}/` to a DatapuntViewSet, streaming the
+    `export_fields` of all rows matching the filters of the list endpoint
+
+    `export_fields` entries are a `values_list` lookup or a
+    (column, lookup) pair, `export_geometry` a geometry field name or
+    expression.
+    """
+    export_fields = ()
+    export_geometry = None
+
+    @action(detail=False, methods=['get'], url_path='export/(?P<export_format>csv|ndjson|geojson)')
+    def export(self, request, export_format=None, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return export_response(
+            queryset, self.export_fields, export_format,
+            geometry=self.export_geometry,
+            filename=queryset.model._meta.model_name)
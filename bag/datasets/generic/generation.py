@@ -0,0 +1,162 @@
+"""
+Data generations, conditional GETs and cache headers.
+
+BAG/BRK data only changes when `run_import` or `elastic_indices`
+completes. Both record a new `DataGeneration`, and every response is
+versioned by the latest one: a weak ETag of the generation, the granted
+scopes and the accepted media type, and for public responses the
+completion time as Last-Modified. A request with a matching
+`If-None-Match` (or, for a public response, a recent enough
+`If-Modified-Since`) gets a 304 after authentication and permission
+checks, without running the view.
+
+The latest generation is cached per process for `DATA_GENERATION_TTL`
+seconds, so API processes pick up a new generation within that time.
+"""
+import hashlib
+import logging
+import threading
+import time
+from typing import Optional
+
+from django.conf import settings
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+from bag.authorization_levels import all_options
+from datasets.generic.models import DataGeneration
+from health import metrics
+
+log = logging.getLogger(__name__)
+
+CONDITIONAL_GETS = metrics.counter(
+    'api_conditional_get_total',
+    'GET requests with a generation ETag, by result (not_modified, full)',
+    ('result',))
+
+_lock = threading.Lock()
+_latest = {'generation': None, 'expires': 0.0}
+
+
+def latest_generation() -> Optional[DataGeneration]:
+    """
+    Latest completed generation, None before the first one was marked
+    """
+    now = time.monotonic()
+    if now < _latest['expires']:
+        return _latest['generation']
+
+    generation = DataGeneration.objects.order_by('-id').first()
+    with _lock:
+        _latest['generation'] = generation
+        _latest['expires'] = now + settings.DATA_GENERATION_TTL
+    return generation
+
+
+def forget_generation():
+    with _lock:
+        _latest['expires'] = 0.0
+
+
+def mark_generation(dataset: str) -> DataGeneration:
+    """
+    Record that `dataset` was imported or indexed, invalidating all
+    ETags handed out so far
+    """
+    generation = DataGeneration.objects.create(dataset=dataset)
+    forget_generation()
+    log.info('Data generation %d: %s', generation.id, dataset)
+    return generation
+
+
+def granted_scopes(request) -> [str]:
+    is_authorized_for = getattr(request, 'is_authorized_for', None)
+    if is_authorized_for is None:
+        return []
+    return [scope for scope in sorted(all_options) if is_authorized_for(scope)]
+
+
+def generation_etag(generation: DataGeneration, request, scopes) -> str:
+    """
+    Weak ETag of one url, which gives a different response with other
+    scopes or another media type
+    """
+    variant = '|'.join([
+        request.get_full_path(),
+        request.META.get('HTTP_ACCEPT', ''),
+        ','.join(scopes),
+    ])
+    digest = hashlib.md5(variant.encode('utf-8')).hexdigest()[:12]
+    return f'W/"{generation.id}-{digest}"'
+
+
+def patch_generation_headers(response, etag, last_modified, public):
+    response['ETag'] = etag
+    if public:
+        response['Last-Modified'] = http_date(last_modified)
+        patch_cache_control(response, public=True, max_age=settings.CACHE_CONTROL_MAX_AGE)
+    else:
+        patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ('Accept', 'Authorization'))
+
+
+class NotModified(Exception):
+    """
+    Ends a request with `response`, a 304 (or 412) instead of the view
+    """
+
+    def __init__(self, response):
+        super().__init__()
+        self.response = response
+
+
+class GenerationCacheMixin(object):
+    """
+    ETag, Last-Modified and Cache-Control on successful GET responses of a
+    view set, and a 304 for requests that already have the current one.
+
+    The 304 comes after authentication and permission checks. Responses
+    for a token with scopes are private, only an ETag of the same scopes
+    makes them not modified; If-Modified-Since is for public ones only.
+    """
+
+    _generation_headers = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+
+        if request.method not in ('GET', 'HEAD'):
+            return
+
+        generation = latest_generation()
+        if generation is None:
+            return
+
+        scopes = granted_scopes(request)
+        etag = generation_etag(generation, request, scopes)
+        last_modified = int(generation.completed.timestamp())
+        public = not scopes and 'HTTP_AUTHORIZATION' not in request.META
+        self._generation_headers = (etag, last_modified, public)
+
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=last_modified if public else None)
+        if not_modified is not None:
+            # 304, or 412 for a failed If-Match
+            if not_modified.status_code == 304:
+                CONDITIONAL_GETS.inc(result='not_modified')
+                patch_generation_headers(not_modified, *self._generation_headers)
+            raise NotModified(not_modified)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+
+        if self._generation_headers and response.status_code == 200:
+            CONDITIONAL_GETS.inc(result='full')
+            patch_generation_headers(response, *self._generation_headers)
+
+        return response
@@ -0,0 +1,145 @@
+"""
+Geometry options of detail responses.
+
+    ?geometry=full|simplified|bbox|none
+    &tolerance=1      simplification tolerance in metres
+    &precision=2      decimals of the coordinates
+    &srid=4326        coordinates in WGS84 instead of RD
+
+Without any of these the full geometry is serialized as before. With
+them, the geometry is not loaded at all: the database simplifies
+(`ST_SimplifyPreserveTopology`), transforms and writes the GeoJSON with
+the requested precision, and the bbox is read from its envelope.
+"""
+import json
+
+from django.contrib.gis.db.models import GeometryField
+from django.contrib.gis.db.models.functions import AsGeoJSON, Envelope, Transform
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Func
+from rest_framework import serializers
+
+GEOMETRY_FIELD = 'geometrie'
+
+MODES = ('full', 'simplified', 'bbox', 'none')
+PARAMETERS = ('geometry', 'tolerance', 'precision', 'srid')
+SRIDS = (28992, 4326)
+
+DEFAULT_TOLERANCE = 1.0
+MAX_TOLERANCE = 1000.0
+DEFAULT_PRECISION = 8
+MAX_PRECISION = 15
+
+# Annotations read by GeometryOptionsField and BboxMixin
+GEOMETRY_JSON = 'geometry_json'
+GEOMETRY_BBOX = 'geometry_bbox'
+
+
+class SimplifyPreserveTopology(Func):
+    function = 'ST_SimplifyPreserveTopology'
+    arity = 2
+
+    def __init__(self, expression, tolerance, **extra):
+        super().__init__(expression, tolerance, output_field=GeometryField(srid=28992), **extra)
+
+
+class GeometryOptions(object):
+
+    def __init__(self, mode='full', tolerance=DEFAULT_TOLERANCE, precision=DEFAULT_PRECISION, srid=28992):
+        self.mode = mode
+        self.tolerance = tolerance
+        self.precision = precision
+        self.srid = srid
+
+    @classmethod
+    def from_request(cls, request):
+        """
+        Options of the request, None when it asks for nothing special
+        """
+        params = getattr(request, 'query_params', None)
+        if params is None or not any(params.get(name) for name in PARAMETERS):
+            return None
+
+        mode = params.get('geometry') or 'full'
+        if mode not in MODES:
+            raise serializers.ValidationError(f"geometry must be one of {', '.join(MODES)}")
+
+        try:
+            tolerance = float(params.get('tolerance') or DEFAULT_TOLERANCE)
+            precision = int(params.get('precision') or DEFAULT_PRECISION)
+            srid = int(params.get('srid') or 28992)
+        except ValueError:
+            raise serializers.ValidationError("tolerance, precision and srid must be numbers")
+
+        if not 0 < tolerance <= MAX_TOLERANCE:
+            raise serializers.ValidationError(f"tolerance must be between 0 and {MAX_TOLERANCE:g}")
+        if not 0 <= precision <= MAX_PRECISION:
+            raise serializers.ValidationError(f"precision must be between 0 and {MAX_PRECISION}")
+        if srid not in SRIDS:
+            raise serializers.ValidationError(f"srid must be one of {', '.join(map(str, SRIDS))}")
+
+        return cls(mode, tolerance, precision, srid)
+
+    def transformed(self, expression):
+        if self.srid != 28992:
+            return Transform(expression, self.srid)
+        return expression
+
+    def annotations(self) -> dict:
+        annotations = {GEOMETRY_BBOX: self.transformed(Envelope(GEOMETRY_FIELD))}
+
+        if self.mode in ('full', 'simplified'):
+            expression = GEOMETRY_FIELD
+            if self.mode == 'simplified':
+                expression = SimplifyPreserveTopology(expression, self.tolerance)
+            annotations[GEOMETRY_JSON] = AsGeoJSON(self.transformed(expression), precision=self.precision)
+
+        return annotations
+
+
+def has_geometry(model) -> bool:
+    try:
+        return isinstance(model._meta.get_field(GEOMETRY_FIELD), GeometryField)
+    except FieldDoesNotExist:
+        return False
+
+
+def apply_options(queryset, request):
+    """
+    Leave the geometry of `queryset` to the database when the request has
+    geometry options
+    """
+    options = GeometryOptions.from_request(request)
+    if options is None or not has_geometry(queryset.model):
+        return queryset
+    return queryset.defer(GEOMETRY_FIELD).annotate(**options.annotations())
+
+
+def has_options(instance) -> bool:
+    return hasattr(instance, GEOMETRY_BBOX)
+
+
+def bbox(instance):
+    envelope = getattr(instance, GEOMETRY_BBOX)
+    return envelope.extent if envelope else None
+
+
+class GeometryOptionsField(serializers.Field):
+    """
+    The GeoJSON the database wrote for the geometry options, or the
+    geometry itself for objects loaded without options
+    """
+
+    def __init__(self, geometry_field, **kwargs):
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+        self.geometry_field = geometry_field
+
+    def to_representation(self, instance):
+        if not has_options(instance):
+            value = getattr(instance, GEOMETRY_FIELD)
+            return None if value is None else self.geometry_field.to_representation(value)
+
+        geojson = getattr(instance, GEOMETRY_JSON, None)
+        return json.loads(geojson) if geojson else None
@@ -0,0 +1,115 @@
+"""
+Nearest neighbour search.
+
+`?nearest=x,y` orders a list by `geometry <-> point`. PostGIS walks the
+GiST index of the geometry in that order, so the first page is a single
+index probe, without guessing a radius and sorting everything in it.
+The `nearest/` endpoint of `NearestMixin` returns only the `n` nearest,
+without counting.
+
+Coordinates are RD (x, y) or WGS84 (lat, lon), like `locatie`.
+"""
+from collections import OrderedDict
+
+from django.contrib.gis.db.models.functions import Distance, GeoFuncMixin
+from django.contrib.gis.geos import Point
+from django.db.models import FloatField, Func
+from rest_framework import serializers as validation
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+NEAREST_DEFAULT = 10
+NEAREST_MAX = 100
+
+
+class GeometryDistance(GeoFuncMixin, Func):
+    """
+    `a <-> b`, the index assisted distance operator. Only meaningful
+    in ORDER BY, use `Distance` for the actual distance.
+    """
+    output_field = FloatField()
+    arity = 2
+    function = ''
+    arg_joiner = ' <-> '
+    geom_param_pos = (0, 1)
+
+
+def parse_point(x, y) -> Point:
+    """
+    RD point of x, y in RD or of lat, lon in WGS84
+    """
+    x, y = float(x), float(y)
+
+    # Checking if the given coords are in RD, otherwise converting
+    if y > 10:
+        return Point(x, y, srid=28992)
+    return Point(y, x, srid=4326).transform(28992, clone=True)
+
+
+def parse_xy(value: str, name='nearest') -> Point:
+    try:
+        x, y = value.split(',')
+        return parse_point(x, y)
+    except ValueError:
+        raise validation.ValidationError(
+            f"{name} must be rdx,rdy or lat,lon")
+
+
+def order_by_point(queryset, point: Point, geometry_field: str):
+    """
+    Nearest to `point` first, with the distance as `afstand`
+    """
+    # selected as well, SELECT DISTINCT can only order by selected values
+    return (queryset
+            .annotate(afstand=Distance(geometry_field, point),
+                      knn_distance=GeometryDistance(geometry_field, point))
+            .order_by('knn_distance'))
+
+
+def order_by_distance(queryset, value: str, geometry_field: str):
+    """
+    Filter method for `?nearest=x,y`
+    """
+    return order_by_point(queryset, parse_xy(value), geometry_field)
+
+
+def nearest_count(value) -> int:
+    if value in (None, ''):
+        return NEAREST_DEFAULT
+    try:
+        n = int(value)
+    except ValueError:
+        raise validation.ValidationError("n must be a number")
+    if not 0 < n <= NEAREST_MAX:
+        raise validation.ValidationError(f"n must be between 1 and {NEAREST_MAX}")
+    return n
+
+
+class NearestMixin(object):
+    """
+    Adds `nearest/?nearest=x,y&n=10` to a DatapuntViewSet whose filter set
+    has a `nearest` filter (see `order_by_distance`). Other filters of the
+    list apply as well.
+    """
+
+    @action(detail=False, methods=['get'])
+    def nearest(self, request, *args, **kwargs):
+        if not request.query_params.get('nearest'):
+            raise validation.ValidationError("nearest=x,y is required")
+        n = nearest_count(request.query_params.get('n'))
+
+        queryset = self.filter_queryset(self.get_queryset())
+
+        row_serializer = self.get_row_serializer()
+        if row_serializer is not None:
+            results = row_serializer.many(row_serializer.rows(queryset)[:n])
+        else:
+            results = self.get_serializer(queryset[:n], many=True).data
+
+        return Response(OrderedDict([
+            ('_links', OrderedDict([
+                ('self', dict(href=request.build_absolute_uri())),
+            ])),
+            ('count', len(results)),
+            ('results', results),
+        ]))
@@ -0,0 +1,33 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    DataGeneration moves here from the bag app, keeping its rows
+    """
+
+    initial = True
+
+    dependencies = [
+        ('bag', '0010_pandnummeraanduidingrelatie'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    'ALTER TABLE bag_datageneration RENAME TO generic_datageneration',
+                    'ALTER TABLE generic_datageneration RENAME TO bag_datageneration'),
+            ],
+            state_operations=[
+                migrations.CreateModel(
+                    name='DataGeneration',
+                    fields=[
+                        ('id', models.AutoField(primary_key=True, serialize=False)),
+                        ('dataset', models.CharField(max_length=100)),
+                        ('completed', models.DateTimeField(auto_now_add=True)),
+                    ],
+                ),
+            ],
+        ),
+    ]
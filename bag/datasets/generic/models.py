@@ -0,0 +1,15 @@
+from django.db import models
+
+
+class DataGeneration(models.Model):
+    """
+    Written when an import or an elastic index build completes. The
+    latest generation versions every API response, see
+    datasets.generic.generation.
+    """
+    id = models.AutoField(primary_key=True)
+    dataset = models.CharField(max_length=100)
+    completed = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return "{}: {} {}".format(self.id, self.dataset, self.completed)
@@ -0,0 +1,121 @@
+"""
+SQL query count and time per request.
+
+`QueryBudgetMiddleware` records the queries of every request and exports
+them per endpoint on /status/metrics. Views declare how many queries an
+action may take with `query_budget` (see `rest.DatapuntViewSet`).
+Exceeding the budget is logged and counted, and raises
+`QueryBudgetExceeded` when `QUERY_BUDGET_RAISE` is set, as it is in
+tests, so N+1 regressions fail the build instead of production.
+"""
+import logging
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+from health import metrics
+
+log = logging.getLogger(__name__)
+
+SQL_QUERIES = metrics.histogram(
+    'api_sql_queries',
+    'SQL queries per request',
+    ('endpoint',),
+    buckets=(1, 2, 3, 5, 10, 20, 50, 100, 200, 500, 1000))
+
+SQL_SECONDS = metrics.histogram(
+    'api_sql_seconds',
+    'Time spent in SQL queries per request',
+    ('endpoint',))
+
+BUDGET_EXCEEDED = metrics.counter(
+    'api_query_budget_exceeded_total',
+    'Requests that did more SQL queries than the budget of the endpoint',
+    ('endpoint',))
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryRecorder(object):
+    """
+    Counts and times the SQL queries executed while recording
+    """
+
+    def __init__(self, keep_sql=False):
+        self.count = 0
+        self.seconds = 0.0
+        self.keep_sql = keep_sql
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - start
+            if self.keep_sql:
+                self.statements.append(sql)
+
+    @contextmanager
+    def record(self):
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(self))
+            yield self
+
+    def over_budget_message(self, endpoint: str, budget: int) -> str:
+        message = f'{endpoint} executed {self.count} SQL queries, budget is {budget}'
+        if self.statements:
+            message += '\n' + '\n'.join(
+                f'{i}. {sql}' for i, sql in enumerate(self.statements, start=1))
+        return message
+
+
+def endpoint_name(request) -> str:
+    """
+    Url name of the endpoint, like `pand-list` or `pand-detail`, so
+    list and detail actions are reported separately
+    """
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    return match.view_name or match.url_name or 'unnamed'
+
+
+def _is_browsable(response) -> bool:
+    renderer = getattr(response, 'accepted_renderer', None)
+    return getattr(renderer, 'format', None) == 'api'
+
+
+class QueryBudgetMiddleware(object):
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder(keep_sql=settings.QUERY_BUDGET_RAISE)
+
+        with recorder.record():
+            response = self.get_response(request)
+
+        endpoint = endpoint_name(request)
+        SQL_QUERIES.observe(recorder.count, endpoint=endpoint)
+        SQL_SECONDS.observe(recorder.seconds, endpoint=endpoint)
+
+        budget = getattr(response, 'query_budget', None)
+
+        # The browsable api renders forms, it does not count
+        if budget is not None and recorder.count > budget and not _is_browsable(response):
+            BUDGET_EXCEEDED.inc(endpoint=endpoint)
+            if settings.QUERY_BUDGET_RAISE:
+                raise QueryBudgetExceeded(recorder.over_budget_message(endpoint, budget))
+            log.warning(
+                '%s executed %d SQL queries, budget is %d: %s',
+                endpoint, recorder.count, budget, request.get_full_path())
+
+        return response
@@ -0,0 +1,148 @@
+"""
+Cache of rendered detail responses.
+
+Detail responses are stored after rendering, keyed on the data
+generation, the absolute url, the accepted renderer and media type, and
+every authorization scope the caller was granted. Serializers choose
+fields by scope, so a response is only ever served to callers with the
+exact same scopes. A new data generation expires everything: its id is
+part of the key, and the in-process cache is emptied when it changes.
+
+The in-process cache is a bounded LRU of `RESPONSE_CACHE_SIZE`
+responses. With `RESPONSE_CACHE_BACKEND` set to a Django cache alias,
+responses are shared between processes through that cache as well.
+Nothing is cached before the first generation is marked.
+"""
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+from health import metrics
+from . import generation
+from .query_budget import endpoint_name
+
+log = logging.getLogger(__name__)
+
+RESPONSE_CACHE = metrics.counter(
+    'api_response_cache_total',
+    'Detail requests by response cache result (hit, shared_hit, miss)',
+    ('endpoint', 'result'))
+
+# Large responses would push out many small ones
+MAX_CONTENT_LENGTH = 256 * 1024
+
+
+class LRUCache(object):
+    """
+    Thread safe least recently used cache of at most `size` items
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.items = OrderedDict()
+        self.generation = None
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.items)
+
+    def get(self, key):
+        with self.lock:
+            value = self.items.get(key)
+            if value is not None:
+                self.items.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.items[key] = value
+            self.items.move_to_end(key)
+            while len(self.items) > self.size:
+                self.items.popitem(last=False)
+
+    def clear(self, generation=None):
+        with self.lock:
+            self.items.clear()
+            self.generation = generation
+
+
+_local = LRUCache(settings.RESPONSE_CACHE_SIZE)
+
+
+def shared_cache():
+    alias = settings.RESPONSE_CACHE_BACKEND
+    return caches[alias] if alias else None
+
+
+def cache_key(request) -> Optional[str]:
+    """
+    Key of the response for this request, None when it must not be cached
+    """
+    current = generation.latest_generation()
+    renderer = getattr(request, 'accepted_renderer', None)
+
+    # the browsable api renders forms for the user
+    if current is None or renderer is None or renderer.format == 'api':
+        return None
+
+    if _local.generation != current.id:
+        _local.clear(current.id)
+
+    parts = [
+        str(current.id),
+        request.build_absolute_uri(),
+        renderer.format or '',
+        request.accepted_media_type or '',
+        ','.join(generation.granted_scopes(request)),
+    ]
+    return 'response:' + hashlib.sha1('\n'.join(parts).encode('utf-8')).hexdigest()
+
+
+def _response(cached) -> HttpResponse:
+    content, content_type = cached
+    return HttpResponse(content, content_type=content_type)
+
+
+def lookup(request, key) -> Optional[HttpResponse]:
+    endpoint = endpoint_name(request)
+
+    cached = _local.get(key)
+    if cached is not None:
+        RESPONSE_CACHE.inc(endpoint=endpoint, result='hit')
+        return _response(cached)
+
+    shared = shared_cache()
+    if shared is not None:
+        cached = shared.get(key)
+        if cached is not None:
+            _local.set(key, cached)
+            RESPONSE_CACHE.inc(endpoint=endpoint, result='shared_hit')
+            return _response(cached)
+
+    RESPONSE_CACHE.inc(endpoint=endpoint, result='miss')
+    return None
+
+
+def store(key, response):
+    """
+    Cache `response` once it is rendered, if it is a small enough 200
+    """
+    def rendered(rendered_response):
+        if rendered_response.status_code != 200 or len(rendered_response.content) > MAX_CONTENT_LENGTH:
+            return
+
+        cached = (rendered_response.content, rendered_response['Content-Type'])
+        _local.set(key, cached)
+
+        shared = shared_cache()
+        if shared is not None:
+            shared.set(key, cached, settings.RESPONSE_CACHE_TIMEOUT)
+
+    if hasattr(response, 'add_post_render_callback'):
+        response.add_post_render_callback(rendered)
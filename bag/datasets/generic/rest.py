@@ -1,17 +1,25 @@
 # Python
 from collections import OrderedDict
 import json
+from typing import Optional
+from urllib.parse import quote
 # Packages
 from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connection
+from django.db.models import Count, ForeignObjectRel, IntegerField, OuterRef, QuerySet, Subquery
+from django.db.models.functions import Coalesce
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import renderers, serializers
 from rest_framework import pagination, response, viewsets
+from rest_framework.exceptions import NotFound
 from rest_framework.reverse import reverse
 from rest_framework.utils.urls import replace_query_param
 
 from rest_framework_extensions.mixins import DetailSerializerMixin
 
 from rest_framework_xml.renderers import XMLRenderer
+from . import generation, geometry, response_cache
 from .renderers import PaginatedCSVRenderer
 
 
@@ -88,6 +96,48 @@ class HALSerializer(serializers.HyperlinkedModelSerializer):
     url_field_name = '_links'
     serializer_url_field = LinksField
 
+    def get_fields(self):
+        fields = super().get_fields()
+
+        # the database writes the geometry for ?geometry= and friends
+        field = fields.get(geometry.GEOMETRY_FIELD)
+        if (field is not None and geometry.has_geometry(self.Meta.model)
+                and geometry.GeometryOptions.from_request(self.context.get('request'))):
+            fields[geometry.GEOMETRY_FIELD] = geometry.GeometryOptionsField(field)
+
+        return fields
+
+    def to_representation(self, instance):
+        self.collect_related_counts(instance)
+        return super().to_representation(instance)
+
+    def collect_related_counts(self, instance):
+        """
+        Count the relations of all RelatedSummaryFields in one query, for
+        all objects of the list this instance is serialized in
+        """
+        if getattr(instance, 'pk', None) is None or hasattr(instance, RELATED_COUNTS):
+            return
+
+        names = [
+            field.source_attrs[-1] for field in self.fields.values()
+            if isinstance(field, RelatedSummaryField) and len(field.source_attrs) == 1
+            and getattr(instance, f'{field.source_attrs[-1]}_count', None) is None
+        ]
+        if not names:
+            return
+
+        instances = [instance]
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer) and isinstance(parent.instance, (list, QuerySet)):
+            instances += [
+                obj for obj in parent.instance
+                if obj is not instance and isinstance(obj, type(instance))
+                and not hasattr(obj, RELATED_COUNTS)
+            ]
+
+        collect_related_counts(instances, names)
+
     def get_url(self, obj, view_name, request, _format):
 
         landelijk_id = getattr(obj, 'landelijk_id', None)
@@ -105,36 +155,99 @@ class HALSerializer(serializers.HyperlinkedModelSerializer):
             view_name, kwargs=url_kwargs, request=request, format=_format)
 
 
+# Characters `reverse()` leaves unquoted in a path
+URL_SAFE = "!$&'()*+,;=/~:@"
+
+URL_PLACEHOLDER = 'urlplaceholder0'
+
+
+class DetailUrlTemplate(object):
+    """
+    Detail url of `view_name` reversed once, for many lookup values
+    """
+
+    def __init__(self, view_name, request):
+        url = reverse(view_name, kwargs={'pk': URL_PLACEHOLDER}, request=request)
+        self.prefix, self.suffix = url.split(URL_PLACEHOLDER)
+
+    def url(self, value) -> str:
+        return self.prefix + quote(str(value), safe=URL_SAFE) + self.suffix
+
+
+class RowSerializer(object):
+    """
+    Fast path for list endpoints. Reads the page as `values()` rows and
+    builds the same output as `serializer_class` does for model instances,
+    without DRF fields and with `_links` from a url template.
+
+    Subclasses list the `values` to read and implement
+    `to_representation(row)`. The viewset uses it when its list would be
+    serialized with `serializer_class`, see `DatapuntViewSet.list`.
+    """
+    serializer_class = None
+    view_name = None
+    lookup = 'landelijk_id'
+    values = ()
+
+    def __init__(self, request):
+        self.request = request
+        self.url_template = DetailUrlTemplate(self.view_name, request)
+
+    def annotate(self, queryset):
+        return queryset
+
+    def rows(self, queryset, *extra):
+        queryset = self.annotate(queryset.prefetch_related(None))
+        return queryset.values('pk', *self.values, *extra)
+
+    def links(self, row) -> OrderedDict:
+        return OrderedDict([
+            ('self', {'href': self.url_template.url(row[self.lookup])}),
+        ])
+
+    def to_representation(self, row) -> OrderedDict:
+        raise NotImplementedError()
+
+    def many(self, rows) -> list:
+        return [self.to_representation(row) for row in rows]
+
+
 class HALPagination(pagination.PageNumberPagination):
     page_size_query_param = 'page_size'
 
     def get_paginated_response(self, data):
+        next_number = self.page.next_page_number() if self.page.has_next() else None
+        previous_number = self.page.previous_page_number() if self.page.has_previous() else None
+
+        return response.Response(self.paginated_data(
+            data, next_number, previous_number, self.page.paginator.count))
+
+    def paginated_data(self, data, next_number, previous_number, count) -> OrderedDict:
         self_link = self.request.build_absolute_uri()
         if self_link.endswith(".api"):
             self_link = self_link[:-4]
 
-        if self.page.has_next():
+        if next_number:
             next_link = replace_query_param(
-                self_link, self.page_query_param, self.page.next_page_number())
+                self_link, self.page_query_param, next_number)
         else:
             next_link = None
 
-        if self.page.has_previous():
+        if previous_number:
             prev_link = replace_query_param(
-                self_link, self.page_query_param,
-                self.page.previous_page_number())
+                self_link, self.page_query_param, previous_number)
         else:
             prev_link = None
 
-        return response.Response(OrderedDict([
+        return OrderedDict([
             ('_links', OrderedDict([
                 ('self', dict(href=self_link)),
                 ('next', dict(href=next_link)),
                 ('previous', dict(href=prev_link)),
             ])),
-            ('count', self.page.paginator.count),
+            ('count', count),
             ('results', data)
-        ]))
+        ])
 
 
 class LimitedHALPagination(HALPagination):
@@ -142,7 +255,132 @@ class LimitedHALPagination(HALPagination):
     page_size = 5
 
 
-class DatapuntViewSet(DetailSerializerMixin, viewsets.ReadOnlyModelViewSet):
+def table_row_estimate(model) -> Optional[int]:
+    """
+    Planner estimate of the number of rows in the table of a model, None
+    when the table has not been analyzed yet
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+            [model._meta.db_table])
+        row = cursor.fetchone()
+
+    if row and row[0] > 0:
+        return row[0]
+    return None
+
+
+def queryset_row_estimate(queryset) -> int:
+    """
+    Planner estimate of the number of rows of a queryset
+    """
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class CountFreeHALPagination(HALPagination):
+    """
+    Pagination for big tables, without a COUNT(*) on every page.
+
+    The next link is decided by fetching one row more than the page size.
+    The count is exact on the last page and for filtered results of at
+    most `exact_count_limit` rows. Otherwise it is the planner estimate
+    (updated by ANALYZE after the import) and `count_estimated` is true.
+    """
+    exact_count_limit = 10000
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        page_number = request.query_params.get(self.page_query_param, 1)
+        try:
+            page_number = int(page_number)
+            if page_number < 1:
+                raise ValueError
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_page_message.format(
+                page_number=page_number, message='That page number is not a valid integer'))
+
+        offset = (page_number - 1) * page_size
+        rows = list(queryset[offset:offset + page_size + 1])
+        if not rows and page_number > 1:
+            raise NotFound(self.invalid_page_message.format(
+                page_number=page_number, message='That page contains no results'))
+
+        self.request = request
+        self.page_number = page_number
+        self.has_next = len(rows) > page_size
+        self.count, self.count_estimated = self.get_count(queryset, offset + len(rows))
+
+        return rows[:page_size]
+
+    def get_count(self, queryset, seen: int) -> (int, bool):
+        """
+        (count, estimated) of the queryset, having seen `seen` rows
+        """
+        if not self.has_next:
+            return seen, False
+
+        if queryset.query.where:
+            count = queryset.order_by()[:self.exact_count_limit + 1].count()
+            if count <= self.exact_count_limit:
+                return count, False
+            return max(queryset_row_estimate(queryset), count), True
+
+        estimate = table_row_estimate(queryset.model)
+        if estimate is None:
+            return queryset.count(), False
+        return max(estimate, seen), True
+
+    def get_paginated_response(self, data):
+        next_number = self.page_number + 1 if self.has_next else None
+        previous_number = self.page_number - 1 if self.page_number > 1 else None
+
+        result = self.paginated_data(data, next_number, previous_number, self.count)
+        result['count_estimated'] = self.count_estimated
+        result.move_to_end('results')
+        return response.Response(result)
+
+
+class HALCursorPagination(pagination.CursorPagination):
+    """
+    Keyset pagination for harvesting a whole list. Every page is an index
+    range scan on the ordering key, kept in an opaque `cursor` in the
+    next link. An empty `cursor` starts at the first page.
+    """
+    page_size_query_param = 'page_size'
+    ordering = 'pk'
+
+    def decode_cursor(self, request):
+        if not request.query_params.get(self.cursor_query_param):
+            return None
+        return super().decode_cursor(request)
+
+    def get_paginated_response(self, data):
+        self_link = self.request.build_absolute_uri()
+        if self_link.endswith(".api"):
+            self_link = self_link[:-4]
+
+        return response.Response(OrderedDict([
+            ('_links', OrderedDict([
+                ('self', dict(href=self_link)),
+                ('next', dict(href=self.get_next_link())),
+                ('previous', dict(href=self.get_previous_link())),
+            ])),
+            ('results', data)
+        ]))
+
+
+class DatapuntViewSet(generation.GenerationCacheMixin, DetailSerializerMixin, viewsets.ReadOnlyModelViewSet):
 
     renderer_classes = DEFAULT_RENDERERS
     pagination_class = HALPagination
@@ -151,11 +389,188 @@ class DatapuntViewSet(DetailSerializerMixin, viewsets.ReadOnlyModelViewSet):
     # default ordering
     ordering = ('id',)
 
+    # Maximum number of SQL queries per action, checked by
+    # QueryBudgetMiddleware. `list_detailed` is the list with the
+    # detail serializer. A budget counts every query of the request:
+    # the data generation lookup, pagination and the lookups of the
+    # model choice filters as well.
+    query_budget = {}
+
+    # Unique, indexed key for keyset pagination, used when a list is
+    # requested with ?cursor. The list is then ordered by this key.
+    cursor_ordering = 'pk'
+
+    @property
+    def paginator(self):
+        request = getattr(self, 'request', None)
+        if (not hasattr(self, '_paginator') and self.cursor_ordering and self.pagination_class
+                and request is not None
+                and HALCursorPagination.cursor_query_param in request.query_params):
+            paginator = HALCursorPagination()
+            paginator.ordering = self.cursor_ordering
+            paginator.page_size = self.pagination_class.page_size
+            paginator.max_page_size = self.pagination_class.max_page_size
+            self._paginator = paginator
+        return super().paginator
+
+    # Serve repeated detail requests from the response cache
+    cache_detail = False
+
+    # RowSerializer for lists that use its `serializer_class`
+    row_serializer_class = None
+
+    def get_row_serializer(self) -> Optional[RowSerializer]:
+        row_serializer_class = self.row_serializer_class
+        if row_serializer_class is None or self.get_serializer_class() is not row_serializer_class.serializer_class:
+            return None
+        return row_serializer_class(self.request)
+
+    def get_queryset(self, *args, **kwargs):
+        queryset = super().get_queryset(*args, **kwargs)
+
+        meta = getattr(self.get_serializer_class(), 'Meta', None)
+        if geometry.GEOMETRY_FIELD in getattr(meta, 'fields', ()):
+            queryset = geometry.apply_options(queryset, self.request)
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        row_serializer = self.get_row_serializer()
+        if row_serializer is None:
+            return super().list(request, *args, **kwargs)
+
+        rows = row_serializer.rows(self.filter_queryset(self.get_queryset()))
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(row_serializer.many(page))
+
+        return response.Response(row_serializer.many(rows))
+
+    def retrieve(self, request, *args, **kwargs):
+        key = response_cache.cache_key(request) if self.cache_detail else None
+        if key is None:
+            return super().retrieve(request, *args, **kwargs)
+
+        cached = response_cache.lookup(request, key)
+        if cached is not None:
+            return cached
+
+        response = super().retrieve(request, *args, **kwargs)
+        response_cache.store(key, response)
+        return response
+
+    def is_detailed_list(self) -> bool:
+        """
+        A list rendered with the detail serializer, see `detailed_keyword`
+        """
+        detailed_keyword = getattr(self, 'detailed_keyword', None)
+        return self.action == 'list' and bool(detailed_keyword and self.request.GET.get(detailed_keyword))
+
+    def get_query_budget(self):
+        action = 'list_detailed' if self.is_detailed_list() else self.action
+        return self.query_budget.get(action)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        response.query_budget = self.get_query_budget()
+        return response
+
+
+# Attribute with the counts collected by `collect_related_counts`
+RELATED_COUNTS = '_related_counts'
+
+
+def related_count_expression(model, name):
+    """
+    Subquery counting the objects in to-many relation `name` of `model`,
+    to use in `annotate()`. None for any other field.
+    """
+    try:
+        field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+
+    if not (field.one_to_many or field.many_to_many):
+        return None
+
+    if isinstance(field, ForeignObjectRel):
+        # reverse foreign key or reverse many to many
+        related_model = field.related_model
+        lookup = field.field.name
+        outer = field.field.target_field.attname if field.one_to_many else 'pk'
+    else:
+        related_model = field.related_model
+        lookup = field.related_query_name()
+        outer = 'pk'
+
+    counts = (
+        related_model._default_manager
+        .filter(**{lookup: OuterRef(outer)})
+        .order_by()
+        .values(lookup)
+        .annotate(count=Count('*'))
+        .values('count')
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def related_count_annotations(model, *names) -> dict:
+    """
+    Annotations `<name>_count` for the relations `names` of `model`.
+    RelatedSummaryField uses them instead of counting per object.
+
+        queryset.annotate(**related_count_annotations(Pand, 'verblijfsobjecten'))
+    """
+    return {
+        f'{name}_count': related_count_expression(model, name)
+        for name in names
+    }
+
+
+def collect_related_counts(instances, names):
+    """
+    Count the relations `names` of all instances in one query and store
+    them on the instances for RelatedSummaryField
+    """
+    if not instances:
+        return
+
+    model = type(instances[0])
+    annotations = {
+        alias: expression
+        for alias, expression in related_count_annotations(model, *names).items()
+        if expression is not None
+    }
+
+    counts = {}
+    if annotations:
+        rows = (
+            model._default_manager
+            .filter(pk__in=[instance.pk for instance in instances])
+            .order_by()
+            .annotate(**annotations)
+            .values_list('pk', *annotations)
+        )
+        counts = {
+            pk: dict(zip((alias[:-len('_count')] for alias in annotations), values))
+            for pk, *values in rows
+        }
+
+    for instance in instances:
+        setattr(instance, RELATED_COUNTS, counts.get(instance.pk, {}))
+
 
 class RelatedSummaryField(serializers.Field):
+    """
+    Count and link of a related manager.
+
+    The count is taken from a `<name>_count` annotation or the counts
+    collected by `HALSerializer` for the whole page, and only falls
+    back on `count()` when neither is there.
+    """
 
     def to_representation(self, value):
-        count = value.count()
+        count = self.get_count(value)
 
         model_name = value.model.__name__
         mapping = model_name.lower() + "-list"
@@ -177,6 +592,20 @@ class RelatedSummaryField(serializers.Field):
             'href': f"{url}{separator}{filter_name}={parent_pk}",
         }
 
+    def get_count(self, value) -> int:
+        name = self.source_attrs[-1]
+        instance = value.instance
+
+        count = getattr(instance, f'{name}_count', None)
+        if count is not None:
+            return count
+
+        counts = getattr(instance, RELATED_COUNTS, {})
+        if name in counts:
+            return counts[name]
+
+        return value.count()
+
 
 class ExternalRelationField(serializers.Field):
     def __init__(self, path, parameter_name, host=settings.DATAPUNT_API_URL):
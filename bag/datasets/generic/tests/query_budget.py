@@ -0,0 +1,26 @@
+from contextlib import contextmanager
+
+from datasets.generic.query_budget import QueryRecorder
+
+
+class QueryBudgetMixin(object):
+    """
+    Helper to check the number of SQL queries of a block of code
+
+    to use with:
+
+        with self.assertMaxQueries(5):
+            self.client.get('/bag/v1.1/pand/')
+
+    Endpoints with a `query_budget` are also checked by the
+    QueryBudgetMiddleware on every request made in tests.
+    """
+
+    @contextmanager
+    def assertMaxQueries(self, budget: int):
+        recorder = QueryRecorder(keep_sql=True)
+        with recorder.record():
+            yield recorder
+
+        if recorder.count > budget:
+            self.fail(recorder.over_budget_message('block', budget))
@@ -0,0 +1,148 @@
+"""
+Generalised variants of the geo_ tables, for small scale maps.
+
+`create_geo_tables` builds `<view>_g1` .. `<view>_g4` next to the
+`<view>_mat` table of every polygon view; points and lines have no area
+and keep only their `_mat` table. Level n is simplified with
+`TOLERANCES[n - 1]` metres and leaves out features smaller than a pixel
+at the largest scale it is meant for. `geo_generalization` describes every
+variant: its tolerance, the minimum area of its features, the range of
+scales it fits and its number of features.
+
+A variant fits when the map resolution is at least twice its tolerance,
+so simplification never moves an edge by more than half a pixel.
+"""
+import math
+from typing import Optional, Set
+
+from django.db import connection
+
+TOLERANCES = (1.0, 4.0, 16.0, 64.0)
+
+# Metres per pixel at scale 1:1, the standard OGC pixel size
+PIXEL_SIZE = 0.00028
+
+# Ground metres per web mercator metre in Amsterdam
+MERCATOR_FACTOR = math.cos(math.radians(52.37))
+
+METADATA_TABLE = 'geo_generalization'
+
+POLYGON_TYPES = ('POLYGON', 'MULTIPOLYGON')
+
+
+def variant_name(view_name: str, level: int) -> str:
+    return f'{view_name}_g{level}'
+
+
+def min_resolution(level: int) -> float:
+    return 2 * TOLERANCES[level - 1]
+
+
+def min_area(level: int) -> float:
+    return min_resolution(level) ** 2
+
+
+def min_scale(level: int) -> int:
+    return int(round(min_resolution(level) / PIXEL_SIZE))
+
+
+def max_scale(level: int) -> Optional[int]:
+    if level == len(TOLERANCES):
+        return None
+    return min_scale(level + 1)
+
+
+def level_for_resolution(resolution: float) -> int:
+    """
+    Most generalised level for a map resolution in metres per pixel,
+    0 for the full detail `_mat` table
+    """
+    level = 0
+    for candidate in range(1, len(TOLERANCES) + 1):
+        if resolution >= min_resolution(candidate):
+            level = candidate
+    return level
+
+
+def create_metadata_table(cursor):
+    cursor.execute(f"""
+CREATE TABLE IF NOT EXISTS {connection.ops.quote_name(METADATA_TABLE)} (
+  layer VARCHAR(100) NOT NULL,
+  table_name VARCHAR(100) NOT NULL,
+  level INTEGER NOT NULL,
+  tolerance DOUBLE PRECISION NOT NULL,
+  min_area DOUBLE PRECISION NOT NULL,
+  min_scale INTEGER NOT NULL,
+  max_scale INTEGER,
+  features INTEGER NOT NULL,
+  PRIMARY KEY (layer, level)
+)""")
+
+
+def is_polygonal(cursor, table: str) -> bool:
+    """
+    Whether `table` holds polygons, by the type of its `geometrie` column or
+    by its first feature when the column allows any geometry
+    """
+    cursor.execute(
+        "SELECT upper(type) FROM geometry_columns "
+        "WHERE f_table_schema = current_schema() AND f_table_name = %s AND f_geometry_column = 'geometrie'",
+        [table])
+    row = cursor.fetchone()
+    if row and row[0] != 'GEOMETRY':
+        return row[0] in POLYGON_TYPES
+
+    quote = connection.ops.quote_name
+    cursor.execute(f'SELECT GeometryType(geometrie) FROM {quote(table)} WHERE geometrie IS NOT NULL LIMIT 1')
+    row = cursor.fetchone()
+    return row is not None and row[0] in POLYGON_TYPES
+
+
+def create_variant(cursor, source: str, table: str, level: int) -> int:
+    """
+    Create `table` as generalised copy of `source`, returns its number of
+    features
+    """
+    quote = connection.ops.quote_name
+
+    columns = [
+        'ST_SimplifyPreserveTopology(geometrie, %(tolerance)s) AS geometrie' if column.name == 'geometrie'
+        else quote(column.name)
+        for column in connection.introspection.get_table_description(cursor, source)
+    ]
+
+    cursor.execute(
+        f'CREATE TABLE {quote(table)} AS SELECT {", ".join(columns)} FROM {quote(source)} '
+        'WHERE ST_Area(geometrie) >= %(min_area)s',
+        {'tolerance': TOLERANCES[level - 1], 'min_area': min_area(level)})
+
+    cursor.execute(f'SELECT count(*) FROM {quote(table)}')
+    return cursor.fetchone()[0]
+
+
+def record_variants(cursor, view_name: str, features: dict):
+    """
+    Replace the metadata of the variants of `view_name`, with the number
+    of features per level
+    """
+    quote = connection.ops.quote_name
+    cursor.execute(f'DELETE FROM {quote(METADATA_TABLE)} WHERE layer = %s', [view_name])
+    for level, count in sorted(features.items()):
+        cursor.execute(
+            f'INSERT INTO {quote(METADATA_TABLE)} VALUES (%s, %s, %s, %s, %s, %s, %s, %s)',
+            [view_name, variant_name(view_name, level), level, TOLERANCES[level - 1],
+             min_area(level), min_scale(level), max_scale(level), count])
+
+
+def recorded_levels(cursor, view_name: str) -> Set[int]:
+    """
+    Levels of the variants built for `view_name`, none before the first
+    `create_geo_tables`
+    """
+    cursor.execute('SELECT to_regclass(%s) IS NOT NULL', [METADATA_TABLE])
+    if not cursor.fetchone()[0]:
+        return set()
+
+    cursor.execute(
+        f'SELECT level FROM {connection.ops.quote_name(METADATA_TABLE)} WHERE layer = %s', [view_name])
+    return {level for level, in cursor.fetchall()}
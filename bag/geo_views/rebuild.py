@@ -0,0 +1,246 @@
+"""
+Rebuild of the `geo_*_mat` tables and their generalised variants.
+
+The source tables of every geo_ view are read from the dependencies
+PostgreSQL keeps for views. A view is rebuilt when its fingerprint
+changed since its last build: the digest of its definition, and the file
+node (new after a TRUNCATE or table rewrite) and the insert, update and
+delete counters of every source table. A view whose `_mat` table or one
+of its variants is missing is rebuilt as well. After a BRK import only
+the lki views are rebuilt.
+
+Every view is built as `<view>_mat_new`, with variants when it holds
+polygons, indexed, clustered and analyzed, then swapped in with one
+transaction of renames, so readers never see a missing or half built
+table. Views are built on parallel connections, `jobs` at a time. Builds
+and their timings are recorded in `geo_table_builds`.
+"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Set
+
+from django.db import connection, transaction
+
+from . import generalization
+
+log = logging.getLogger(__name__)
+
+BUILDS_TABLE = 'geo_table_builds'
+
+SUFFIX = '_new'
+
+
+def quote(name: str) -> str:
+    return connection.ops.quote_name(name)
+
+
+def create_builds_table(cursor):
+    cursor.execute(f"""
+CREATE TABLE IF NOT EXISTS {quote(BUILDS_TABLE)} (
+  view_name VARCHAR(100) PRIMARY KEY,
+  fingerprint TEXT NOT NULL,
+  built TIMESTAMP WITH TIME ZONE NOT NULL,
+  seconds DOUBLE PRECISION NOT NULL
+)""")
+
+
+def geo_views(cursor) -> List[str]:
+    return sorted(
+        table_info.name for table_info in connection.introspection.get_table_list(cursor)
+        if table_info.type == 'v' and table_info.name.startswith('geo_')
+    )
+
+
+def view_sources(cursor) -> Dict[str, Set[str]]:
+    """
+    Tables every geo_ view selects from, through other views as well
+    """
+    cursor.execute("""
+SELECT DISTINCT view.relname, source.relname, source.relkind
+FROM pg_depend dependency
+JOIN pg_rewrite rule ON rule.oid = dependency.objid
+JOIN pg_class view ON view.oid = rule.ev_class
+JOIN pg_class source ON source.oid = dependency.refobjid
+WHERE dependency.classid = 'pg_rewrite'::regclass
+  AND dependency.refclassid = 'pg_class'::regclass
+  AND view.relkind = 'v'
+  AND source.oid <> view.oid""")
+
+    direct = {}
+    is_view = set()
+    for view, source, kind in cursor.fetchall():
+        direct.setdefault(view, set()).add(source)
+        if kind == 'v':
+            is_view.add(source)
+
+    def tables(view, seen):
+        found = set()
+        for source in direct.get(view, ()):
+            if source in is_view:
+                if source not in seen:
+                    found |= tables(source, seen | {source})
+            else:
+                found.add(source)
+        return found
+
+    return {view: tables(view, {view}) for view in geo_views(cursor)}
+
+
+def fingerprint(cursor, view: str, tables) -> str:
+    """
+    Digest of the definition of `view` and the state of its source `tables`
+    """
+    cursor.execute('SELECT md5(pg_get_viewdef(%s::regclass))', [quote(view)])
+    definition = cursor.fetchone()[0]
+
+    cursor.execute("""
+SELECT c.relname, c.relfilenode,
+       coalesce(s.n_tup_ins, 0), coalesce(s.n_tup_upd, 0), coalesce(s.n_tup_del, 0)
+FROM pg_class c
+LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid
+WHERE c.relname = ANY(%s)
+ORDER BY c.relname""", [sorted(tables)])
+    return ';'.join([definition] + [':'.join(map(str, row)) for row in cursor.fetchall()])
+
+
+def relation_kinds(cursor) -> Dict[str, str]:
+    """
+    Tables and materialized views, with their relkind
+    """
+    cursor.execute("SELECT relname, relkind FROM pg_class WHERE relkind IN ('r', 'm') AND pg_table_is_visible(oid)")
+    return dict(cursor.fetchall())
+
+
+def is_complete(cursor, view: str, kinds: Dict[str, str]) -> bool:
+    """
+    Whether `view` has a `_mat` table and, when it holds polygons, all its
+    variants, by the `relation_kinds`
+    """
+    mat = f'{view}_mat'
+    # a materialized view is what the migrations create, never a build
+    if kinds.get(mat) != 'r':
+        return False
+    if not generalization.is_polygonal(cursor, mat):
+        return True
+    return all(
+        kinds.get(generalization.variant_name(view, level)) == 'r'
+        for level in range(1, len(generalization.TOLERANCES) + 1)
+    )
+
+
+def stale_views(cursor, views, force=False) -> Dict[str, str]:
+    """
+    Views whose definition or sources changed since their last build, or
+    that were never built completely, with their fingerprint now
+    """
+    sources = view_sources(cursor)
+
+    cursor.execute(f'SELECT view_name, fingerprint FROM {quote(BUILDS_TABLE)}')
+    built = dict(cursor.fetchall())
+
+    kinds = relation_kinds(cursor)
+
+    stale = {}
+    for view in views:
+        current = fingerprint(cursor, view, sources.get(view, ()))
+        if force or built.get(view) != current or not is_complete(cursor, view, kinds):
+            stale[view] = current
+    return stale
+
+
+def drop_relation(cursor, name: str):
+    cursor.execute('SELECT relkind FROM pg_class WHERE relname = %s', [name])
+    row = cursor.fetchone()
+    if row is None:
+        return
+    kind = 'MATERIALIZED VIEW' if row[0] == 'm' else 'TABLE'
+    cursor.execute(f'DROP {kind} {quote(name)}')
+
+
+def index_geo(cursor, table: str, index: str):
+    cursor.execute(f'CREATE INDEX {quote(index)} ON {quote(table)} USING GIST(geometrie)')
+    cursor.execute(f'CLUSTER {quote(table)} USING {quote(index)}')
+    cursor.execute(f'VACUUM ANALYZE {quote(table)}')
+
+
+def swap(cursor, table: str, index: str):
+    drop_relation(cursor, table)
+    cursor.execute(f'ALTER TABLE {quote(table + SUFFIX)} RENAME TO {quote(table)}')
+    cursor.execute(f'ALTER INDEX {quote(index + SUFFIX)} RENAME TO {quote(index)}')
+
+
+def build_view(view: str, view_fingerprint: str) -> float:
+    """
+    Build `<view>_mat` and its variants under a temporary name and swap
+    them in, returns the seconds it took
+    """
+    start = time.monotonic()
+    mat = f'{view}_mat'
+    tables = [(mat, f'{view}_idx')] + [
+        (generalization.variant_name(view, level), f'{generalization.variant_name(view, level)}_idx')
+        for level in range(1, len(generalization.TOLERANCES) + 1)
+    ]
+
+    with connection.cursor() as cursor:
+        for table, _ in tables:
+            drop_relation(cursor, table + SUFFIX)
+
+        cursor.execute(f'CREATE TABLE {quote(mat + SUFFIX)} AS SELECT * FROM {quote(view)}')
+        index_geo(cursor, mat + SUFFIX, f'{view}_idx' + SUFFIX)
+
+        features = {}
+        # points and lines have no area, their variants would be empty
+        if generalization.is_polygonal(cursor, mat + SUFFIX):
+            for level, (table, index) in enumerate(tables[1:], start=1):
+                features[level] = generalization.create_variant(cursor, mat + SUFFIX, table + SUFFIX, level)
+                index_geo(cursor, table + SUFFIX, index + SUFFIX)
+
+    seconds = time.monotonic() - start
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        swap(cursor, *tables[0])
+        for level, (table, index) in enumerate(tables[1:], start=1):
+            if level in features:
+                swap(cursor, table, index)
+            else:
+                drop_relation(cursor, table)
+        generalization.record_variants(cursor, view, features)
+        cursor.execute(f'DELETE FROM {quote(BUILDS_TABLE)} WHERE view_name = %s', [view])
+        cursor.execute(
+            f'INSERT INTO {quote(BUILDS_TABLE)} VALUES (%s, %s, now(), %s)',
+            [view, view_fingerprint, seconds])
+
+    return seconds
+
+
+def _build_in_thread(view: str, view_fingerprint: str) -> float:
+    try:
+        return build_view(view, view_fingerprint)
+    finally:
+        # every worker thread has its own connection
+        connection.close()
+
+
+def rebuild(views: Dict[str, str], jobs: int, report=log.info) -> Dict[str, float]:
+    """
+    Build `views` (name: fingerprint), `jobs` at a time, returns the
+    seconds per view
+    """
+    timings = {}
+    if jobs <= 1:
+        for view, view_fingerprint in views.items():
+            timings[view] = build_view(view, view_fingerprint)
+            report(f'Created geotable {view}_mat in {timings[view]:.1f}s')
+        return timings
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = {
+            view: executor.submit(_build_in_thread, view, view_fingerprint)
+            for view, view_fingerprint in views.items()
+        }
+        for view, future in futures.items():
+            timings[view] = future.result()
+            report(f'Created geotable {view}_mat in {timings[view]:.1f}s')
+
+    return timings
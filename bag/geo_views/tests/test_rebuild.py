@@ -0,0 +1,132 @@
+import time
+
+from django.contrib.gis.geos import Polygon
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+
+from datasets.bag.tests import factories as bag_factories
+from geo_views import generalization, rebuild
+
+
+class RebuildTest(TestCase):
+
+    def test_view_sources(self):
+        with connection.cursor() as cursor:
+            sources = rebuild.view_sources(cursor)
+
+        self.assertIn('bag_pand', sources['geo_bag_pand'])
+        self.assertIn('brk_kadastraalobject', sources['geo_lki_kadastraalobject'])
+        self.assertNotIn('brk_kadastraalobject', sources['geo_bag_pand'])
+
+    def test_fingerprint(self):
+        with connection.cursor() as cursor:
+            rebuild.create_builds_table(cursor)
+            before = rebuild.fingerprint(cursor, 'geo_bag_pand', ['bag_pand', 'bag_buurt'])
+            self.assertIn('bag_pand', before)
+            self.assertEqual(before, rebuild.fingerprint(cursor, 'geo_bag_pand', ['bag_buurt', 'bag_pand']))
+            self.assertNotEqual(before, rebuild.fingerprint(cursor, 'geo_bag_buurt', ['bag_pand', 'bag_buurt']))
+
+            stale = rebuild.stale_views(cursor, ['geo_bag_pand'], force=True)
+            self.assertEqual(list(stale), ['geo_bag_pand'])
+
+    def test_polygonal(self):
+        with connection.cursor() as cursor:
+            self.assertTrue(generalization.is_polygonal(cursor, 'geo_bag_pand'))
+            self.assertTrue(generalization.is_polygonal(cursor, 'geo_bag_stadsdeel'))
+            self.assertFalse(generalization.is_polygonal(cursor, 'geo_bag_verblijfsobject'))
+
+
+class BuildViewTest(TransactionTestCase):
+    """
+    Builds real tables, CLUSTER and VACUUM do not run in a transaction
+    """
+    views = ('geo_bag_pand', 'geo_bag_verblijfsobject')
+
+    def setUp(self):
+        bag_factories.PandFactory.create(geometrie=Polygon.from_bbox((121000, 487000, 121010, 487010)))
+        with connection.cursor() as cursor:
+            rebuild.create_builds_table(cursor)
+            generalization.create_metadata_table(cursor)
+
+    def tearDown(self):
+        # back to the materialized views of the migrations
+        quote = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            for view in self.views:
+                for level in range(1, len(generalization.TOLERANCES) + 1):
+                    rebuild.drop_relation(cursor, generalization.variant_name(view, level))
+                rebuild.drop_relation(cursor, f'{view}_mat')
+                cursor.execute(f'CREATE MATERIALIZED VIEW {quote(view + "_mat")} AS SELECT * FROM {quote(view)}')
+                cursor.execute(
+                    f'CREATE INDEX {quote(view + "_mat_idx")} ON {quote(view + "_mat")} USING GIST (geometrie)')
+            cursor.execute(f'DROP TABLE {quote(rebuild.BUILDS_TABLE)}')
+            cursor.execute(f'DROP TABLE {quote(generalization.METADATA_TABLE)}')
+
+    def relkinds(self, cursor, prefix: str) -> dict:
+        cursor.execute('SELECT relname, relkind FROM pg_class WHERE relname LIKE %s', [prefix + '%'])
+        return dict(cursor.fetchall())
+
+    def build(self, view: str):
+        with connection.cursor() as cursor:
+            stale = rebuild.stale_views(cursor, [view])
+        self.assertIn(view, stale)
+        rebuild.build_view(view, stale[view])
+
+    def test_build_view(self):
+        with connection.cursor() as cursor:
+            self.assertFalse(rebuild.is_complete(cursor, 'geo_bag_pand', rebuild.relation_kinds(cursor)))
+
+        self.build('geo_bag_pand')
+
+        with connection.cursor() as cursor:
+            kinds = self.relkinds(cursor, 'geo_bag_pand_')
+            self.assertEqual(kinds['geo_bag_pand_mat'], 'r')
+            self.assertEqual(kinds['geo_bag_pand_idx'], 'i')
+            for level in range(1, len(generalization.TOLERANCES) + 1):
+                self.assertEqual(kinds[generalization.variant_name('geo_bag_pand', level)], 'r')
+                self.assertEqual(kinds[generalization.variant_name('geo_bag_pand', level) + '_idx'], 'i')
+            self.assertFalse([name for name in kinds if name.endswith(rebuild.SUFFIX)])
+
+            cursor.execute('SELECT count(*) FROM geo_bag_pand_mat')
+            self.assertEqual(cursor.fetchone()[0], 1)
+
+            cursor.execute('SELECT level, features FROM geo_generalization WHERE layer = %s', ['geo_bag_pand'])
+            self.assertEqual(dict(cursor.fetchall()), {1: 1, 2: 1, 3: 0, 4: 0})
+
+            cursor.execute('SELECT fingerprint FROM geo_table_builds WHERE view_name = %s', ['geo_bag_pand'])
+            self.assertEqual(len(cursor.fetchall()), 1)
+
+            self.assertTrue(rebuild.is_complete(cursor, 'geo_bag_pand', rebuild.relation_kinds(cursor)))
+
+            # a missing variant is rebuilt
+            cursor.execute('DROP TABLE geo_bag_pand_g2')
+            self.assertFalse(rebuild.is_complete(cursor, 'geo_bag_pand', rebuild.relation_kinds(cursor)))
+            self.assertIn('geo_bag_pand', rebuild.stale_views(cursor, ['geo_bag_pand']))
+
+    def test_build_points(self):
+        self.build('geo_bag_verblijfsobject')
+
+        with connection.cursor() as cursor:
+            kinds = self.relkinds(cursor, 'geo_bag_verblijfsobject_')
+            self.assertEqual(kinds['geo_bag_verblijfsobject_mat'], 'r')
+            self.assertNotIn(generalization.variant_name('geo_bag_verblijfsobject', 1), kinds)
+            self.assertEqual(generalization.recorded_levels(cursor, 'geo_bag_verblijfsobject'), set())
+            self.assertTrue(
+                rebuild.is_complete(cursor, 'geo_bag_verblijfsobject', rebuild.relation_kinds(cursor)))
+
+    def test_source_changed(self):
+        self.build('geo_bag_pand')
+
+        bag_factories.PandFactory.create(geometrie=Polygon.from_bbox((121100, 487100, 121110, 487110)))
+
+        # table statistics are reported with a small delay
+        deadline = time.monotonic() + 10
+        with connection.cursor() as cursor:
+            while True:
+                cursor.execute('SELECT pg_stat_clear_snapshot()')
+                stale = rebuild.stale_views(cursor, ['geo_bag_pand'])
+                if stale or time.monotonic() > deadline:
+                    break
+                time.sleep(0.1)
+
+        self.assertIn('geo_bag_pand', stale)
@@ -0,0 +1,87 @@
+import math
+
+from django.contrib.gis.geos import Point, Polygon
+from django.db import connection
+from django.test import TestCase
+
+from datasets.bag.tests import factories as bag_factories
+from datasets.generic import generation
+from geo_views import generalization, tiles
+
+
+def tile_of(point: Point, z: int) -> (int, int):
+    lon, lat = point.transform(4326, clone=True).coords
+    n = 2 ** z
+    x = int((lon + 180) / 360 * n)
+    y = int((1 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2 * n)
+    return x, y
+
+
+class VectorTileTest(TestCase):
+
+    def setUp(self):
+        generation.forget_generation()
+        self.pand = bag_factories.PandFactory.create(
+            geometrie=Polygon.from_bbox((121000, 487000, 121010, 487010)))
+        with connection.cursor() as cursor:
+            cursor.execute('REFRESH MATERIALIZED VIEW geo_bag_pand_mat')
+
+        self.x, self.y = tile_of(Point(121005, 487005, srid=28992), 16)
+        self.url = f'/tiles/pand/16/{self.x}/{self.y}.mvt'
+
+    def tearDown(self):
+        generation.forget_generation()
+
+    def test_tile(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], tiles.CONTENT_TYPE)
+        self.assertIn(self.pand.landelijk_id.encode(), response.content)
+
+    def test_attributes(self):
+        response = self.client.get(self.url, {'attributes': 'display'})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(b'uri', response.content)
+
+        response = self.client.get(self.url, {'attributes': 'geometrie'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_empty(self):
+        self.assertEqual(self.client.get(f'/tiles/pand/16/{self.x + 10}/{self.y}.mvt').status_code, 204)
+        # below the minimum zoom of the layer
+        x, y = tile_of(Point(121005, 487005, srid=28992), 10)
+        self.assertEqual(self.client.get(f'/tiles/pand/10/{x}/{y}.mvt').status_code, 204)
+
+    def test_not_found(self):
+        self.assertEqual(self.client.get('/tiles/onbekend/0/0/0.mvt').status_code, 404)
+        self.assertEqual(self.client.get('/tiles/pand/1/2/0.mvt').status_code, 404)
+
+    def test_cache(self):
+        current = generation.mark_generation('geo tables')
+        hits = tiles.TILES.value(layer='pand', result='hit')
+
+        first = self.client.get(self.url)
+        second = self.client.get(self.url)
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(tiles.TILES.value(layer='pand', result='hit'), hits + 1)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertTrue(first['ETag'].startswith(f'W/"{current.id}-'))
+
+    def test_tile_range(self):
+        columns, rows = tiles.tile_range(16, *tiles.tile_bounds(16, self.x, self.y))
+        self.assertIn(self.x, columns)
+        self.assertIn(self.y, rows)
+
+    def test_generalized_table(self):
+        with connection.cursor() as cursor:
+            generalization.create_metadata_table(cursor)
+            generalization.record_variants(cursor, 'geo_bag_pand', {1: 1, 2: 1, 3: 0, 4: 0})
+            generalization.record_variants(cursor, 'geo_bag_stadsdeel', {1: 1, 2: 1, 3: 1, 4: 1})
+            generalization.record_variants(cursor, 'geo_bag_verblijfsobject', {})
+
+        self.assertEqual(tiles.layer_table('pand', 17), 'geo_bag_pand_mat')
+        self.assertEqual(tiles.layer_table('pand', 14), 'geo_bag_pand_g1')
+        self.assertEqual(tiles.layer_table('stadsdeel', 8), 'geo_bag_stadsdeel_g4')
+        self.assertEqual(tiles.layer_table('verblijfsobject', 8), 'geo_bag_verblijfsobject_mat')
@@ -0,0 +1,255 @@
+"""
+Mapbox vector tiles of the geo_ tables.
+
+Tiles are in the usual web mercator z/x/y grid and are made by PostGIS
+with `ST_AsMVTGeom`/`ST_AsMVT` from the `geo_*_mat` tables that
+`create_geo_tables` builds. The tile envelope is transformed to RD once,
+so the GiST index on `geometrie` selects the features.
+
+Every layer has the attributes a client may ask for and a minimum zoom
+level, below which its tiles are empty instead of holding the whole
+city. Layers with generalised variants, the polygon layers, are read from
+the variant that fits the resolution of the zoom level (see
+`generalization`).
+
+Tiles are cached per data generation: in process in an LRU of
+`TILE_CACHE_SIZE` tiles, and on disk in `TILE_CACHE_DIR` when it is set.
+`seed_tiles` renders the low zoom levels into the disk cache after the
+geo tables are built. Nothing is cached before the first generation.
+"""
+import logging
+import math
+import os
+import shutil
+import tempfile
+from collections import namedtuple
+from typing import Optional
+
+from django.conf import settings
+from django.db import connection
+
+from datasets.generic.response_cache import LRUCache
+from health import metrics
+from . import generalization
+
+log = logging.getLogger(__name__)
+
+CONTENT_TYPE = 'application/vnd.mapbox-vector-tile'
+
+EXTENT = 4096
+BUFFER = 64
+MAX_ZOOM = 22
+
+# Pixels a tile is drawn with, for the choice of generalisation
+TILE_PIXELS = 512
+
+# Half the width of the web mercator world
+WORLD = 20037508.342789244
+
+Layer = namedtuple('Layer', 'table attributes min_zoom')
+
+GEBIED = ('id', 'naam', 'display', 'uri')
+
+LAYERS = {
+    'stadsdeel': Layer('geo_bag_stadsdeel_mat', ('id', 'code', 'naam', 'display', 'uri'), 0),
+    'buurtcombinatie': Layer('geo_bag_buurtcombinatie_mat', ('id', 'vollcode', 'naam', 'display', 'uri'), 0),
+    'buurt': Layer('geo_bag_buurt_mat', ('id', 'code', 'vollcode', 'naam', 'display', 'uri'), 0),
+    'gebiedsgerichtwerken': Layer('geo_bag_gebiedsgerichtwerken_mat', ('id', 'code', 'naam', 'display', 'uri'), 0),
+    'grootstedelijkgebied': Layer('geo_bag_grootstedelijkgebied_mat', GEBIED, 0),
+    'unesco': Layer('geo_bag_unesco_mat', GEBIED, 0),
+    'bouwblok': Layer('geo_bag_bouwblok_mat', ('id', 'code', 'display', 'uri'), 12),
+    'openbareruimte': Layer('geo_bag_openbareruimte_mat', ('id', 'display', 'opr_type', 'uri'), 13),
+    'pand': Layer('geo_bag_pand_mat', ('id', 'display', 'uri'), 14),
+    'ligplaats': Layer('geo_bag_ligplaats_mat', ('id', 'display', 'uri'), 14),
+    'standplaats': Layer('geo_bag_standplaats_mat', ('id', 'display', 'uri'), 14),
+    'verblijfsobject': Layer('geo_bag_verblijfsobject_mat', ('id', 'display', 'uri'), 15),
+    'kadastraal_object': Layer('geo_lki_kadastraalobject_mat', ('id', 'volledige_code', 'display', 'uri'), 15),
+}
+
+TILES = metrics.counter(
+    'api_vector_tiles_total',
+    'Vector tile requests by layer and cache result (hit, disk_hit, miss)',
+    ('layer', 'result'))
+
+_local = LRUCache(settings.TILE_CACHE_SIZE)
+
+
+def tile_bounds(z: int, x: int, y: int) -> (float, float, float, float):
+    size = 2 * WORLD / 2 ** z
+    xmin = -WORLD + x * size
+    ymax = WORLD - y * size
+    return xmin, ymax - size, xmin + size, ymax
+
+
+def tile_range(z: int, xmin, ymin, xmax, ymax) -> (range, range):
+    """
+    Columns and rows of the tiles at zoom `z` that cover a web mercator box
+    """
+    size = 2 * WORLD / 2 ** z
+    last = 2 ** z - 1
+
+    def clamp(value):
+        return min(max(int(math.floor(value)), 0), last)
+
+    columns = range(clamp((xmin + WORLD) / size), clamp((xmax + WORLD) / size) + 1)
+    rows = range(clamp((WORLD - ymax) / size), clamp((WORLD - ymin) / size) + 1)
+    return columns, rows
+
+
+def layer_table(layer: str, z: int) -> str:
+    """
+    Table to read `layer` from at zoom level `z`
+    """
+    table = LAYERS[layer].table
+    resolution = 2 * WORLD / 2 ** z * generalization.MERCATOR_FACTOR / TILE_PIXELS
+    level = generalization.level_for_resolution(resolution)
+    if not level:
+        return table
+
+    view_name = table[:-len('_mat')]
+    with connection.cursor() as cursor:
+        if level not in generalization.recorded_levels(cursor, view_name):
+            return table
+    return generalization.variant_name(view_name, level)
+
+
+def render_tile(layer: str, z: int, x: int, y: int, attributes) -> bytes:
+    if z < LAYERS[layer].min_zoom:
+        return b''
+    table = layer_table(layer, z)
+
+    xmin, ymin, xmax, ymax = tile_bounds(z, x, y)
+    # features in the buffer around the tile as well
+    margin = (xmax - xmin) * BUFFER / EXTENT
+
+    quote = connection.ops.quote_name
+    columns = [
+        f'ST_AsMVTGeom(ST_Transform(geometrie, 3857), ST_MakeEnvelope(%s, %s, %s, %s, 3857), '
+        f'{EXTENT}, {BUFFER}, true) AS geom',
+    ] + [quote(attribute) for attribute in attributes]
+
+    sql = f"""
+SELECT ST_AsMVT(tile, %s, {EXTENT}, 'geom') FROM (
+  SELECT {', '.join(columns)}
+  FROM {quote(table)}
+  WHERE geometrie && ST_Transform(ST_MakeEnvelope(%s, %s, %s, %s, 3857), 28992)
+) AS tile
+WHERE geom IS NOT NULL"""
+
+    params = [xmin, ymin, xmax, ymax, layer, xmin - margin, ymin - margin, xmax + margin, ymax + margin]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        content = cursor.fetchone()[0]
+
+    return bytes(content) if content else b''
+
+
+def cache_key(generation_id: int, layer: str, z: int, x: int, y: int, attributes) -> str:
+    return f"{generation_id}/{layer}/{'-'.join(attributes)}/{z}/{x}/{y}"
+
+
+def disk_path(key: str) -> Optional[str]:
+    if not settings.TILE_CACHE_DIR:
+        return None
+    return os.path.join(settings.TILE_CACHE_DIR, key + '.mvt')
+
+
+def read_disk(key: str) -> Optional[bytes]:
+    path = disk_path(key)
+    if path is None:
+        return None
+    try:
+        with open(path, 'rb') as tile_file:
+            return tile_file.read()
+    except FileNotFoundError:
+        return None
+
+
+def write_disk(key: str, content: bytes):
+    path = disk_path(key)
+    if path is None:
+        return
+
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+
+    # other processes never read half a tile
+    fd, temporary = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(fd, 'wb') as tile_file:
+        tile_file.write(content)
+    os.replace(temporary, path)
+
+
+def get_tile(generation, layer: str, z: int, x: int, y: int, attributes) -> bytes:
+    """
+    Tile from the cache of `generation`, rendered when it is not there
+    """
+    if generation is None:
+        TILES.inc(layer=layer, result='miss')
+        return render_tile(layer, z, x, y, attributes)
+
+    if _local.generation != generation.id:
+        _local.clear(generation.id)
+
+    key = cache_key(generation.id, layer, z, x, y, attributes)
+
+    content = _local.get(key)
+    if content is not None:
+        TILES.inc(layer=layer, result='hit')
+        return content
+
+    content = read_disk(key)
+    if content is not None:
+        TILES.inc(layer=layer, result='disk_hit')
+    else:
+        TILES.inc(layer=layer, result='miss')
+        content = render_tile(layer, z, x, y, attributes)
+        write_disk(key, content)
+
+    _local.set(key, content)
+    return content
+
+
+def layer_extent(layer: str) -> Optional[tuple]:
+    """
+    Web mercator box of all features of a layer
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT ST_XMin(e), ST_YMin(e), ST_XMax(e), ST_YMax(e) FROM '
+            f'(SELECT ST_Transform(ST_SetSRID(ST_Extent(geometrie), 28992), 3857) AS e '
+            f'FROM {connection.ops.quote_name(LAYERS[layer].table)}) AS extent')
+        row = cursor.fetchone()
+    return row if row and row[0] is not None else None
+
+
+def seed(generation, layer: str, max_zoom: int) -> int:
+    """
+    Render all tiles of `layer` up to `max_zoom` into the disk cache,
+    returns the number of tiles
+    """
+    extent = layer_extent(layer)
+    if extent is None:
+        return 0
+
+    attributes = LAYERS[layer].attributes
+    count = 0
+    for z in range(LAYERS[layer].min_zoom, max_zoom + 1):
+        columns, rows = tile_range(z, *extent)
+        for x in columns:
+            for y in rows:
+                key = cache_key(generation.id, layer, z, x, y, attributes)
+                write_disk(key, render_tile(layer, z, x, y, attributes))
+                count += 1
+    return count
+
+
+def remove_old_generations(generation):
+    """
+    Delete the disk cache of all generations but `generation`
+    """
+    if not settings.TILE_CACHE_DIR or not os.path.isdir(settings.TILE_CACHE_DIR):
+        return
+    for name in os.listdir(settings.TILE_CACHE_DIR):
+        if name != str(generation.id):
+            shutil.rmtree(os.path.join(settings.TILE_CACHE_DIR, name), ignore_errors=True)
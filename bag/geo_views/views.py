@@ -0,0 +1,42 @@
+from django.http import Http404, HttpResponse, HttpResponseBadRequest
+from django.utils.cache import get_conditional_response
+from django.views.decorators.http import require_safe
+
+from datasets.generic import generation
+from . import tiles
+
+
+@require_safe
+def vector_tile(request, layer, z, x, y):
+    """
+    Mapbox vector tile `layer/z/x/y.mvt`, with the attributes of the
+    layer or those in `?attributes=id,display`
+    """
+    z, x, y = int(z), int(x), int(y)
+    if layer not in tiles.LAYERS or z > tiles.MAX_ZOOM or x >= 2 ** z or y >= 2 ** z:
+        raise Http404()
+
+    allowed = tiles.LAYERS[layer].attributes
+    attributes = allowed
+    if request.GET.get('attributes'):
+        attributes = tuple(request.GET['attributes'].split(','))
+        if not set(attributes) <= set(allowed):
+            return HttpResponseBadRequest(f"attributes must be in {', '.join(allowed)}")
+
+    current = generation.latest_generation()
+    headers = None
+    if current is not None:
+        headers = (generation.generation_etag(current, request, []), int(current.completed.timestamp()), True)
+        not_modified = get_conditional_response(request, etag=headers[0], last_modified=headers[1])
+        if not_modified is not None:
+            if not_modified.status_code == 304:
+                generation.patch_generation_headers(not_modified, *headers)
+            return not_modified
+
+    content = tiles.get_tile(current, layer, z, x, y, attributes)
+
+    # 204 tells map clients there is nothing to draw
+    response = HttpResponse(content, content_type=tiles.CONTENT_TYPE, status=200 if content else 204)
+    if headers is not None:
+        generation.patch_generation_headers(response, *headers)
+    return response
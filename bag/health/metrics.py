@@ -0,0 +1,133 @@
+"""
+Minimal in-process metrics, exposed in the Prometheus text format on
+/status/metrics.
+
+Metrics are kept per process. With multiple workers every worker
+reports its own numbers, so scrape them per worker or sum them.
+"""
+import threading
+from collections import OrderedDict
+from typing import Dict, Tuple
+
+_lock = threading.Lock()
+_registry = OrderedDict()
+
+# Seconds, good for both search calls and database queries
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+def _label_key(labelnames, labels: dict) -> Tuple[str, ...]:
+    return tuple(str(labels.get(name, '')) for name in labelnames)
+
+
+def _format_labels(labelnames, key, extra=None) -> str:
+    pairs = list(zip(labelnames, key))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    escaped = (
+        (name, value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in pairs
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+class Counter(object):
+    type = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with _lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self.values.get(_label_key(self.labelnames, labels), 0)
+
+    def samples(self):
+        for key, value in sorted(self.values.items()):
+            yield f'{self.name}{_format_labels(self.labelnames, key)} {value}'
+
+
+class Histogram(object):
+    type = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [bucket counts..., sum, count]
+        self.values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels):
+        key = _label_key(self.labelnames, labels)
+        with _lock:
+            data = self.values.get(key)
+            if data is None:
+                data = self.values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    data[i] += 1
+            data[-2] += value
+            data[-1] += 1
+
+    def count(self, **labels) -> int:
+        data = self.values.get(_label_key(self.labelnames, labels))
+        return data[-1] if data else 0
+
+    def samples(self):
+        for key, data in sorted(self.values.items()):
+            for bound, bucket_count in zip(self.buckets, data):
+                labels = _format_labels(self.labelnames, key, ('le', repr(bound)))
+                yield f'{self.name}_bucket{labels} {bucket_count}'
+            labels = _format_labels(self.labelnames, key, ('le', '+Inf'))
+            yield f'{self.name}_bucket{labels} {data[-1]}'
+            yield f'{self.name}_sum{_format_labels(self.labelnames, key)} {data[-2]}'
+            yield f'{self.name}_count{_format_labels(self.labelnames, key)} {data[-1]}'
+
+
+def _register(metric):
+    with _lock:
+        existing = _registry.get(metric.name)
+        if existing is not None:
+            return existing
+        _registry[metric.name] = metric
+        return metric
+
+
+def counter(name: str, documentation: str, labelnames=()) -> Counter:
+    """
+    Get or create a counter
+    """
+    return _register(Counter(name, documentation, labelnames))
+
+
+def histogram(name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+    """
+    Get or create a histogram
+    """
+    return _register(Histogram(name, documentation, labelnames, buckets))
+
+
+def render() -> str:
+    """
+    All metrics in the Prometheus text format
+    """
+    lines = []
+    with _lock:
+        metrics = list(_registry.values())
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.type}')
+            lines.extend(metric.samples())
+    return '\n'.join(lines) + '\n'
@@ -9,6 +9,7 @@ from elasticsearch.exceptions import TransportError, NotFoundError
 from elasticsearch_dsl import Search
 # Project
 from datasets.bag.models import Verblijfsobject
+from health import metrics as metrics_registry
 
 
 log = logging.getLogger(__name__)
@@ -73,3 +74,9 @@ def check_data(request):
                 content_type="text/plain", status=500)
 
     return HttpResponse("Data OK", content_type='text/plain', status=200)
+
+
+def metrics(request):
+    return HttpResponse(
+        metrics_registry.render(),
+        content_type='text/plain; version=0.0.4', status=200)
@@ -0,0 +1,251 @@
+"""
+Replay a corpus of search inputs against the typeahead and search views
+and measure latency, throughput and elastic round trips.
+
+Every input is sent to every `/atlas/typeahead/*` and `/atlas/search/*`
+endpoint through the django test client, so the numbers include the
+whole view stack but no web server. Elastic round trips are counted on
+the elasticsearch transport.
+
+A report can be saved as a baseline and later reports compared with it,
+see the `search_benchmark` management command and
+`search/tests/test_benchmark.py`.
+"""
+import json
+import math
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from typing import Iterable, List
+
+from django.test import Client
+from elasticsearch.transport import Transport
+
+# Realistic inputs, matching the documents of `search.tests.fill_elastic`
+# so every category returns hits on a test index
+CORPUS = OrderedDict([
+    ('prefix', [
+        'a', 'an', 'anj', 'anjel', 'prinsen', 'Prinsengracht', 'rozen',
+        'brug', 'korte br', "laing's", 'marnix',
+    ]),
+    ('adres', [
+        'Anjeliersstraat 11', 'anjeliersstraat 11 b', 'Rozenstraat 228',
+        'rozenstraat 228 a 1', 'marnixkade 36f', 'Ligplaatsenstraat 33',
+    ]),
+    ('postcode', [
+        '1001', '1016 sz', '1016SZ', '1016SZ 228', '1016 sz 229 3',
+        '1015xr 36', '9999ZZ 33',
+    ]),
+    ('kadaster', [
+        'ASD15', 'ASD15 S', 'ASD15 S 00045', 'ASD15 S 00045 G 0000',
+        'amsterdam s 10000',
+    ]),
+    ('subject', [
+        'kikker', 'de kikker', 'Kermet de Kikker', 'stoeptegel',
+    ]),
+    ('gebied', [
+        'centrum', 'RN35', 'rn3', 'ab01',
+    ]),
+    ('landelijk_id', [
+        '0123456789012345', '5432109876543210',
+    ]),
+])
+
+
+def corpus_queries(corpus=CORPUS) -> List[str]:
+    return [query for queries in corpus.values() for query in queries]
+
+
+def read_corpus(path: str) -> List[str]:
+    """
+    Read a corpus file, one input per line. Empty lines and lines
+    starting with # are skipped.
+    """
+    with open(path, encoding='utf-8') as f:
+        lines = (line.strip() for line in f)
+        return [line for line in lines if line and not line.startswith('#')]
+
+
+def search_endpoints() -> List[str]:
+    """
+    All typeahead and search endpoints, from the routers
+    """
+    from search import urls
+
+    endpoints = []
+    for base, router in (
+            ('/atlas/typeahead/', urls.typeahead),
+            ('/atlas/search/', urls.bag_search)):
+        for prefix, _viewset, _basename in router.registry:
+            url = f'{base}{prefix}/'
+            if url not in endpoints:
+                endpoints.append(url)
+    return endpoints
+
+
+class _RoundTrips(object):
+    count = 0
+
+
+@contextmanager
+def count_round_trips():
+    """
+    Count the requests sent to elastic, by any client, in this block
+    """
+    counter = _RoundTrips()
+    perform_request = Transport.perform_request
+
+    def counting_perform_request(self, *args, **kwargs):
+        counter.count += 1
+        return perform_request(self, *args, **kwargs)
+
+    Transport.perform_request = counting_perform_request
+    try:
+        yield counter
+    finally:
+        Transport.perform_request = perform_request
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """
+    Nearest rank percentile of a sorted list
+    """
+    if not values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(values)))
+    return values[rank - 1]
+
+
+class EndpointResult(object):
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.latencies = []
+        self.round_trips = 0
+        self.statuses = Counter()
+
+    def add(self, seconds: float, round_trips: int, status: int):
+        self.latencies.append(seconds)
+        self.round_trips += round_trips
+        self.statuses[status] += 1
+
+    def summary(self) -> dict:
+        latencies = sorted(self.latencies)
+        requests = len(latencies)
+        total = sum(latencies)
+        return OrderedDict([
+            ('requests', requests),
+            ('p50_ms', round(percentile(latencies, 50) * 1000, 2)),
+            ('p95_ms', round(percentile(latencies, 95) * 1000, 2)),
+            ('p99_ms', round(percentile(latencies, 99) * 1000, 2)),
+            ('qps', round(requests / total, 1) if total else 0.0),
+            ('round_trips', round(self.round_trips / requests, 2) if requests else 0.0),
+            ('statuses', {str(k): v for k, v in sorted(self.statuses.items())}),
+        ])
+
+
+def run(queries: Iterable[str], endpoints: Iterable[str] = None,
+        repeat=1, warmup=1, token: str = None, client: Client = None) -> dict:
+    """
+    Replay all queries against all endpoints and return a report
+
+    :param repeat: number of timed passes over the corpus
+    :param warmup: number of untimed passes first, so caches and
+        connections are warm
+    :param token: bearer token, the subject endpoints need one
+    """
+    queries = list(queries)
+    endpoints = list(endpoints or search_endpoints())
+    client = client or Client(HTTP_HOST='localhost')
+
+    headers = {}
+    if token:
+        headers['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+
+    results = OrderedDict((endpoint, EndpointResult(endpoint)) for endpoint in endpoints)
+
+    for endpoint in endpoints:
+        for _ in range(warmup):
+            for query in queries:
+                client.get(endpoint, {'q': query}, **headers)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for endpoint in endpoints:
+            for query in queries:
+                with count_round_trips() as round_trips:
+                    request_start = time.perf_counter()
+                    response = client.get(endpoint, {'q': query}, **headers)
+                    seconds = time.perf_counter() - request_start
+                results[endpoint].add(seconds, round_trips.count, response.status_code)
+    elapsed = time.perf_counter() - start
+
+    total = EndpointResult('total')
+    for result in results.values():
+        total.latencies.extend(result.latencies)
+        total.round_trips += result.round_trips
+        total.statuses.update(result.statuses)
+
+    summary = total.summary()
+    summary['qps'] = round(len(total.latencies) / elapsed, 1) if elapsed else 0.0
+
+    return OrderedDict([
+        ('queries', len(queries)),
+        ('repeat', repeat),
+        ('total', summary),
+        ('endpoints', OrderedDict(
+            (endpoint, result.summary()) for endpoint, result in results.items())),
+    ])
+
+
+def compare(report: dict, baseline: dict, tolerance=0.25, min_ms=1.0) -> List[str]:
+    """
+    Regressions of a report compared with a baseline report.
+
+    Latency regresses when p50 or p95 grows more than `tolerance`
+    (a fraction) and more than `min_ms`, so very fast endpoints do not
+    trip on noise. Round trips are deterministic, any increase is a
+    regression.
+    """
+    regressions = []
+    for endpoint, current in report['endpoints'].items():
+        previous = baseline['endpoints'].get(endpoint)
+        if previous is None:
+            continue
+
+        for key in ('p50_ms', 'p95_ms'):
+            limit = max(previous[key] * (1 + tolerance), previous[key] + min_ms)
+            if current[key] > limit:
+                regressions.append(
+                    f'{endpoint} {key}: {current[key]} > {previous[key]} (baseline)')
+
+        if current['round_trips'] > previous['round_trips']:
+            regressions.append(
+                f"{endpoint} round_trips: {current['round_trips']} > "
+                f"{previous['round_trips']} (baseline)")
+
+    return regressions
+
+
+def format_report(report: dict) -> str:
+    columns = ('requests', 'p50_ms', 'p95_ms', 'p99_ms', 'qps', 'round_trips')
+    rows = [('endpoint',) + columns]
+    for endpoint, summary in report['endpoints'].items():
+        rows.append((endpoint,) + tuple(str(summary[c]) for c in columns))
+    rows.append(('total',) + tuple(str(report['total'][c]) for c in columns))
+
+    widths = [max(len(row[i]) for row in rows) for i in range(len(columns) + 1)]
+    return '\n'.join(
+        '  '.join(value.ljust(width) for value, width in zip(row, widths)).rstrip()
+        for row in rows)
+
+
+def load_report(path: str) -> dict:
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_report(report: dict, path: str):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+        f.write('\n')
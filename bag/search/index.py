@@ -99,7 +99,10 @@ class ImportIndexTask(object):
         batch = list()
 
         for obj in qs:
-            batch.append(self.convert(obj).to_dict(include_meta=True))
+            doc = self.convert(obj)
+            # keyword copy of the id, the search_after tiebreaker
+            doc.id = doc.meta.id
+            batch.append(doc.to_dict(include_meta=True))
             # store last id
             self.last_id = obj.id
 
@@ -0,0 +1,270 @@
+"""
+In-process lookup of addresses by postcode and huisnummer.
+
+A query like "1012JS 12" names a full postcode followed by the start of
+the huisnummer/toevoeging. That is a key lookup, there is no need to send
+it to elastic. The addresses are kept in flat arrays sorted like the
+elastic query (postcode, straatnaam, huisnummer, toevoeging), so a
+postcode is a contiguous slice of rows.
+
+The index is loaded from a snapshot file when `POSTCODE_INDEX_SNAPSHOT`
+is set and the file exists, otherwise from the database. The import
+writes a fresh snapshot.
+"""
+import logging
+import os
+import pickle
+from array import array
+from collections import Counter
+from typing import List, Optional
+
+from django.conf import settings
+from elasticsearch_dsl.response import Hit
+
+from search.prefix_index import LazyIndex, LocalHits
+from search.query_analyzer import QueryAnalyzer
+
+log = logging.getLogger(__name__)
+
+# Same as the elastic query
+MAX_HITS = 15
+
+
+class _IdArray(object):
+    """
+    Landelijk ids are 16 digit numbers, store them as integers.
+    Anything else goes in a dict on the side.
+    """
+
+    def __init__(self):
+        self.values = array('Q')
+        self.other = {}
+
+    def append(self, value: Optional[str]):
+        if value and len(value) == 16 and value.isdigit() and int(value):
+            self.values.append(int(value))
+        else:
+            # 0 is not a valid landelijk_id
+            self.values.append(0)
+            if value:
+                self.other[len(self.values) - 1] = value
+
+    def __getitem__(self, i) -> Optional[str]:
+        value = self.values[i]
+        if value:
+            return f'{value:016d}'
+        return self.other.get(i)
+
+
+class PostcodeIndex(object):
+    """
+    Addresses as flat arrays, grouped by postcode
+    """
+
+    def __init__(self, rows):
+        """
+        :param rows: iterable of (postcode, straatnaam, huisnummer,
+            huisletter, huisnummer_toevoeging, subtype, id, landelijk_id,
+            adresseerbaar_object_id) tuples
+        """
+        self.straatnamen = []
+        self.suffixes = []
+        self.subtypes = []
+
+        self.straat = array('I')
+        self.huisnummer = array('I')
+        self.suffix = array('I')
+        self.subtype = array('B')
+        self.ids = _IdArray()
+        self.landelijk_ids = _IdArray()
+        self.object_ids = _IdArray()
+        self.postcodes = {}
+
+        straat_refs = {}
+        suffix_refs = {}
+        subtype_refs = {}
+
+        def ref(value, refs, values):
+            if value not in refs:
+                refs[value] = len(values)
+                values.append(value)
+            return refs[value]
+
+        prepared = []
+        for row in rows:
+            postcode, straatnaam, huisnummer, huisletter, toevoeging = row[:5]
+            suffix_ref = ref((huisletter, toevoeging), suffix_refs, self.suffixes)
+            prepared.append((postcode.lower(), straatnaam, huisnummer, suffix_ref) + tuple(row[5:]))
+
+        self.suffixes = [_toevoegingen(*s) for s in self.suffixes]
+
+        prepared.sort(key=lambda r: (r[0], r[1], r[2], self._toevoeging(r[2], r[3])))
+
+        for i, row in enumerate(prepared):
+            postcode, straatnaam, huisnummer, suffix_ref, subtype, pk, landelijk_id, object_id = row
+
+            start, _ = self.postcodes.get(postcode, (i, i))
+            self.postcodes[postcode] = (start, i + 1)
+
+            self.straat.append(ref(straatnaam, straat_refs, self.straatnamen))
+            self.huisnummer.append(huisnummer)
+            self.suffix.append(suffix_ref)
+            self.subtype.append(ref(subtype, subtype_refs, self.subtypes))
+            self.ids.append(pk)
+            self.landelijk_ids.append(landelijk_id)
+            self.object_ids.append(object_id)
+
+    def __len__(self):
+        return len(self.huisnummer)
+
+    def _toevoeging(self, huisnummer: int, suffix_ref: int) -> str:
+        toevoeging = self.suffixes[suffix_ref][0]
+        if not huisnummer:
+            return toevoeging
+        return f'{huisnummer} {toevoeging}' if toevoeging else str(huisnummer)
+
+    def toevoeging(self, i: int) -> str:
+        """
+        `Nummeraanduiding.toevoeging` of row i
+        """
+        return self._toevoeging(self.huisnummer[i], self.suffix[i])
+
+    def display(self, i: int) -> str:
+        """
+        `Nummeraanduiding.adres()` of row i
+        """
+        huisnummer = self.huisnummer[i]
+        display_toevoeging = self.suffixes[self.suffix[i]][1]
+        if huisnummer:
+            display_toevoeging = f'{huisnummer}{display_toevoeging}'
+        return f'{self.straatnamen[self.straat[i]]} {display_toevoeging}'
+
+    def lookup(self, postcode: str, toevoeging: str) -> List[int]:
+        """
+        Rows with this postcode and a toevoeging starting with the given
+        toevoeging, in elastic order.
+        """
+        start, end = self.postcodes.get(postcode.lower(), (0, 0))
+        toevoeging = toevoeging.lower()
+        return [i for i in range(start, end) if self.toevoeging(i).lower().startswith(toevoeging)]
+
+    def hit(self, i: int) -> Hit:
+        """
+        Make an elastic like hit, so views can treat it as any other hit
+        """
+        source = {
+            'subtype': self.subtypes[self.subtype[i]],
+            '_display': self.display(i),
+            'landelijk_id': self.landelijk_ids[i],
+        }
+        object_id = self.object_ids[i]
+        if object_id:
+            source['adresseerbaar_object_id'] = object_id
+
+        return Hit({
+            '_index': settings.ELASTIC_INDICES['NUMMERAANDUIDING'],
+            '_type': 'doc',
+            '_id': self.ids[i],
+            '_source': source,
+        })
+
+
+def _toevoegingen(huisletter: Optional[str], huisnummer_toevoeging: Optional[str]) -> (str, str):
+    """
+    The part of the toevoeging and the display toevoeging after the
+    huisnummer, made by the model itself so they are always the same
+    """
+    from datasets.bag.models import Nummeraanduiding
+
+    n = Nummeraanduiding(
+        huisnummer=0, huisletter=huisletter,
+        huisnummer_toevoeging=huisnummer_toevoeging)
+    return n.toevoeging, n._display_toevoeging()
+
+
+def build_from_database() -> PostcodeIndex:
+    from datasets.bag.models import Nummeraanduiding
+
+    subtypes = {k: v.lower() for k, v in Nummeraanduiding.OBJECT_TYPE_CHOICES}
+
+    rows = (
+        Nummeraanduiding.objects
+        .filter(postcode__isnull=False, type__isnull=False)
+        .values_list(
+            'postcode', 'openbare_ruimte__naam', 'huisnummer', 'huisletter',
+            'huisnummer_toevoeging', 'type', 'id', 'landelijk_id',
+            'verblijfsobject__landelijk_id', 'ligplaats__landelijk_id',
+            'standplaats__landelijk_id')
+    )
+
+    return PostcodeIndex(
+        (postcode, naam, huisnummer, huisletter, toevoeging, subtypes[nr_type],
+         pk, landelijk_id, ligplaats_id or standplaats_id or vbo_id)
+        for (postcode, naam, huisnummer, huisletter, toevoeging, nr_type,
+             pk, landelijk_id, vbo_id, ligplaats_id, standplaats_id) in rows.iterator()
+    )
+
+
+def write_snapshot(index: PostcodeIndex, path: str):
+    """
+    Write the index to a file, replacing any previous snapshot at once
+    """
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def _load_postcode_index() -> PostcodeIndex:
+    path = settings.POSTCODE_INDEX_SNAPSHOT
+    if path and os.path.exists(path):
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+    return build_from_database()
+
+
+postcode_index = LazyIndex(_load_postcode_index)
+
+
+def _lookup(analyzer: QueryAnalyzer) -> (Optional[PostcodeIndex], List[int]):
+    if not settings.LOCAL_INDEX_ENABLED or not analyzer.is_postcode_huisnummer_prefix():
+        return None, []
+
+    index = postcode_index.get()
+    if index is None:
+        return None, []
+
+    postcode, _, toevoeging = analyzer.get_postcode_huisnummer_toevoeging()
+    return index, index.lookup(postcode, toevoeging)
+
+
+def postcode_huisnummer_hits(analyzer: QueryAnalyzer) -> Optional[LocalHits]:
+    """
+    In-process version of `bag_qs.postcode_huisnummer_query`.
+
+    Returns None when the index can not be used or finds nothing, the
+    caller should then fall back to elastic.
+    """
+    index, rows = _lookup(analyzer)
+    if index is None or not rows:
+        # the snapshot may be behind, and elastic analyses the toevoeging
+        return None
+
+    return LocalHits(
+        [index.hit(i) for i in rows[:MAX_HITS]],
+        Counter(index.subtypes[index.subtype[i]] for i in rows))
+
+
+def postcode_huisnummer_ids(analyzer: QueryAnalyzer) -> Optional[List[str]]:
+    """
+    Nummeraanduiding ids matching a postcode huisnummer query.
+
+    Returns None when the index can not be used or finds nothing, the
+    caller should then fall back to elastic.
+    """
+    index, rows = _lookup(analyzer)
+    if index is None or not rows:
+        return None
+
+    return [index.ids[i] for i in rows]
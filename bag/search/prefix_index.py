@@ -0,0 +1,254 @@
+"""
+In-process prefix index of openbare ruimte names.
+
+There are only a few thousand openbare ruimtes, so plain name prefix
+queries in the typeahead can be answered from memory instead of doing a
+round trip to elastic. The index is a sorted array of normalized name
+keys, searched with bisect. Normalization follows the `adres` analyzer
+used for the openbare ruimte names in elastic (see `search.analyzers`).
+"""
+import bisect
+import logging
+import re
+import string
+import threading
+import time
+import unicodedata
+from array import array
+from collections import Counter
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.db import DatabaseError
+from elasticsearch_dsl.response import Hit
+
+from search.query_analyzer import QueryAnalyzer
+
+log = logging.getLogger(__name__)
+
+# Same as the elastic query: at most this many hits are returned
+MAX_HITS = 100
+
+# naam_stripper maps - . / to space, other punctuation is dropped by the
+# standard tokenizer. Quotes are kept, like in "Laing's Nekstraat"
+_STRIP_CHARS = string.punctuation.replace("'", "")
+_STRIP_TABLE = str.maketrans(_STRIP_CHARS, len(_STRIP_CHARS) * " ")
+
+# synonym_filter, both forms of a name are indexed
+_SYNONYMS = {
+    '1e': 'eerste',
+    '2e': 'tweede',
+    '3e': 'derde',
+    '4e': 'vierde',
+}
+_SYNONYMS.update({v: k for k, v in list(_SYNONYMS.items())})
+
+
+def normalize(text: str) -> str:
+    """
+    Lowercase, fold to ascii and replace dividers with a single space
+    """
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    text = text.lower().translate(_STRIP_TABLE)
+    return ' '.join(text.split())
+
+
+def _synonym_variants(name: str) -> List[str]:
+    """
+    All spellings of a normalized name, `1e` and `eerste` are equal
+    """
+    words = name.split(' ')
+    if not any(w in _SYNONYMS for w in words):
+        return [name]
+    other = ' '.join(_SYNONYMS.get(w, w) for w in words)
+    return [name, other]
+
+
+def _word_suffixes(name: str) -> List[str]:
+    """
+    A name is found on the start of every word, like phrase_prefix does
+    """
+    return [name[m.start():] for m in re.finditer(r'\S+', name)]
+
+
+class PrefixIndex(object):
+    """
+    Sorted keys with a parallel array pointing to the entries
+    """
+
+    def __init__(self, entries: List[dict], names: List[List[str]]):
+        """
+        :param entries: the documents that can be found
+        :param names: for each entry the names to find it on
+        """
+        pairs = set()
+        for ref, entry_names in enumerate(names):
+            for name in entry_names:
+                if not name:
+                    continue
+                name = normalize(name)
+                for variant in _synonym_variants(name):
+                    for key in _word_suffixes(variant):
+                        pairs.add((key, ref))
+                    # straat_no_ws analyzer
+                    pairs.add((variant.replace(' ', ''), ref))
+
+        pairs = sorted(pairs)
+        self.keys = [key for key, _ in pairs]
+        self.refs = array('I', (ref for _, ref in pairs))
+        self.entries = entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _lookup(self, prefix: str, found: set):
+        i = bisect.bisect_left(self.keys, prefix)
+        keys = self.keys
+        while i < len(keys) and keys[i].startswith(prefix):
+            found.add(self.refs[i])
+            i += 1
+
+    def matches(self, query: str) -> List[dict]:
+        """
+        Find all entries with a name that starts with the query.
+
+        Entries whose name starts with the literal query come first,
+        then the rest, both ordered by name. Like the elastic query.
+        """
+        prefix = normalize(query)
+        if not prefix:
+            return []
+
+        found = set()
+        self._lookup(prefix, found)
+        self._lookup(prefix.replace(' ', ''), found)
+
+        literal = query.lower()
+        matches = [self.entries[ref] for ref in found]
+        matches.sort(key=lambda e: (not e['_naam_lower'].startswith(literal), e['_naam_lower']))
+        return matches
+
+    def search(self, query: str) -> List[dict]:
+        """
+        The first `MAX_HITS` entries of `matches`
+        """
+        return self.matches(query)[:MAX_HITS]
+
+
+def _load_openbare_ruimtes() -> PrefixIndex:
+    from datasets.bag.models import OpenbareRuimte
+
+    subtypes = {k: v.lower() for k, v in OpenbareRuimte.TYPE_CHOICES}
+    entries = []
+    names = []
+
+    rows = OpenbareRuimte.objects.values_list('id', 'landelijk_id', 'naam', 'naam_nen', 'type')
+
+    for pk, landelijk_id, naam, naam_nen, opr_type in rows.iterator():
+        if not naam:
+            continue
+        entries.append({
+            'id': pk,
+            'landelijk_id': landelijk_id,
+            'naam': naam,
+            'subtype': subtypes.get(opr_type),
+            '_naam_lower': naam.lower(),
+        })
+        names.append([naam, naam_nen])
+
+    return PrefixIndex(entries, names)
+
+
+class LocalHits(list):
+    """
+    Hits from an in-process index, trimmed like the elastic query.
+
+    `subtype_totals` counts all matches per subtype, like the doc_count of
+    the elastic group aggregations.
+    """
+
+    def __init__(self, hits: List[Hit], subtype_totals: Dict[str, int]):
+        super().__init__(hits)
+        self.subtype_totals = subtype_totals
+
+
+class LazyIndex(object):
+    """
+    Build an index on first use and rebuild it when it gets old or after
+    the elastic index it mirrors has been rebuilt.
+    """
+
+    def __init__(self, loader):
+        self.loader = loader
+        self.index = None
+        self.loaded_at = 0
+        self.lock = threading.Lock()
+
+    def invalidate(self):
+        self.loaded_at = 0
+
+    def get(self) -> Optional[PrefixIndex]:
+        ttl = settings.LOCAL_INDEX_TTL
+        if self.index is not None and time.time() - self.loaded_at < ttl:
+            return self.index
+
+        with self.lock:
+            if self.index is not None and time.time() - self.loaded_at < ttl:
+                return self.index
+            try:
+                start = time.time()
+                self.index = self.loader()
+                self.loaded_at = time.time()
+                log.info('Loaded %s with %d items in %.3fs',
+                         self.loader.__name__, len(self.index), self.loaded_at - start)
+            except (DatabaseError, OSError):
+                log.exception('Could not load %s', self.loader.__name__)
+
+        return self.index
+
+
+openbare_ruimte_index = LazyIndex(_load_openbare_ruimtes)
+
+
+def _hit(entry: dict) -> Hit:
+    """
+    Make an elastic like hit, so views can treat it as any other hit
+    """
+    return Hit({
+        '_index': settings.ELASTIC_INDICES['BAG_GEBIED'],
+        '_type': 'doc',
+        '_id': f"opr_{entry['id']}",
+        '_source': {
+            'type': 'openbare_ruimte',
+            'subtype': entry['subtype'],
+            'subtype_id': entry['id'],
+            'naam': entry['naam'],
+            '_display': entry['naam'],
+            'landelijk_id': entry['landelijk_id'],
+        },
+    })
+
+
+def openbare_ruimte_hits(analyzer: QueryAnalyzer) -> Optional[LocalHits]:
+    """
+    In-process version of `bag_qs.openbare_ruimte_query`.
+
+    Returns None when the index can not be used or finds nothing, the
+    caller should then fall back to elastic.
+    """
+    if not settings.LOCAL_INDEX_ENABLED or not analyzer.is_naam():
+        return None
+
+    index = openbare_ruimte_index.get()
+    if index is None:
+        return None
+
+    matches = index.matches(analyzer.get_straatnaam())
+    if not matches:
+        # elastic also searches other fields, it might still find something
+        return None
+
+    return LocalHits(
+        [_hit(entry) for entry in matches[:MAX_HITS]],
+        Counter(entry['subtype'] for entry in matches))
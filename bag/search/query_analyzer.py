@@ -122,6 +122,13 @@ class QueryAnalyzer(object):
     def __repr__(self):
         return f"<QueryAnalyzer: {self.query}>"
 
+    @property
+    def normalized_query(self) -> str:
+        """
+        The query as the tokens that are searched for
+        """
+        return " ".join(self._tokens)
+
     def matches_test(self, test_name: str) -> bool:
         """Tell whether the 'query' matches the test."""
         test_function = getattr(self, test_name)
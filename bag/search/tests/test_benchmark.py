@@ -0,0 +1,83 @@
+import logging
+import os
+import unittest
+
+from rest_framework.test import APITestCase
+
+from datasets.generic.tests.authorization import AuthorizationSetup
+from search import benchmark
+from search.tests.fill_elastic import load_docs
+
+log = logging.getLogger(__name__)
+
+
+class BenchmarkReportTest(unittest.TestCase):
+
+    def _report(self, p50, p95, round_trips):
+        return {'endpoints': {'/atlas/typeahead/bag/': {
+            'p50_ms': p50, 'p95_ms': p95, 'round_trips': round_trips}}}
+
+    def test_percentile(self):
+        values = [float(i) for i in range(1, 101)]
+        self.assertEqual(benchmark.percentile(values, 50), 50.0)
+        self.assertEqual(benchmark.percentile(values, 95), 95.0)
+        self.assertEqual(benchmark.percentile(values, 99), 99.0)
+        self.assertEqual(benchmark.percentile([], 99), 0.0)
+
+    def test_compare(self):
+        baseline = self._report(10.0, 20.0, 1.0)
+
+        self.assertEqual(benchmark.compare(self._report(12.0, 24.0, 1.0), baseline), [])
+        self.assertEqual(len(benchmark.compare(self._report(10.0, 30.0, 1.0), baseline)), 1)
+        self.assertEqual(len(benchmark.compare(self._report(10.0, 20.0, 2.0), baseline)), 1)
+
+    def test_compare_noise(self):
+        baseline = self._report(0.5, 1.0, 1.0)
+        self.assertEqual(benchmark.compare(self._report(1.2, 1.8, 1.0), baseline), [])
+
+    def test_endpoints(self):
+        endpoints = benchmark.search_endpoints()
+        self.assertIn('/atlas/typeahead/bag/', endpoints)
+        self.assertIn('/atlas/search/postcode/', endpoints)
+        self.assertEqual(len(endpoints), len(set(endpoints)))
+
+
+@unittest.skipUnless(
+    os.getenv('SEARCH_BENCHMARK'),
+    'set SEARCH_BENCHMARK=1 to run the search benchmark')
+class SearchBenchmarkTest(APITestCase, AuthorizationSetup):
+    """
+    Replay the corpus against an elastic seeded from the test factories.
+
+    SEARCH_BENCHMARK_SAVE=<file> writes the report as new baseline,
+    SEARCH_BENCHMARK_BASELINE=<file> fails on regressions.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        load_docs(cls)
+
+    def setUp(self):
+        self.setUpAuthorization()
+
+    def test_benchmark(self):
+        report = benchmark.run(
+            benchmark.corpus_queries(),
+            repeat=int(os.getenv('SEARCH_BENCHMARK_REPEAT', 5)),
+            token=self.token_employee_plus,
+            client=self.client)
+
+        log.info('search benchmark\n%s', benchmark.format_report(report))
+
+        for endpoint, summary in report['endpoints'].items():
+            self.assertEqual(list(summary['statuses']), ['200'], endpoint)
+
+        save_path = os.getenv('SEARCH_BENCHMARK_SAVE')
+        if save_path:
+            benchmark.save_report(report, save_path)
+
+        baseline_path = os.getenv('SEARCH_BENCHMARK_BASELINE')
+        if baseline_path:
+            regressions = benchmark.compare(report, benchmark.load_report(baseline_path))
+            self.assertEqual(regressions, [])
@@ -1,4 +1,6 @@
 # Python
+from unittest import mock
+from urllib.parse import urlparse
 # Packages
 from rest_framework.test import APITransactionTestCase
 # Project
@@ -6,6 +8,7 @@ from batch import batch
 import datasets.bag.batch
 from datasets.bag.tests import factories as bag_factories
 import datasets.brk.batch
+from search.views import SearchOpenbareRuimteViewSet
 
 
 class OPRTest(APITransactionTestCase):
@@ -57,3 +60,30 @@ class OPRTest(APITransactionTestCase):
 
         self.assertIn("weg", results)
         self.assertIn("water", results)
+
+    @mock.patch.object(SearchOpenbareRuimteViewSet, 'page_size', 1)
+    def test_query_openbare_ruimte_cursor(self):
+        response = self.client.get(
+            "/atlas/search/openbareruimte/", dict(q="prinsengracht"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 1)
+
+        next_url = response.data['_links']['next']['href']
+        self.assertIn('cursor=', next_url)
+
+        url = urlparse(next_url)
+        response2 = self.client.get(f"{url.path}?{url.query}")
+        self.assertEqual(response2.status_code, 200)
+        self.assertEqual(len(response2.data['results']), 1)
+        self.assertEqual(response2.data['count'], 2)
+
+        subtypes = {
+            response.data['results'][0]['subtype'],
+            response2.data['results'][0]['subtype'],
+        }
+        self.assertEqual(subtypes, {"weg", "water"})
+
+    def test_query_openbare_ruimte_bad_cursor(self):
+        response = self.client.get(
+            "/atlas/search/openbareruimte/", dict(q="prinsengracht", cursor="nope"))
+        self.assertEqual(response.status_code, 400)
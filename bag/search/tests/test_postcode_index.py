@@ -0,0 +1,75 @@
+import os
+import tempfile
+from unittest import TestCase, mock
+
+from django.test import override_settings
+
+from search import postcode_index
+from search.postcode_index import PostcodeIndex
+from search.query_analyzer import QueryAnalyzer
+
+
+class PostcodeIndexTest(TestCase):
+
+    rows = [
+        ('1016SZ', 'Rozenstraat', 228, 'a', '1', 'verblijfsobject',
+         '0363200000000001', '0363200000000001', '0363010000000001'),
+        ('1016SZ', 'Rozenstraat', 228, None, None, 'verblijfsobject',
+         '0363200000000002', '0363200000000002', '0363010000000002'),
+        ('1016SZ', 'Rozenstraat', 22, None, None, 'ligplaats',
+         '0363200000000003', '0363200000000003', '0363020000000003'),
+        ('1001AA', 'Anjeliersstraat', 11, 'A', None, 'overig terrein',
+         '0363200000000004', '0363200000000004', None),
+    ]
+
+    def setUp(self):
+        self.index = PostcodeIndex(self.rows)
+
+    def _displays(self, postcode, toevoeging):
+        return [self.index.display(i) for i in self.index.lookup(postcode, toevoeging)]
+
+    def test_lookup_prefix(self):
+        self.assertEqual(
+            self._displays('1016sz', '22'),
+            ['Rozenstraat 22', 'Rozenstraat 228', 'Rozenstraat 228a-1'])
+
+    def test_lookup_toevoeging(self):
+        self.assertEqual(self._displays('1016SZ', '228 a'), ['Rozenstraat 228a-1'])
+        self.assertEqual(self._displays('1001aa', '11 a'), ['Anjeliersstraat 11A'])
+
+    def test_lookup_missing(self):
+        self.assertEqual(self._displays('9999zz', '1'), [])
+        self.assertEqual(self._displays('1016sz', '3'), [])
+
+    def test_hit(self):
+        [i] = self.index.lookup('1016sz', '228 a')
+        hit = self.index.hit(i)
+        self.assertEqual(hit.meta.id, '0363200000000001')
+        self.assertEqual(hit.subtype, 'verblijfsobject')
+        self.assertEqual(hit.adresseerbaar_object_id, '0363010000000001')
+
+        [i] = self.index.lookup('1001aa', '11')
+        self.assertNotIn('adresseerbaar_object_id', self.index.hit(i))
+
+    def test_snapshot(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'postcodes.pickle')
+            postcode_index.write_snapshot(self.index, path)
+            with override_settings(POSTCODE_INDEX_SNAPSHOT=path):
+                loaded = postcode_index._load_postcode_index()
+
+        self.assertEqual(len(loaded), len(self.index))
+        self.assertEqual(
+            [loaded.display(i) for i in loaded.lookup('1016sz', '22')],
+            self._displays('1016sz', '22'))
+
+    @override_settings(LOCAL_INDEX_ENABLED=True)
+    def test_hits_fall_back(self):
+        with mock.patch.object(postcode_index.postcode_index, 'get', return_value=self.index):
+            hits = postcode_index.postcode_huisnummer_hits(QueryAnalyzer('1016 SZ 228'))
+            self.assertEqual(len(hits), 2)
+            self.assertEqual(hits.subtype_totals, {'verblijfsobject': 2})
+
+            # elastic may still find what the index misses
+            self.assertIsNone(postcode_index.postcode_huisnummer_hits(QueryAnalyzer('1016 SZ 3')))
+            self.assertIsNone(postcode_index.postcode_huisnummer_ids(QueryAnalyzer('1016 SZ 3')))
@@ -0,0 +1,62 @@
+from unittest import TestCase
+
+from elasticsearch_dsl.response import Hit
+
+from search import views
+from search.prefix_index import LocalHits, PrefixIndex, normalize
+
+
+class PrefixIndexTest(TestCase):
+
+    names = [
+        "Prinsengracht",
+        "Korte Prinsengracht",
+        "1e Constantijn Huygensstraat",
+        "Laing's Nekstraat",
+        "Weesperstraat",
+        "Metrostation Weesperstraat",
+        "Café-Straat",
+    ]
+
+    def setUp(self):
+        entries = [{'naam': n, '_naam_lower': n.lower()} for n in self.names]
+        self.index = PrefixIndex(entries, [[n] for n in self.names])
+
+    def _search(self, query):
+        return [e['naam'] for e in self.index.search(query)]
+
+    def test_normalize(self):
+        self.assertEqual(normalize("Café-Straat"), "cafe straat")
+        self.assertEqual(normalize(" 1e  Constantijn/Huygens."), "1e constantijn huygens")
+        self.assertEqual(normalize("Laing's"), "laing's")
+
+    def test_prefix_first(self):
+        self.assertEqual(
+            self._search("prinsen"), ["Prinsengracht", "Korte Prinsengracht"])
+        self.assertEqual(
+            self._search("weesp"), ["Weesperstraat", "Metrostation Weesperstraat"])
+
+    def test_synonyms(self):
+        self.assertEqual(self._search("eerste con"), ["1e Constantijn Huygensstraat"])
+        self.assertEqual(self._search("1e c"), ["1e Constantijn Huygensstraat"])
+
+    def test_dividers_and_quotes(self):
+        self.assertEqual(self._search("cafe straat"), ["Café-Straat"])
+        self.assertEqual(self._search("laing"), ["Laing's Nekstraat"])
+
+    def test_no_whitespace(self):
+        self.assertEqual(self._search("korteprins"), ["Korte Prinsengracht"])
+
+    def test_no_match(self):
+        self.assertEqual(self._search("xyz"), [])
+        self.assertEqual(self._search(""), [])
+
+    def test_matches_untrimmed(self):
+        self.assertEqual(len(self.index.matches("w")), 2)
+
+    def test_local_hit_totals(self):
+        hit = Hit({'_index': 'test', '_type': 'doc', '_id': 'opr_1', '_source': {'subtype': 'weg'}})
+        hits = LocalHits([hit], {'weg': 120, 'water': 3})
+
+        groups = {group: (len(group_hits), total) for group, group_hits, total in views._result_groups(hits)}
+        self.assertEqual(groups, {'Straatnamen': (1, 120), 'Openbare ruimtes': (0, 3)})
@@ -1,5 +1,8 @@
+from unittest import mock
+
 from rest_framework.test import APITransactionTestCase
 
+from search import postcode_index
 from search.tests.fill_elastic import load_docs
 
 
@@ -67,6 +70,22 @@ class QueryTest(APITransactionTestCase):
         self.assertFalse(expr='order' in response.data['results'][0],
                          msg='Order data should be stripped from result')
 
+    def test_adres_local_index_miss(self):
+        """
+        An address missing from the in-process index still comes from elastic
+        """
+        with mock.patch.object(
+                postcode_index.postcode_index, 'get', return_value=postcode_index.PostcodeIndex([])):
+            response = self.client.get(
+                "/atlas/search/postcode/", {'q': "1016 SZ 228 a 1"})
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.data['results'][0]['adres'].startswith("Rozenstraat 228"))
+
+            response = self.client.get(
+                "/atlas/typeahead/bag/", {'q': "1016 SZ 228"})
+            self.assertEqual(response.status_code, 200)
+            self.assertIn('Rozenstraat 228', str(response.data))
+
     # def test_postcode_exact(self):
     #    response = self.client.get(
     #        "/search/postcode/", {'q': "1016 SZ 228 a 1"})
@@ -206,3 +225,13 @@ class QueryTest(APITransactionTestCase):
         self.assertEqual(200, res.status_code)
         self.assertEqual(f'bag/v1.1/pand/{self.pand1.landelijk_id}/', res.data[0]['content'][0]['uri'])
 
+    def test_typeahead_group_content(self):
+        res = self.client.get('/atlas/typeahead/bag/', {'q': "1016 SZ 228"})
+        self.assertEqual(200, res.status_code)
+
+        adressen = [group for group in res.data if group['label'] == 'Adressen'][0]
+        self.assertLessEqual(len(adressen['content']), 8)
+        self.assertGreaterEqual(adressen['total_results'], len(adressen['content']))
+        for item in adressen['content']:
+            self.assertEqual({'_display', 'uri'}, set(item))
+            self.assertTrue(item['uri'].startswith('bag/v1.1/'))
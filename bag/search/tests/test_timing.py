@@ -0,0 +1,46 @@
+from unittest import TestCase
+
+from health import metrics
+from search.timing import SearchTimer, PHASE_SECONDS
+
+
+class MetricsTest(TestCase):
+
+    def test_histogram(self):
+        histogram = metrics.histogram(
+            'test_histogram_seconds', 'test', ('query',), buckets=(0.1, 1.0))
+        histogram.observe(0.05, query='a')
+        histogram.observe(0.5, query='a')
+
+        self.assertEqual(histogram.count(query='a'), 2)
+        self.assertEqual(histogram.count(query='b'), 0)
+
+        text = metrics.render()
+        self.assertIn('# TYPE test_histogram_seconds histogram', text)
+        self.assertIn('test_histogram_seconds_bucket{query="a",le="0.1"} 1', text)
+        self.assertIn('test_histogram_seconds_bucket{query="a",le="1.0"} 2', text)
+        self.assertIn('test_histogram_seconds_bucket{query="a",le="+Inf"} 2', text)
+        self.assertIn('test_histogram_seconds_count{query="a"} 2', text)
+
+    def test_same_metric(self):
+        first = metrics.counter('test_counter_total', 'test', ('view',))
+        second = metrics.counter('test_counter_total', 'test', ('view',))
+        first.inc(view='x')
+        second.inc(view='x')
+        self.assertIs(first, second)
+        self.assertEqual(first.value(view='x'), 2)
+
+
+class SearchTimerTest(TestCase):
+
+    def test_spans(self):
+        timer = SearchTimer('TestViewSet')
+        with timer.span('analysis'):
+            pass
+        timer.add('elastic', 0.002)
+        timer.add('elastic', 0.003)
+
+        self.assertEqual(list(timer.spans), ['analysis', 'elastic'])
+        self.assertAlmostEqual(timer.spans['elastic'], 0.005)
+        self.assertIn('elastic;dur=5.0', timer.server_timing())
+        self.assertEqual(PHASE_SECONDS.count(view='TestViewSet', phase='elastic'), 2)
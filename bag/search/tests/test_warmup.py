@@ -0,0 +1,29 @@
+from unittest import TestCase
+
+from django.conf import settings
+from django.test import override_settings
+
+from search import benchmark, warmup
+
+
+class WarmupTest(TestCase):
+
+    def _names(self, query_input, *keys):
+        indices = {settings.ELASTIC_INDICES[key] for key in keys}
+        return [name for name, _ in warmup.warmup_searches(query_input, indices)]
+
+    def test_postcode(self):
+        names = self._names('1016SZ 228', 'NUMMERAANDUIDING')
+        self.assertIn('postcode_huisnummer_query', names)
+        self.assertNotIn('kadastraal_subject_query', names)
+
+    def test_subject(self):
+        self.assertEqual(self._names('kikker', 'BRK_SUBJECT'), ['kadastraal_subject_query'])
+
+    def test_other_index(self):
+        self.assertEqual(self._names('kikker', 'BAG_PAND', 'NUMMERAANDUIDING'), ['pandnaam_query'])
+
+    @override_settings(SEARCH_WARMUP_QUERIES=None, SEARCH_WARMUP_SIZE=3)
+    def test_queries(self):
+        self.assertEqual(warmup.warmup_queries(), benchmark.corpus_queries()[:3])
+        self.assertEqual(len(warmup.warmup_queries(5)), 5)
@@ -0,0 +1,114 @@
+"""
+Timing of search requests.
+
+Every typeahead and search request is split in phases: analysis of the
+query, building the queries, elastic, shaping the results and rendering.
+The phases go to histograms on /status/metrics and, per request, to the
+Server-Timing header. Elastic queries are timed per query function, both
+wall time and the `took` reported by elastic. Slow queries are logged.
+"""
+import logging
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from django.conf import settings
+from elasticsearch_dsl import Search
+
+from health import metrics
+
+log = logging.getLogger(__name__)
+
+PHASE_SECONDS = metrics.histogram(
+    'search_phase_seconds',
+    'Time spent per phase of a search request',
+    ('view', 'phase'))
+
+QUERY_SECONDS = metrics.histogram(
+    'search_query_seconds',
+    'Wall time per search query function',
+    ('query', 'source'))
+
+QUERY_TOOK_SECONDS = metrics.histogram(
+    'search_query_took_seconds',
+    'Time spent in elastic per search query function, as reported by elastic',
+    ('query',))
+
+
+def observe_query(label: str, source: str, seconds: float):
+    QUERY_SECONDS.observe(seconds, query=label, source=source)
+
+
+class SearchTimer(object):
+    """
+    Collects the timing spans of one request
+    """
+
+    def __init__(self, view: str):
+        self.view = view
+        self.spans = OrderedDict()
+
+    def add(self, phase: str, seconds: float):
+        self.spans[phase] = self.spans.get(phase, 0.0) + seconds
+        PHASE_SECONDS.observe(seconds, view=self.view, phase=phase)
+
+    @contextmanager
+    def span(self, phase: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, time.perf_counter() - start)
+
+    def execute(self, search: Search, label: str, query_input: str, **kwargs):
+        """
+        Execute an elastic search and record how long it took
+        """
+        start = time.perf_counter()
+        try:
+            result = search.execute(**kwargs)
+        finally:
+            wall = time.perf_counter() - start
+            self.add('elastic', wall)
+            observe_query(label, 'elastic', wall)
+
+        took = result.took / 1000.0
+        QUERY_TOOK_SECONDS.observe(took, query=label)
+
+        if wall >= settings.SEARCH_SLOW_QUERY_SECONDS:
+            log.warning(
+                'Slow search query %s at %s: %.3fs, elastic took %.3fs, input <%s>',
+                label, search._index, wall, took, query_input)
+
+        return result
+
+    def server_timing(self) -> str:
+        return ', '.join(
+            f'{phase};dur={seconds * 1000:.1f}' for phase, seconds in self.spans.items())
+
+
+class SearchTimingMixin(object):
+    """
+    Time search view sets. Rendering is timed after the view returns.
+    """
+
+    @property
+    def timer(self) -> SearchTimer:
+        if not hasattr(self, '_timer'):
+            self._timer = SearchTimer(self.__class__.__name__)
+        return self._timer
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+
+        timer = self.timer
+        start = time.perf_counter()
+
+        def rendered(rendered_response):
+            timer.add('render', time.perf_counter() - start)
+            rendered_response['Server-Timing'] = timer.server_timing()
+
+        if hasattr(response, 'add_post_render_callback'):
+            response.add_post_render_callback(rendered)
+
+        return response
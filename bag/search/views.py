@@ -5,15 +5,18 @@ Search    bag, brk
 """
 from __future__ import annotations
 
+import base64
+import binascii
 import json
 import logging
 import re
+import time
 from collections import OrderedDict
 from collections import defaultdict
 
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import PermissionDenied, ValidationError
 from typing import AbstractSet, Callable, List
-from urllib.parse import quote, urlparse
+from urllib.parse import quote
 
 from django.conf import settings
 from django.utils.encoding import force_text
@@ -31,7 +34,8 @@ from bag import authorization_levels
 
 from datasets.bag import queries as bag_qs  # noqa
 from datasets.brk import queries as brk_qs  # noqa
-from datasets.generic import rest
+from datasets.generic import generation, rest
+from search import postcode_index, prefix_index, timing
 from search.query_analyzer import QueryAnalyzer
 
 
@@ -118,6 +122,35 @@ _subtype_mapping = {
 }
 
 
+def _build_group_filters() -> dict:
+    """
+    The subtypes of each typeahead group. For 'Openbare ruimtes' kunstwerk
+    gets its own filter, those hits are shown first.
+    """
+    group_filters = OrderedDict((group, []) for group in _autocomplete_group_order)
+    for subtype, group in _subtype_mapping.items():
+        group_filters[group].append(subtype)
+
+    for group, subtypes in group_filters.items():
+        if 'kunstwerk' in subtypes:
+            rest_subtypes = [subtype for subtype in subtypes if subtype != 'kunstwerk']
+            group_filters[group] = [['kunstwerk'], rest_subtypes]
+        else:
+            group_filters[group] = [subtypes]
+
+    return group_filters
+
+
+# Subtypes per typeahead group, used to let elastic do the grouping
+_autocomplete_group_filters = _build_group_filters()
+
+# Fields needed to show a typeahead hit and build its url
+_autocomplete_source_fields = [
+    '_display', 'subtype', 'type', 'landelijk_id',
+    'adresseerbaar_object_id', 'subtype_id',
+]
+
+
 _add_subtype_display = {
     'kunstwerk',
     'water',
@@ -187,6 +220,13 @@ default_queries = {
     'pand': [bag_qs.pandnaam_query]
 }
 
+# Queries that can be answered by an in-process index. The index
+# returns None for queries it can not answer.
+local_queries = {
+    bag_qs.openbare_ruimte_query: prefix_index.openbare_ruimte_hits,
+    bag_qs.postcode_huisnummer_query: postcode_index.postcode_huisnummer_hits,
+}
+
 
 def get_specialized_query_selectors(q_select: AbstractSet[str]) -> List[dict]:
     """
@@ -251,16 +291,17 @@ def find_default_queries(q_select) -> List[Search]:
     return queries
 
 
-def select_queries(
+def select_named_queries(
         query_string: str,
         analyzer: QueryAnalyzer,
-        q_select: AbstractSet[str] = None) -> List[Search]:
+        q_select: AbstractSet[str] = None) -> List[tuple]:
     """
     Looks at the query string being filled and tries
     to make conclusions about what is actually being searched.
     This is useful to reduce the number of queries and reduce the result size
 
-    Returns a list of queries that should be used
+    Returns a list of (query function name, query) tuples. For queries
+    answered by an in-process index the query is the list of hits.
     """
 
     # Too little information to search on
@@ -276,7 +317,36 @@ def select_queries(
         log.debug("No specialized queries for '%s', using defaults", query_string)
         queries = find_default_queries(q_select)
 
-    return [q(analyzer) for q in queries]
+    return [(q.__name__, _local_or_elastic(q, analyzer)) for q in queries]
+
+
+def select_queries(
+        query_string: str,
+        analyzer: QueryAnalyzer,
+        q_select: AbstractSet[str] = None) -> List[Search]:
+    """
+    Returns a list of queries that should be used, or for queries answered
+    by an in-process index, the list of hits
+    """
+    return [query for _, query in select_named_queries(query_string, analyzer, q_select)]
+
+
+def _local_or_elastic(query: CallableQueryFunction, analyzer: QueryAnalyzer):
+    """
+    Return the hits from an in-process index if it can answer this query,
+    otherwise the elastic query
+    """
+    local_query = local_queries.get(query)
+
+    if local_query:
+        start = time.perf_counter()
+        hits = local_query(analyzer)
+        if hits is not None:
+            timing.observe_query(query.__name__, 'local', time.perf_counter() - start)
+            log.debug('Local index answered %s for <%s>', query.__name__, analyzer.query)
+            return hits
+
+    return query(analyzer)
 
 
 def _get_doc_attr(hit, attribute, default):
@@ -289,9 +359,9 @@ def _get_doc_attr(hit, attribute, default):
     return default
 
 
-def _get_url(request, hit):
+def _get_detail(hit) -> (str, str):
     """
-    Given an elk hit determine the uri for each hit
+    Given an elk hit determine the detail view name and pk
     """
     doc_type = _get_doc_attr(hit, 'type',  default=hit.meta.doc_type)
     detail_type = _get_doc_attr(hit, 'subtype', doc_type)
@@ -314,11 +384,41 @@ def _get_url(request, hit):
     if pk is None:
         pk = _get_doc_attr(hit, 'subtype_id', default=hit.meta.id)
 
+    return _details[detail_type], pk
+
+
+def _get_url(request, hit):
+    """
+    Given an elk hit determine the uri for each hit
+    """
+    view_name, pk = _get_detail(hit)
+
     return rest.get_links(
-        view_name=_details[detail_type],
+        view_name=view_name,
         kwargs={'pk': pk}, request=request)
 
 
+_PK_PLACEHOLDER = 'PK_PLACEHOLDER'
+_uri_templates = {}
+
+
+def _get_uri(hit) -> str:
+    """
+    Given an elk hit determine the uri path (without leading slash).
+
+    The url of each detail view is reversed only once, after that the pk
+    is filled in the template.
+    """
+    view_name, pk = _get_detail(hit)
+
+    template = _uri_templates.get(view_name)
+    if template is None:
+        template = reverse(view_name, kwargs={'pk': _PK_PLACEHOLDER})[1:]
+        _uri_templates[view_name] = template
+
+    return template.replace(_PK_PLACEHOLDER, quote(str(pk)))
+
+
 class QueryMetadata(metadata.SimpleMetadata):
     def determine_metadata(self, request, view):
         result = super().determine_metadata(request, view)
@@ -372,7 +472,60 @@ class QFilter(object):
         ]
 
 
-class TypeaheadViewSet(viewsets.ViewSet):
+def _add_group_aggregations(search: Search) -> Search:
+    """
+    Let elastic return only the hits that are shown in the typeahead.
+
+    Each group gets a top_hits aggregation with the size of the group,
+    sorted like the query and with only the fields we need.
+    """
+    sort = search.to_dict().get('sort')
+    search = search.extra(size=0)
+
+    for group, group_filters in _autocomplete_group_filters.items():
+        top_hits = {
+            'size': _autocomplete_group_sizes[group],
+            '_source': {'includes': _autocomplete_source_fields},
+        }
+        if sort:
+            top_hits['sort'] = sort
+
+        for i, subtypes in enumerate(group_filters):
+            search.aggs.bucket(
+                f'{group} {i}', 'filter', terms={'subtype': subtypes}
+            ).metric('hits', 'top_hits', **top_hits)
+
+    return search
+
+
+def _result_groups(result):
+    """
+    Yield (group, hits, total) for an elastic result with group
+    aggregations, or for a list of hits from an in-process index.
+    """
+    if isinstance(result, list):
+        group_hits = defaultdict(list)
+        for hit in result:
+            group_hits[_subtype_mapping[hit.subtype]].append(hit)
+
+        # the hits are trimmed, the totals count all matches
+        group_totals = defaultdict(int)
+        for subtype, total in result.subtype_totals.items():
+            if subtype in _subtype_mapping:
+                group_totals[_subtype_mapping[subtype]] += total
+
+        for group, total in group_totals.items():
+            yield group, group_hits[group], total
+        return
+
+    for group, group_filters in _autocomplete_group_filters.items():
+        for i, _ in enumerate(group_filters):
+            bucket = result.aggregations[f'{group} {i}']
+            if bucket.doc_count:
+                yield group, bucket['hits'], bucket.doc_count
+
+
+class TypeaheadViewSet(timing.SearchTimingMixin, generation.GenerationCacheMixin, viewsets.ViewSet):
     """
     Given a query parameter `q`, this function returns a
     subset of all objects
@@ -394,10 +547,10 @@ class TypeaheadViewSet(viewsets.ViewSet):
         super().__init__(**kwargs)
         self.client = Elasticsearch(settings.ELASTIC_SEARCH_HOSTS)
 
-    def authorized_queries(self, request: Request, analyzer) -> List[Search]:
+    def authorized_queries(self, request: Request, analyzer) -> List[tuple]:
         """
         Overide this method with custom authorization for your
-        data
+        data, returns (query function name, query) tuples
         """
         return []
 
@@ -405,15 +558,20 @@ class TypeaheadViewSet(viewsets.ViewSet):
             self, request, query: str, q_select: AbstractSet[str]):
         """provide autocomplete suggestions"""
 
+        timer = self.timer
+
         # get the relevant queries
-        analyzer = QueryAnalyzer(query)
-        query_components = select_queries(query, analyzer, q_select or set())
+        with timer.span('analysis'):
+            analyzer = QueryAnalyzer(query)
+
+        with timer.span('build'):
+            query_components = select_named_queries(query, analyzer, q_select or set())
 
-        authorized_queries = self.authorized_queries(request, analyzer)
-        # if you are authorized to look for names
-        # add the query
-        if authorized_queries:
-            query_components.extend(authorized_queries)
+            authorized_queries = self.authorized_queries(request, analyzer)
+            # if you are authorized to look for names
+            # add the query
+            if authorized_queries:
+                query_components.extend(authorized_queries)
 
         result_data = []
 
@@ -421,8 +579,13 @@ class TypeaheadViewSet(viewsets.ViewSet):
         ignore_cache = settings.DEBUG
 
         # create elk queries
-        for search in query_components:  # type: Search
-            search = search.using(self.client)
+        for name, search in query_components:  # type: str, Search
+            if isinstance(search, list):
+                # hits from an in-process index
+                result_data.append(search)
+                continue
+
+            search = _add_group_aggregations(search.using(self.client))
 
             log.debug(
                 "Running query at %s: %s", search._index,
@@ -431,7 +594,8 @@ class TypeaheadViewSet(viewsets.ViewSet):
 
             # get the result from elastic
             try:
-                result = search.execute(ignore_cache=ignore_cache)
+                result = timer.execute(
+                    search, name, analyzer.normalized_query, ignore_cache=ignore_cache)
             except TransportError as t:
                 log.exception(
                     'FAILED ELK SEARCH: at %s %s', search._index,
@@ -443,30 +607,28 @@ class TypeaheadViewSet(viewsets.ViewSet):
 
         return result_data
 
-    def _get_uri(self, request, hit):
-        # Retrieves the uri part for an item
-        url = _get_url(request, hit)['self']['href']
-        uri = urlparse(url).path[1:]
-        return uri
-
     def _group_elk_results(self, request, results):
         """
         Group the elk results in their pretty name groups
+
+        Returns the hits and the total number of hits per group
         """
-        flat_results = (hit for r in results for hit in r)
         result_groups = defaultdict(list)
-
-        for hit in flat_results:
-            group = _subtype_mapping[hit.subtype]
-            display = hit._display
-            if hit.subtype in _add_subtype_display:
-                display += f' ({hit.subtype})'
-            result_groups[group].append({
-                '_display': display,
-                'uri': self._get_uri(request, hit)
-            })
-
-        return result_groups
+        group_totals = defaultdict(int)
+
+        for result in results:
+            for group, hits, total in _result_groups(result):
+                group_totals[group] += total
+                for hit in hits:
+                    display = hit._display
+                    if hit.subtype in _add_subtype_display:
+                        display += f' ({hit.subtype})'
+                    result_groups[group].append({
+                        '_display': display,
+                        'hit': hit,
+                    })
+
+        return result_groups, group_totals
 
     @staticmethod
     def _kunstwerk_on_top(old_list: List) -> List:
@@ -491,7 +653,7 @@ class TypeaheadViewSet(viewsets.ViewSet):
         """
 
         # put the elk results in subtype groups
-        result_groups = self._group_elk_results(request, results)
+        result_groups, group_totals = self._group_elk_results(request, results)
 
         ordered_results = []
 
@@ -504,10 +666,16 @@ class TypeaheadViewSet(viewsets.ViewSet):
 
             size = _autocomplete_group_sizes[group]
 
+            # only the shown items need an uri
+            content = [
+                {'_display': item['_display'], 'uri': _get_uri(item['hit'])}
+                for item in result_groups[group][:size]
+            ]
+
             ordered_results.append({
                 'label': group,
-                'content': result_groups[group][:size],
-                'total_results': len(result_groups[group])
+                'content': content,
+                'total_results': group_totals[group]
             })
 
         return ordered_results
@@ -529,7 +697,9 @@ class TypeaheadViewSet(viewsets.ViewSet):
             return Response([])
 
         results = self.autocomplete_queries(request, query, q_select)
-        response = self._order_results(results, request)
+
+        with self.timer.span('shaping'):
+            response = self._order_results(results, request)
 
         return Response(response)
 
@@ -548,9 +718,10 @@ class TypeAheadBagViewSet(TypeaheadViewSet):
         return self._abstr_list(request, {'bag', 'nummeraanduiding', 'pand'})
 
 
-def authorized_subject_queries(request, analyzer) -> List[Search]:
+def authorized_subject_queries(request, analyzer) -> List[tuple]:
     """
-    Decide if which query we can execute
+    Decide if which query we can execute, returns (query function name,
+    query) tuples
 
     public - no subjects
     employ - non natural subjects / nietnatuurlijk
@@ -561,14 +732,15 @@ def authorized_subject_queries(request, analyzer) -> List[Search]:
 
     # Scope BRK/RSN or EMPLOYEE PLUS
     if authorized:
-        return [brk_qs.kadastraal_subject_query(analyzer)]
+        query = brk_qs.kadastraal_subject_query
+        return [(query.__name__, query(analyzer))]
 
     # Scope BRK/RS or EMPLOYEE
     niet_natuurlijk = brk_qs.kadastraal_subject_nietnatuurlijk_query
     authorized = request.is_authorized_for(authorization_levels.SCOPE_BRK_RS)
 
     if authorized:
-        return [niet_natuurlijk(analyzer)]
+        return [(niet_natuurlijk.__name__, niet_natuurlijk(analyzer))]
 
     # NOT AUTHORIZED / PUBLIC
     return []
@@ -614,7 +786,7 @@ class TypeAheadBrkViewSet(TypeaheadViewSet):
 
     filter_backends = [BrkQ]
 
-    def authorized_queries(self, request, analyzer) -> List[Search]:
+    def authorized_queries(self, request, analyzer) -> List[tuple]:
         return authorized_subject_queries(request, analyzer)
 
     def list(self, request):
@@ -644,9 +816,55 @@ class TypeAheadLegacyViewSet(TypeaheadViewSet):
         return self._abstr_list(request, set())
 
 
-class SearchViewSet(viewsets.ViewSet):
+def _encode_cursor(sort_values) -> str:
+    """
+    Turn the sort values of the last hit on a page into an opaque cursor
+    """
+    data = json.dumps(list(sort_values), separators=(',', ':'))
+    return base64.urlsafe_b64encode(data.encode('utf-8')).decode('ascii')
+
+
+def _decode_cursor(cursor: str) -> list:
+    """
+    Turn a cursor back into the `search_after` values for elastic
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (binascii.Error, ValueError, UnicodeError):
+        raise ValidationError({'cursor': 'Invalid cursor'})
+
+    if not isinstance(values, list) or not values:
+        raise ValidationError({'cursor': 'Invalid cursor'})
+
+    return values
+
+
+# Keyword copy of the document id in every search document, sorting on
+# `_id` itself loads fielddata on every node
+TIEBREAK_FIELD = 'id'
+
+
+def _with_tiebreak_sort(search: Search) -> Search:
+    """
+    search_after needs a total ordering of the hits, so we always end
+    the sort with the document id
+    """
+    sort_fields = list(search._sort) or ['_score']
+
+    for field in sort_fields:
+        if field == TIEBREAK_FIELD or (isinstance(field, dict) and TIEBREAK_FIELD in field):
+            return search
+
+    return search.sort(*sort_fields, TIEBREAK_FIELD)
+
+
+class SearchViewSet(timing.SearchTimingMixin, generation.GenerationCacheMixin, viewsets.ViewSet):
     """
     Base class for ViewSets implementing search.
+
+    Results can be paged with `page` up to `page_limit` pages. The `next`
+    link always contains a `cursor` that uses elastic `search_after`, so
+    following it costs the same for every page and has no limit.
     """
 
     metadata_class = QueryMetadata
@@ -657,6 +875,9 @@ class SearchViewSet(viewsets.ViewSet):
     renderer_classes = rest.DEFAULT_RENDERERS
     filter_backends = [QFilter]
 
+    # name of the query function search_query used, labels the timings
+    query_label = None
+
     def search_query(self, request,
                      elk_client, analyzer: QueryAnalyzer) -> Search:
         """
@@ -664,8 +885,25 @@ class SearchViewSet(viewsets.ViewSet):
         """
         raise NotImplementedError
 
+    def use_query(self, query: Callable[..., Search], *args) -> Search:
+        """
+        Build the search with query function `query` and remember its name
+        """
+        self.query_label = query.__name__
+        return query(*args)
+
+    def _followup_params(self, request) -> str:
+        """
+        Query parameters, other than paging, to keep in paging links
+        """
+        params = ''
+        subtype = request.query_params.get('subtype')
+        if subtype:
+            params += f"&subtype={quote(subtype)}"
+        return params
+
     def _set_followup_url(self, request, result, end,
-                          response, query, page):
+                          response, query, page, cursor=None):
         """
         Add paging links for result set to response object
         """
@@ -676,7 +914,12 @@ class SearchViewSet(viewsets.ViewSet):
         followup_url = reverse(self.url_name, request=request)
 
         separator = '&' if '?' in followup_url else '?'
-        self_url = f"{followup_url}{separator}q={url_query}&page={page}"
+        base_url = f"{followup_url}{separator}q={url_query}{self._followup_params(request)}"
+
+        if cursor:
+            self_url = f"{base_url}&cursor={cursor}"
+        else:
+            self_url = f"{base_url}&page={page}"
 
         response['_links'] = OrderedDict([
             ('self', {'href': self_url}),
@@ -684,15 +927,21 @@ class SearchViewSet(viewsets.ViewSet):
             ('prev', {'href': None})
         ])
 
-        # Finding and setting prev and next pages
-        if end < result.hits.total:
-            if end < (self.page_size * self.page_limit):
-                # There should be a next
-                response['_links']['next']['href'] = f"{followup_url}{separator}q={url_query}&page={page + 1}"
+        # A full page means there might be more. The next page is always
+        # fetched with search_after, which is as cheap as the first page
+        hits = result.hits
+        if len(hits) == self.page_size and (cursor or end < hits.total):
+            next_cursor = _encode_cursor(hits[-1].meta.sort)
+            response['_links']['next']['href'] = f"{base_url}&cursor={next_cursor}"
+
+        # search_after only goes forward, no prev for cursor pages
+        if cursor:
+            return
+
         if page == 2:
-            response['_links']['prev']['href'] = f"{followup_url}{separator}q={url_query}"
+            response['_links']['prev']['href'] = base_url
         elif page > 2:
-            response['_links']['prev']['href'] = f"{followup_url}{separator}q={url_query}&page={page - 1}"
+            response['_links']['prev']['href'] = f"{base_url}&page={page - 1}"
 
     def list(self, request, *args, **kwargs):
         """
@@ -703,14 +952,21 @@ class SearchViewSet(viewsets.ViewSet):
             - name: q
               description: Zoek object
               required: true
+            - name: cursor
+              description: Positie in resultaten, uit de next link
+              required: false
         """
 
         if 'q' not in request.query_params:
             return Response([])
 
+        cursor = request.query_params.get('cursor')
+        search_after = _decode_cursor(cursor) if cursor else None
+
         page = 1
-        if 'page' in request.query_params:
-            # limit search results pageing in elastic is slow
+        if 'page' in request.query_params and not cursor:
+            # limit search results pageing with from/size in elastic is slow
+            # deeper pages are reachable with the cursor
             page = int(request.query_params['page'])
             if page > self.page_limit:
                 page = self.page_limit
@@ -719,7 +975,10 @@ class SearchViewSet(viewsets.ViewSet):
         end = (page * self.page_size)
 
         query = request.query_params['q']
-        analyzer = QueryAnalyzer(query)
+        timer = self.timer
+
+        with timer.span('analysis'):
+            analyzer = QueryAnalyzer(query)
 
         elk_client = Elasticsearch(
             settings.ELASTIC_SEARCH_HOSTS,
@@ -727,13 +986,19 @@ class SearchViewSet(viewsets.ViewSet):
         )
 
         # get the result from elastic
-        elk_query = self.search_query(request, elk_client, analyzer)
+        with timer.span('build'):
+            elk_query = self.search_query(request, elk_client, analyzer)
 
-        search = elk_query[start:end]
+            if not elk_query:
+                log.debug('no elk query')
+                return Response([])
 
-        if not search:
-            log.debug('no elk query')
-            return Response([])
+            elk_query = _with_tiebreak_sort(elk_query)
+
+            if search_after:
+                search = elk_query.extra(search_after=search_after)[0:self.page_size]
+            else:
+                search = elk_query[start:end]
 
         ignore_cache = settings.DEBUG
 
@@ -743,24 +1008,27 @@ class SearchViewSet(viewsets.ViewSet):
         )
 
         try:
-            result = search.execute(ignore_cache=ignore_cache)
+            result = timer.execute(
+                search, self.query_label or self.url_name, analyzer.normalized_query,
+                ignore_cache=ignore_cache)
         except TransportError:
             log.exception("Could not execute search query at %s: %s", search._index, query)
             log.debug(json.dumps(search.to_dict(), indent=4))
             return Response([], 500)
 
-        response = OrderedDict()
+        with timer.span('shaping'):
+            response = OrderedDict()
 
-        # log.exception(json.dumps(result.to_dict(), indent=4))
+            # log.exception(json.dumps(result.to_dict(), indent=4))
 
-        self._set_followup_url(request, result, end, response, query, page)
+            self._set_followup_url(request, result, end, response, query, page, cursor)
 
-        count = result.hits.total
-        response['count_hits'] = count
-        response['count'] = count
+            count = result.hits.total
+            response['count_hits'] = count
+            response['count'] = count
 
-        results = [self.normalize_hit(h, request) for h in result.hits]
-        response['results'] = self.list_results(results)
+            results = [self.normalize_hit(h, request) for h in result.hits]
+            response['results'] = self.list_results(results)
 
         return Response(response)
 
@@ -829,7 +1097,8 @@ class SearchSubjectViewSet(SearchViewSet):
             raise PermissionDenied
 
         # authorized only!
-        search = querylist[0].using(elk_client)
+        self.query_label, search = querylist[0]
+        search = search.using(elk_client)
 
         return search
 
@@ -888,7 +1157,7 @@ class SearchObjectViewSet(SearchViewSet):
         if not analyzer.is_kadastraal_object_prefix():
             return []
 
-        search_q = brk_qs.kadastraal_object_query(analyzer)
+        search_q = self.use_query(brk_qs.kadastraal_object_query, analyzer)
         search = search_q.using(elk_client)
         return search
 
@@ -916,7 +1185,7 @@ class SearchBouwblokViewSet(SearchViewSet):
         if not analyzer.is_bouwblok_prefix():
             return []
 
-        search_q = bag_qs.bouwblok_query(analyzer)
+        search_q = self.use_query(bag_qs.bouwblok_query, analyzer)
         search = search_q.using(elk_client)
 
         return search.filter('terms', subtype=['bouwblok'])
@@ -944,11 +1213,11 @@ class SearchGebiedenViewSet(SearchViewSet):
         """
 
         if analyzer.is_bouwblok_prefix():
-            search = bag_qs.bouwblok_query(analyzer)
+            search = self.use_query(bag_qs.bouwblok_query, analyzer)
             search = search.using(elk_client)
             return search
         else:
-            search = bag_qs.gebied_query(analyzer).using(elk_client)
+            search = self.use_query(bag_qs.gebied_query, analyzer).using(elk_client)
 
         return search
 
@@ -998,11 +1267,11 @@ class SearchOpenbareRuimteViewSet(SearchViewSet):
             subtype = None
 
         if analyzer.is_postcode_prefix() and _subtype_contains_weg(subtype):
-            search_data = bag_qs.postcode_query(analyzer)
+            search_data = self.use_query(bag_qs.postcode_query, analyzer)
         elif analyzer.is_landelijk_id_prefix():
-            search_data = bag_qs.landelijk_id_openbare_ruimte_query(analyzer, subtype)
+            search_data = self.use_query(bag_qs.landelijk_id_openbare_ruimte_query, analyzer, subtype)
         else:
-            search_data = bag_qs.openbare_ruimte_query(analyzer, subtype)
+            search_data = self.use_query(bag_qs.openbare_ruimte_query, analyzer, subtype)
 
         return search_data.using(elk_client)
 
@@ -1080,17 +1349,17 @@ class SearchNummeraanduidingViewSet(SearchViewSet):
         q = None
 
         if analyzer.is_postcode_huisnummer_prefix():
-            q = bag_qs.postcode_huisnummer_query(analyzer)
+            q = self.use_query(bag_qs.postcode_huisnummer_query, analyzer)
 
         elif analyzer.is_straatnaam_huisnummer_prefix():
-            q = bag_qs.straatnaam_huisnummer_query(analyzer)
+            q = self.use_query(bag_qs.straatnaam_huisnummer_query, analyzer)
 
 
         elif analyzer.is_landelijk_id_prefix():
-            q = bag_qs.landelijk_id_nummeraanduiding_query(analyzer)
+            q = self.use_query(bag_qs.landelijk_id_nummeraanduiding_query, analyzer)
 
         if not q:
-            q = bag_qs.straatnaam_query(analyzer)
+            q = self.use_query(bag_qs.straatnaam_query, analyzer)
 
         # default response search roads
         return q.using(elk_client)
@@ -1140,10 +1409,16 @@ class SearchPostcodeViewSet(SearchViewSet):
         """Creating the actual query to ES"""
 
         if analyzer.is_postcode_huisnummer_prefix():
-            return bag_qs.postcode_huisnummer_query(analyzer).using(elk_client)
+            # The full documents come from elastic, but fetching by id is
+            # much cheaper than the prefix query
+            ids = postcode_index.postcode_huisnummer_ids(analyzer)
+            if ids is not None:
+                return self.use_query(bag_qs.nummeraanduiding_ids_query, ids).using(elk_client)
+
+            return self.use_query(bag_qs.postcode_huisnummer_query, analyzer).using(elk_client)
 
         elif analyzer.is_postcode_prefix():
-            search = bag_qs.postcode_query(analyzer)
+            search = self.use_query(bag_qs.postcode_query, analyzer)
             return search.using(elk_client)
 
         return []
@@ -1161,8 +1436,8 @@ class SearchPandViewSet(SearchViewSet):
     def search_query(self, request,
                      elk_client, analyzer: QueryAnalyzer) -> Search:
         if analyzer.is_landelijk_id_prefix():
-            return bag_qs.landelijk_id_pand_query(analyzer).using(elk_client)
+            return self.use_query(bag_qs.landelijk_id_pand_query, analyzer).using(elk_client)
         else:
-            return bag_qs.pandnaam_query(analyzer).using(elk_client)
+            return self.use_query(bag_qs.pandnaam_query, analyzer).using(elk_client)
 
         return []
@@ -0,0 +1,118 @@
+"""
+Warm up freshly built elastic indices.
+
+The first queries on a new index hit cold segment, filesystem and
+fielddata caches. After a build `elastic_indices` replays the most
+frequent search inputs with the same query functions the views use,
+before the index gets traffic, and reports the latency per pass.
+
+The inputs come from the file in `SEARCH_WARMUP_QUERIES`, one input
+per line with the most frequent first (for example taken from the
+access logs), or the benchmark corpus when it is not set.
+"""
+import logging
+import time
+from typing import AbstractSet, List, Tuple
+
+from django.conf import settings
+from elasticsearch import Elasticsearch
+from elasticsearch.exceptions import TransportError
+from elasticsearch_dsl import Search
+
+from datasets.brk import queries as brk_qs
+from search import benchmark
+from search.query_analyzer import QueryAnalyzer
+
+log = logging.getLogger(__name__)
+
+
+def _query_functions() -> List[tuple]:
+    """
+    (test function name, query function) of every query the typeahead
+    and search views send to elastic
+    """
+    from search import views
+
+    functions = [
+        (option['testfunction'], option['query'])
+        for option in views.specialized_query_selectors
+    ]
+    for queries in views.default_queries.values():
+        functions.extend((None, query) for query in queries)
+    functions.append((None, brk_qs.kadastraal_subject_query))
+
+    unique = []
+    for function in functions:
+        if function not in unique:
+            unique.append(function)
+    return unique
+
+
+def warmup_searches(query_input: str, indices: AbstractSet[str]) -> List[Tuple[str, Search]]:
+    """
+    The searches the views would do for this input, limited to the
+    given indices
+    """
+    analyzer = QueryAnalyzer(query_input)
+    searches = []
+
+    for test_name, query in _query_functions():
+        if test_name and not analyzer.matches_test(test_name):
+            continue
+        search = query(analyzer)
+        if set(search._index or ()) & indices:
+            searches.append((query.__name__, search))
+
+    return searches
+
+
+def warmup_queries(size: int = None) -> List[str]:
+    path = settings.SEARCH_WARMUP_QUERIES
+    queries = benchmark.read_corpus(path) if path else benchmark.corpus_queries()
+    return queries[:size or settings.SEARCH_WARMUP_SIZE]
+
+
+def warm_up(indices: AbstractSet[str], queries: List[str], passes=2) -> List[dict]:
+    """
+    Replay the queries on the indices and return the latency per pass.
+    The last pass shows the latency users can expect.
+    """
+    client = Elasticsearch(settings.ELASTIC_SEARCH_HOSTS)
+    client.indices.refresh(index=','.join(sorted(indices)))
+
+    searches = [
+        (name, search.using(client))
+        for query_input in queries
+        for name, search in warmup_searches(query_input, indices)
+    ]
+
+    reports = []
+    for i in range(passes):
+        latencies = []
+        errors = 0
+        for name, search in searches:
+            start = time.perf_counter()
+            try:
+                search.execute(ignore_cache=True)
+            except TransportError as e:
+                errors += 1
+                log.warning('Warm up query %s failed: %s', name, e)
+            latencies.append(time.perf_counter() - start)
+
+        latencies.sort()
+        report = {
+            'pass': i + 1,
+            'searches': len(latencies),
+            'errors': errors,
+            'seconds': round(sum(latencies), 2),
+            'p50_ms': round(benchmark.percentile(latencies, 50) * 1000, 2),
+            'p95_ms': round(benchmark.percentile(latencies, 95) * 1000, 2),
+            'max_ms': round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        }
+        log.info(
+            'Warm up %s pass %d: %d searches in %.2fs, p50 %.1fms, p95 %.1fms, max %.1fms',
+            ', '.join(sorted(indices)), report['pass'], report['searches'],
+            report['seconds'], report['p50_ms'], report['p95_ms'], report['max_ms'])
+        reports.append(report)
+
+    return reports